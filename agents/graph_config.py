@@ -6,7 +6,7 @@ from langgraph.checkpoint.memory import MemorySaver
 from typing_extensions import TypedDict
 
 from nodes import (
-    detect_intent,
+    detect_intent_speculative,
     generate_greeting_response,
     generate_handoff_response,
     generate_off_topic_response,
@@ -42,6 +42,9 @@ class ChatState(TypedDict, total=False):
     revised_response: str
     tool_results: list
     rag_sources: list
+    speculative_retrieval: bool
+    fused_intent: bool
+    prompt_composition: dict
     instruction_prompt: Any
     step: str
     cached: bool
@@ -49,7 +52,7 @@ class ChatState(TypedDict, total=False):
 
 workflow = StateGraph(ChatState)
 
-workflow.add_node("intent_detection", detect_intent)
+workflow.add_node("intent_detection", detect_intent_speculative)
 workflow.add_node("retrieve_company_context", retrieve_company_context)
 workflow.add_node("retrieve_user_context", retrieve_user_context)
 workflow.add_node("augment_query", augment_query)
@@ -79,6 +82,8 @@ def route_after_intent(state):
         return "generate_off_topic_response"
     elif intent == "chat_with_agent":
         return "generate_handoff_response"
+    elif state.get("speculative_retrieval"):
+        return "augment_query"  # retrieval already ran alongside intent detection (#47)
 
     return "retrieve_company_context"
 
@@ -89,6 +94,7 @@ workflow.add_conditional_edges(
         "generate_greeting_response": "generate_greeting_response",
         "generate_off_topic_response": "generate_off_topic_response",
         "generate_handoff_response": "generate_handoff_response",
+        "augment_query": "augment_query",
         "retrieve_company_context": "retrieve_company_context"  # Normal flow
     }
 )
@@ -96,7 +102,20 @@ workflow.add_conditional_edges(
 workflow.add_edge("retrieve_company_context", "retrieve_user_context")
 workflow.add_edge("retrieve_user_context", "augment_query")
 workflow.add_edge("augment_query", "response_generation")
-workflow.add_edge("response_generation", "response_revision")
+
+
+def route_after_generation(state):
+    """In fused intent mode (#48) the generation call can route the turn to a canned greeting
+    or handoff reply — final as written, so it skips revision."""
+    if state.get("fused_intent") and state.get("intent") in ("greeting", "chat_with_agent"):
+        return "log_saving"
+    return "response_revision"
+
+workflow.add_conditional_edges(
+    "response_generation",
+    route_after_generation,
+    {"response_revision": "response_revision", "log_saving": "log_saving"},
+)
 workflow.add_edge("response_revision", "log_saving")
 workflow.add_edge("log_saving", END)
 
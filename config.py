@@ -29,6 +29,84 @@ GENERATION_MODEL = os.getenv("GENERATION_MODEL", DEEPSEEK_MODEL)
 FALLBACK_API_URL = os.getenv("FALLBACK_API_URL", "")
 FALLBACK_API_KEY = os.getenv("FALLBACK_API_KEY", "")
 FALLBACK_MODEL = os.getenv("FALLBACK_MODEL", "")
+
+# Hedged requests (#37, providers/llm.py): "task:percentile,..." e.g. "generation:95". When the
+# primary hasn't answered within that percentile of the task's recent latency, the same request
+# also goes to the fallback and the first good answer wins. Needs the fallback above. Empty = off.
+LLM_HEDGE = os.getenv("LLM_HEDGE", "")
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "10"))
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "1"))
+
+# Circuit breakers per provider+model (#38, providers/circuit_breaker.py): open after the
+# failure rate (errors, 5xx/402/429, calls slower than LLM_BREAKER_SLOW_CALL_SECONDS) over the
+# last LLM_BREAKER_WINDOW calls reaches LLM_BREAKER_ERROR_RATE; an open primary is skipped in
+# favour of the fallback until a half-open probe succeeds after the cooldown.
+LLM_BREAKER_ENABLED = os.getenv("LLM_BREAKER_ENABLED", "true").lower() == "true"
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", "20"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# Provider pools (#39, providers/pool.py): LLM_ENDPOINTS is a JSON list of OpenAI-compatible
+# endpoints ({"name", "url", "model", "api_key_env", "cost", "max_concurrency"}); LLM_TASK_POOLS
+# maps tasks to them ("generation:deepseek|together,intent:deepseek"). Each request goes to the
+# member with the lowest EWMA latency x cost; a failed call enters the EWMA as (at least)
+# LLM_POOL_ERROR_PENALTY_SECONDS. Empty = single primary + fallback routing.
+LLM_ENDPOINTS = os.getenv("LLM_ENDPOINTS", "")
+LLM_TASK_POOLS = os.getenv("LLM_TASK_POOLS", "")
+LLM_POOL_EWMA_ALPHA = float(os.getenv("LLM_POOL_EWMA_ALPHA", "0.3"))
+LLM_POOL_ERROR_PENALTY_SECONDS = float(os.getenv("LLM_POOL_ERROR_PENALTY_SECONDS", "30"))
+
+# Streaming failover (#40): if the primary stream hasn't produced its first token within this
+# many seconds (or fails before it), /chat/stream restarts on the fallback. 0 = no deadline.
+LLM_STREAM_TTFT_SECONDS = float(os.getenv("LLM_STREAM_TTFT_SECONDS", "8"))
+
+# Per-task LLM profiles (#41, providers/llm.py): "task:timeout_seconds:max_tokens,...". The
+# timeout is a ceiling; once LLM_TIMEOUT_MIN_SAMPLES calls are known it shrinks to
+# LLM_TIMEOUT_MULTIPLIER x the task's LLM_TIMEOUT_PERCENTILE latency (>= LLM_TIMEOUT_MIN_SECONDS).
+# LLM_INTENT_MAX_TOKENS tightens generation's cap per detected intent ("intent:max_tokens,...").
+LLM_TASK_PROFILES = os.getenv("LLM_TASK_PROFILES", "intent:10:60,generation:30:450,revision:20:300")
+LLM_INTENT_MAX_TOKENS = os.getenv(
+    "LLM_INTENT_MAX_TOKENS", "greeting:150,chat_with_agent:200,share_contact:200,off_topic:150")
+LLM_TIMEOUT_PERCENTILE = float(os.getenv("LLM_TIMEOUT_PERCENTILE", "99"))
+LLM_TIMEOUT_MULTIPLIER = float(os.getenv("LLM_TIMEOUT_MULTIPLIER", "2"))
+LLM_TIMEOUT_MIN_SECONDS = float(os.getenv("LLM_TIMEOUT_MIN_SECONDS", "3"))
+LLM_TIMEOUT_MIN_SAMPLES = int(os.getenv("LLM_TIMEOUT_MIN_SAMPLES", "20"))
+
+# Priority bulkhead (#45, providers/bulkhead.py): outbound LLM calls hold a slot, capped per
+# class ("task:cap") and in total; queued calls are served intent > generation > revision >
+# judge, and past LLM_BULKHEAD_MAX_QUEUE waiters the lowest-priority one is shed.
+LLM_BULKHEAD_ENABLED = os.getenv("LLM_BULKHEAD_ENABLED", "true").lower() == "true"
+LLM_BULKHEAD_MAX_CONCURRENCY = int(os.getenv("LLM_BULKHEAD_MAX_CONCURRENCY", "16"))
+LLM_BULKHEAD_LIMITS = os.getenv("LLM_BULKHEAD_LIMITS", "intent:8,generation:8,revision:4,judge:2")
+LLM_BULKHEAD_MAX_QUEUE = int(os.getenv("LLM_BULKHEAD_MAX_QUEUE", "32"))
+
+# Local token counting (#46, providers/tokens.py): LLM_TOKENIZER_PATH = DeepSeek's
+# tokenizer.json for exact counts (else a calibrated approximation). History and retrieval
+# context are trimmed to these token budgets before generation (0 = no limit), and the spend
+# cap reserves a turn's worst-case cost (llm.estimate_turn_cost) before dispatch.
+LLM_TOKENIZER_PATH = os.getenv("LLM_TOKENIZER_PATH", "")
+LLM_HISTORY_TOKEN_BUDGET = int(os.getenv("LLM_HISTORY_TOKEN_BUDGET", "1500"))
+LLM_CONTEXT_TOKEN_BUDGET = int(os.getenv("LLM_CONTEXT_TOKEN_BUDGET", "2000"))
+LLM_PREFLIGHT_CALLS = int(os.getenv("LLM_PREFLIGHT_CALLS", "3"))
+
+# Extra per-model prices for billing (#43, DeepSeekOptimizer.MODEL_PRICING), USD per 1M tokens:
+# "model:cache_hit:cache_miss:output,..." — e.g. for a fallback or pool model from another vendor.
+LLM_PRICING = os.getenv("LLM_PRICING", "")
+
+# Pooled LLM transport (providers/deepseek_client.py): one keep-alive HTTP/2 client for the
+# app's lifetime instead of a new TCP+TLS handshake per call.
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10"))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60"))
+
+# Provider-level LLM response cache (#32, providers/response_cache.py): opt-in per task as
+# "task:ttl_seconds:max_entries,..." e.g. "intent:3600:2000,revision:600:500". Empty = off.
+LLM_RESPONSE_CACHE = os.getenv("LLM_RESPONSE_CACHE", "")
 QDRANT_HOST = os.getenv("QDRANT_HOST")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 
@@ -45,7 +123,56 @@ REDIS_CACHE_EXPIRE_SECONDS = 604800  # 7 dias
 # a near-but-wrong answer; bounded per (language, page) bucket.
 SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
 SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+# Per-language overrides, "pt-BR:0.90,en:0.93" — similarity distributions differ by language;
+# evals/calibrate_semantic_threshold.py recommends the values. Unlisted languages use the above.
+SEMANTIC_CACHE_THRESHOLDS = {
+    lang.strip(): float(value)
+    for lang, _, value in (item.partition(":") for item in os.getenv("SEMANTIC_CACHE_THRESHOLDS", "").split(","))
+    if lang.strip() and value.strip()
+}
 SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "50"))
+# Bucket eviction: "tinylfu" keeps a small recency window for new entries and, past it,
+# evicts the least-hit entry (so a burst of one-off questions can't push out the evergreen
+# ones); "recency" is the old keep-the-newest-N policy. Compare with evals/replay_semantic_cache.py.
+SEMANTIC_CACHE_EVICTION = os.getenv("SEMANTIC_CACHE_EVICTION", "tinylfu").lower()
+SEMANTIC_CACHE_WINDOW_RATIO = float(os.getenv("SEMANTIC_CACHE_WINDOW_RATIO", "0.2"))
+
+# Cache payload codec (core/cache.py): orjson + zstd behind a versioned header. Legacy
+# plain-JSON entries stay readable either way, so turning this off is a safe rollback.
+CACHE_COMPRESSION_ENABLED = os.getenv("CACHE_COMPRESSION_ENABLED", "true").lower() == "true"
+CACHE_COMPRESSION_LEVEL = int(os.getenv("CACHE_COMPRESSION_LEVEL", "3"))
+
+# FAQ fast path (core/faq_router.py): canned per-language answers for pricing, deadlines,
+# contact, company, tech stack, LGPD and portfolio questions, matched by keywords or by
+# embedding kNN over curated exemplars, before the graph. Anon/shared users only (like the
+# semantic cache); short messages only, since a long one carries specifics.
+FAQ_ROUTER_ENABLED = os.getenv("FAQ_ROUTER_ENABLED", "true").lower() == "true"
+FAQ_ROUTER_THRESHOLD = float(os.getenv("FAQ_ROUTER_THRESHOLD", "0.86"))
+FAQ_ROUTER_MARGIN = float(os.getenv("FAQ_ROUTER_MARGIN", "0.03"))
+FAQ_ROUTER_MAX_WORDS = int(os.getenv("FAQ_ROUTER_MAX_WORDS", "12"))
+
+# Lexical fast path (#50, core/lexical_router.py): a message that is nothing but a greeting
+# or a "talk to a human" ask (all four languages) gets its canned reply before the graph.
+LEXICAL_FAST_PATH_ENABLED = os.getenv("LEXICAL_FAST_PATH_ENABLED", "true").lower() == "true"
+
+# Local intent classifier (#49, core/intent_knn.py): detect_intent answers from the nearest
+# curated exemplar (MiniLM kNN) when it clears the threshold and beats the runner-up intent
+# by the margin; ambiguous messages still go to the LLM. Off by default: a wrong local
+# greeting / off_topic / chat_with_agent swaps a real answer for a canned reply, so turn it
+# on only once evals/run_intent_knn.py (gated in the evals workflow) has been run against
+# the production model and the threshold/margin set from its sweep.
+INTENT_KNN_ENABLED = os.getenv("INTENT_KNN_ENABLED", "false").lower() == "true"
+INTENT_KNN_THRESHOLD = float(os.getenv("INTENT_KNN_THRESHOLD", "0.85"))
+INTENT_KNN_MARGIN = float(os.getenv("INTENT_KNN_MARGIN", "0.05"))
+
+# FAQ cache warmer (core/faq_warmer.py, run by cron and after deploys): re-answer the most
+# frequent first-turn questions from chat_logs and seed both caches with them. Rate-limited
+# and budget-capped, since every seeded answer is a real graph run.
+FAQ_WARM_TOP_N = int(os.getenv("FAQ_WARM_TOP_N", "20"))
+FAQ_WARM_MIN_COUNT = int(os.getenv("FAQ_WARM_MIN_COUNT", "2"))
+FAQ_WARM_WINDOW_DAYS = int(os.getenv("FAQ_WARM_WINDOW_DAYS", "30"))
+FAQ_WARM_RATE_PER_MINUTE = float(os.getenv("FAQ_WARM_RATE_PER_MINUTE", "6"))
+FAQ_WARM_MAX_USD = float(os.getenv("FAQ_WARM_MAX_USD", "0.20"))
 
 # Runtime environment. Anything other than "production" is treated as dev.
 APP_ENV = os.getenv("APP_ENV", "development")
@@ -93,6 +220,14 @@ LEAD_SOURCE_GROUP = os.getenv("LEAD_SOURCE_GROUP", "bot")
 COMPANY_TOP_K = int(os.getenv("COMPANY_TOP_K", "4"))
 COMPANY_SCORE_THRESHOLD = float(os.getenv("COMPANY_SCORE_THRESHOLD", "0.2"))
 
+# Speculative retrieval (#47, nodes/speculation.py): embed + retrieve company/user context
+# while detect_intent runs; committed for RAG intents, dropped for canned ones.
+SPECULATIVE_RETRIEVAL_ENABLED = os.getenv("SPECULATIVE_RETRIEVAL_ENABLED", "true").lower() == "true"
+
+# Fused intent mode (#48, nodes/fused.py): skip the detect_intent call and let the
+# generation call flag greetings / handoff requests itself (one LLM round trip per turn).
+FUSED_INTENT_ENABLED = os.getenv("FUSED_INTENT_ENABLED", "false").lower() == "true"
+
 # Short-term conversation memory: how many recent messages (user+assistant turns) to keep
 # in the checkpointed history and replay to the model. 10 = the last ~5 turns; caps the
 # context window and cost as a conversation grows.
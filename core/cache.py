@@ -1,15 +1,26 @@
 import json
 import math
+import re
+import time
+import unicodedata
+import uuid
+from hashlib import sha256
 from urllib.parse import quote
 
+import orjson
 import redis.asyncio as redis
+import zstandard
 
 from config import (
+    CACHE_COMPRESSION_ENABLED,
+    CACHE_COMPRESSION_LEVEL,
     REDIS_CACHE_EXPIRE_SECONDS,
     REDIS_DB,
     REDIS_HOST,
     REDIS_PASSWORD,
     REDIS_PORT,
+    SEMANTIC_CACHE_EVICTION,
+    SEMANTIC_CACHE_WINDOW_RATIO,
 )
 
 # The client is built lazily rather than at import time: importing this module
@@ -44,15 +55,267 @@ def set_redis(client) -> None:
     _client = client
 
 
+# --- Payload codec ---
+# Cached answers (raw + revised text + bubbles) and semantic buckets (384-float vectors) are
+# stored for 7 days, so their size is Redis memory. v1 entries are orjson (faster than stdlib
+# json both ways) compressed with zstd, behind a versioned header. The header starts with
+# 0xFF, which can never begin a UTF-8 JSON document, so decode_payload tells the formats apart
+# and legacy plain-JSON entries stay readable until they expire.
+_CODEC_MAGIC = b"\xffWBC"
+_CODEC_V1 = 1  # orjson + zstd
+_zstd_compressor = zstandard.ZstdCompressor(level=CACHE_COMPRESSION_LEVEL)
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+def encode_payload(value) -> bytes:
+    """Serialize a cache value in the current format (legacy JSON if compression is off)."""
+    if not CACHE_COMPRESSION_ENABLED:
+        return json.dumps(value).encode("utf-8")
+    body = _zstd_compressor.compress(orjson.dumps(value))
+    return _CODEC_MAGIC + bytes([_CODEC_V1]) + body
+
+
+def decode_payload(raw):
+    """Inverse of encode_payload; also reads legacy plain-JSON entries. Raises ValueError
+    on a corrupt or unknown-version entry (callers treat that as a miss)."""
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    if raw.startswith(_CODEC_MAGIC):
+        version = raw[len(_CODEC_MAGIC):len(_CODEC_MAGIC) + 1]
+        if version != bytes([_CODEC_V1]):
+            raise ValueError(f"unknown cache codec version {version!r}")
+        try:
+            return orjson.loads(_zstd_decompressor.decompress(raw[len(_CODEC_MAGIC) + 1:]))
+        except zstandard.ZstdError as exc:
+            raise ValueError(f"corrupt cache entry: {exc}") from exc
+    return json.loads(raw)
+
+
+# --- Exact-match key normalization ---
+# "Quanto custa um site?" and "quanto custa um site ?" are the same question, but hashing the
+# raw text made them miss each other. Normalization folds the differences that never change
+# the meaning of a widget message: case, accents/compatibility forms, runs of whitespace and
+# trailing punctuation. Interior punctuation is kept ("Next.js", "e-commerce").
+_WHITESPACE = re.compile(r"\s+")
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([?!.,;:…])")
+_TRAILING_PUNCT = re.compile(r"[\s?!.,;:…¿¡]+$")
+_LEADING_PUNCT = re.compile(r"^[\s¿¡]+")
+
+
+def normalize_message(text: str) -> str:
+    """Canonical form of a message for exact-cache keys (never shown or sent to the LLM)."""
+    if not text:
+        return ""
+    # NFKD splits accented letters into base + combining mark; dropping the marks folds
+    # "serviços"/"servicos" together (visitors type both). casefold > lower for ß & co.
+    folded = unicodedata.normalize("NFKD", text)
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    folded = unicodedata.normalize("NFKC", folded).casefold()
+    folded = _WHITESPACE.sub(" ", folded).strip()
+    folded = _SPACE_BEFORE_PUNCT.sub(r"\1", folded)
+    folded = _LEADING_PUNCT.sub("", folded)
+    return _TRAILING_PUNCT.sub("", folded)
+
+
+# --- Per-layer instrumentation ---
+# Process-local counters, like DeepSeekOptimizer.token_usage: they reset on restart and are
+# per-worker (prod runs one). Layers: "exact" (Redis key), "semantic" (embedding bucket) and
+# "greeting" (the canned-greeting short-circuit, which skips generation + revision) and "faq"
+# (the canned FAQ fast path in core/faq_router.py) and "widget" (precomputed button replies,
+# core/widget_actions.py) and "lexical" (whole-message greetings / handoff asks,
+# core/lexical_router.py) — all three skip the whole graph. USD saved
+# is an estimate: each hit is credited the running mean cost of a full, uncached turn.
+CACHE_LAYERS = ("exact", "semantic", "greeting", "faq", "widget", "lexical")
+
+
+def _empty_layer() -> dict:
+    return {"hits": 0, "misses": 0, "writes": 0, "evictions": 0,
+            "lookups": 0, "lookup_ms_total": 0.0, "saved_usd": 0.0,
+            "bytes_json": 0, "bytes_stored": 0, "stale_hits": 0, "revalidations": 0}
+
+
+CACHE_STATS = {layer: _empty_layer() for layer in CACHE_LAYERS}
+_TURN_COST = {"turns": 0, "usd": 0.0}
+
+
+def reset_cache_stats() -> None:
+    """Zero every counter. Test seam (and handy after a deliberate flush)."""
+    for layer in CACHE_LAYERS:
+        CACHE_STATS[layer] = _empty_layer()
+    _TURN_COST.update(turns=0, usd=0.0)
+
+
+def record_turn_cost(usd: float) -> None:
+    """Feed the cost of a full, uncached turn into the running mean used to price hits."""
+    if usd > 0:
+        _TURN_COST["turns"] += 1
+        _TURN_COST["usd"] += usd
+
+
+def avg_turn_cost() -> float:
+    return _TURN_COST["usd"] / _TURN_COST["turns"] if _TURN_COST["turns"] else 0.0
+
+
+def record_lookup(layer: str, hit: bool, elapsed_ms: float = 0.0) -> None:
+    stats = CACHE_STATS[layer]
+    stats["lookups"] += 1
+    stats["lookup_ms_total"] += elapsed_ms
+    if hit:
+        stats["hits"] += 1
+    else:
+        stats["misses"] += 1
+
+
+def record_saving(layer: str, usd: float | None = None) -> None:
+    """Credit a hit's avoided spend (default: the mean full-turn cost)."""
+    CACHE_STATS[layer]["saved_usd"] += avg_turn_cost() if usd is None else max(usd, 0.0)
+
+
+def record_write(layer: str, value=None, stored: bytes | None = None) -> None:
+    stats = CACHE_STATS[layer]
+    stats["writes"] += 1
+    if value is not None and stored is not None:
+        # Baseline = what the legacy json.dumps format would have stored.
+        stats["bytes_json"] += len(json.dumps(value).encode("utf-8"))
+        stats["bytes_stored"] += len(stored)
+
+
+def record_evictions(layer: str, count: int) -> None:
+    if count > 0:
+        CACHE_STATS[layer]["evictions"] += count
+
+
+def get_cache_stats() -> dict:
+    """Per-layer counters for /usage-report."""
+    report = {}
+    for layer, stats in CACHE_STATS.items():
+        answered = stats["hits"] + stats["misses"]
+        report[layer] = {
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": round(stats["hits"] / answered, 3) if answered else 0.0,
+            "writes": stats["writes"],
+            "evictions": stats["evictions"],
+            "avg_lookup_ms": round(stats["lookup_ms_total"] / stats["lookups"], 2) if stats["lookups"] else 0.0,
+            "estimated_saved_usd": round(stats["saved_usd"], 6),
+            "avg_bytes_saved_per_write": (
+                round((stats["bytes_json"] - stats["bytes_stored"]) / stats["writes"]) if stats["writes"] else 0
+            ),
+            "compression_ratio": (
+                round(stats["bytes_stored"] / stats["bytes_json"], 3) if stats["bytes_json"] else None
+            ),
+            "stale_hits": stats["stale_hits"],
+            "revalidations": stats["revalidations"],
+        }
+    report["avg_uncached_turn_cost_usd"] = round(avg_turn_cost(), 6)
+    report["kb_version"] = dict(_KB)
+    return report
+
+
+# --- Knowledge-base versioning (stale-while-revalidate) ---
+# Every entry is tagged with the KB content hash and the embedding model it was built under
+# (set once at startup, see main.lifespan). After a KB edit, an anon entry is "stale": it is
+# still served — so freshness doesn't cost a cold-cache stampede — while ONE background
+# regeneration (guarded by a Redis lock) swaps in the new answer. The entry carries its
+# originating request (message/language/page) so the regeneration knows what to ask.
+# Identified users' entries carry no request: a stale one is simply a miss (it's per-user,
+# so there's no stampede to avoid). Untagged legacy entries are served as before.
+_KB = {"kb": None, "emb": None}
+_revalidator = None
+SWR_LOCK_SECONDS = 300
+
+
+def set_kb_version(kb: str | None, emb: str | None = None) -> None:
+    _KB.update(kb=kb, emb=emb)
+
+
+def set_revalidator(fn) -> None:
+    """Register the callable that regenerates a stale anon answer: fn(request_dict). It must
+    return quickly (schedule the work); main wires a background task."""
+    global _revalidator
+    _revalidator = fn
+
+
+def _tags() -> dict:
+    return {"kb": _KB["kb"], "emb": _KB["emb"]}
+
+
+def _is_stale(entry: dict) -> bool:
+    if _KB["kb"] is None or "kb" not in entry:
+        return False  # versioning off (tests/CLI), or an untagged legacy entry
+    return entry.get("kb") != _KB["kb"] or entry.get("emb") != _KB["emb"]
+
+
+def _revalidation_lock_key(request: dict) -> str:
+    ident = f"{request.get('language')}|{request.get('page')}|{normalize_message(request.get('message', ''))}"
+    return "swr:" + sha256(ident.encode("utf-8")).hexdigest()
+
+
+async def _trigger_revalidation(layer: str, request: dict) -> None:
+    """Hand a stale entry's request to the revalidator, at most once per SWR_LOCK_SECONDS
+    (the lock is shared across workers and across the exact/semantic layers)."""
+    if _revalidator is None or not request:
+        return
+    claimed = await get_redis().set(_revalidation_lock_key(request), "1", ex=SWR_LOCK_SECONDS, nx=True)
+    if claimed:
+        CACHE_STATS[layer]["revalidations"] += 1
+        _revalidator(request)
+
+
+async def is_fresh(key: str) -> bool:
+    """Whether an exact entry exists and was built under the current KB/embedding model."""
+    raw = await get_redis().get(key)
+    if not raw:
+        return False
+    try:
+        entry = decode_payload(raw)
+    except (ValueError, TypeError):
+        return False
+    return not (_is_envelope(entry) and _is_stale(entry))
+
+
+def namespace_prefix(language: str, current_page: str) -> str:
+    """Readable (language, page) namespace for keys the admin endpoint must be able to flush.
+    The page is hashed (it's free-form) but kept per-namespace, so a SCAN can match it."""
+    page_digest = sha256((current_page or "/").encode("utf-8")).hexdigest()[:16]
+    return f"{language}:{page_digest}"
+
+
+def _is_envelope(entry) -> bool:
+    return isinstance(entry, dict) and entry.get("swr") == 1 and "value" in entry
+
+
 async def get_cached_response(key: str):
+    started = time.perf_counter()
     cached = await get_redis().get(key)
+    value, stale_request = None, None
     if cached:
-        return json.loads(cached)
-    return None
+        try:
+            entry = decode_payload(cached)
+        except (ValueError, TypeError):
+            entry = None  # corrupt/unknown entry: a miss, overwritten on the next write
+        if _is_envelope(entry):
+            value = entry["value"]
+            if _is_stale(entry):
+                stale_request = entry.get("req")
+                if not stale_request:
+                    value = None  # per-user entry built on the old KB: regenerate inline
+        else:
+            value = entry  # legacy (pre-envelope) entry
+    record_lookup("exact", value is not None, (time.perf_counter() - started) * 1000)
+    if value is not None and stale_request:
+        CACHE_STATS["exact"]["stale_hits"] += 1
+        await _trigger_revalidation("exact", stale_request)
+    return value
 
 
-async def set_cached_response(key: str, value: dict, expire: int = REDIS_CACHE_EXPIRE_SECONDS):
-    await get_redis().set(key, json.dumps(value), ex=expire)
+async def set_cached_response(key: str, value: dict, expire: int = REDIS_CACHE_EXPIRE_SECONDS,
+                              request: dict | None = None):
+    """Store `value` tagged with the current KB version. `request` ({message, language,
+    page}) is passed for shared/anon entries only — it makes a stale entry revalidatable."""
+    stored = encode_payload({"swr": 1, **_tags(), "req": request, "value": value})
+    await get_redis().set(key, stored, ex=expire)
+    record_write("exact", value, stored)
 
 
 # --- Semantic cache (#12) ---
@@ -75,32 +338,225 @@ def _cosine(a: list, b: list) -> float:
     return dot / (math.sqrt(na) * math.sqrt(nb))
 
 
+# --- Semantic bucket eviction (TinyLFU-style) ---
+#
+# Entries are kept in insertion order; each has an `id` and a hit count. The newest
+# `window` entries are always kept so a new answer gets a chance to earn hits; past the
+# window the least-hit entry goes first (oldest on ties). That is TinyLFU's admission test
+# in one step: the candidate leaving the window is evicted only if it has been hit less
+# than the coldest resident (on a tie the older resident goes). Counters are halved once
+# they sum to AGING_SAMPLE x the bucket size, so last month's favourite can't squat forever.
+#
+# In Redis the counts live in a hash next to the bucket (semantic_hits_key: entry id ->
+# hits), bumped with HINCRBY on a hit, so a hit never rewrites the bucket blob and can't
+# overwrite an entry a concurrent semantic_put (e.g. a revalidation) just stored. They are
+# read back, aged and rewritten only by semantic_put, when eviction needs them.
+
+SEMANTIC_EVICTION_POLICIES = ("tinylfu", "recency")
+AGING_SAMPLE = 10
+
+
+def _window_size(max_entries: int, window_ratio: float) -> int:
+    return min(max_entries, max(1, round(max_entries * window_ratio)))
+
+
+def evict_entries(entries: list, max_entries: int, policy: str | None = None,
+                  window_ratio: float | None = None) -> tuple[list, int]:
+    """Trim `entries` (oldest first) to `max_entries`. Returns (kept, evicted_count).
+    policy / window_ratio default to SEMANTIC_CACHE_EVICTION / SEMANTIC_CACHE_WINDOW_RATIO."""
+    policy = SEMANTIC_CACHE_EVICTION if policy is None else policy
+    window_ratio = SEMANTIC_CACHE_WINDOW_RATIO if window_ratio is None else window_ratio
+    overflow = len(entries) - max_entries
+    if overflow <= 0:
+        return entries, 0
+    if policy == "recency":
+        return entries[-max_entries:], overflow
+    protected_from = len(entries) - _window_size(max_entries, window_ratio)
+    coldest = sorted(range(protected_from), key=lambda i: (int(entries[i].get("hits") or 0), i))
+    victims = set(coldest[:overflow])
+    return [e for i, e in enumerate(entries) if i not in victims], overflow
+
+
+def _age(entries: list) -> None:
+    """Halve every hit counter (in place) once they sum to AGING_SAMPLE x the bucket size."""
+    if sum(int(e.get("hits") or 0) for e in entries) >= AGING_SAMPLE * max(len(entries), 1):
+        for e in entries:
+            e["hits"] = int(e.get("hits") or 0) // 2
+
+
+def touch_entry(entries: list, entry: dict) -> None:
+    """Count a hit on `entry` (in place), aging the whole bucket when due."""
+    entry["hits"] = int(entry.get("hits") or 0) + 1
+    _age(entries)
+
+
+def semantic_hits_key(bucket_key: str) -> str:
+    """Hash of entry id -> hit count for a semantic bucket (outside the semcache:* namespace,
+    which holds only bucket blobs and the index)."""
+    return "semhits:" + bucket_key
+
+
 async def semantic_get(bucket_key: str, query_vec: list, threshold: float):
     """Return the payload whose stored embedding is most similar to `query_vec`
     (cosine >= threshold), or None. `query_vec` is precomputed by the caller."""
+    started = time.perf_counter()
+    hit = None
     raw = await get_redis().get(bucket_key)
-    if not raw:
-        return None
     try:
-        entries = json.loads(raw)
+        entries = decode_payload(raw) if raw else []
     except (ValueError, TypeError):
-        return None
-    best_payload, best_sim = None, -1.0
+        entries = []
+    best_entry, best_sim = None, -1.0
     for entry in entries:
+        # A vector from another embedding model isn't comparable at all: skip it outright.
+        if _KB["emb"] is not None and entry.get("emb", _KB["emb"]) != _KB["emb"]:
+            continue
         sim = _cosine(query_vec, entry.get("vec") or [])
         if sim > best_sim:
-            best_payload, best_sim = entry.get("payload"), sim
-    return best_payload if best_payload is not None and best_sim >= threshold else None
+            best_entry, best_sim = entry, sim
+    stale_request = None
+    if best_entry is not None and best_entry.get("payload") is not None and best_sim >= threshold:
+        if not _is_stale(best_entry):
+            hit = best_entry["payload"]
+        elif best_entry.get("req"):
+            hit, stale_request = best_entry["payload"], best_entry["req"]
+    record_lookup("semantic", hit is not None, (time.perf_counter() - started) * 1000)
+    if hit is not None and best_entry.get("id"):
+        # Only the counter hash is touched, never the bucket (see the eviction notes above).
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.hincrby(semantic_hits_key(bucket_key), best_entry["id"], 1)
+            pipe.expire(semantic_hits_key(bucket_key), REDIS_CACHE_EXPIRE_SECONDS)
+            await pipe.execute()
+    if stale_request:
+        CACHE_STATS["semantic"]["stale_hits"] += 1
+        await _trigger_revalidation("semantic", stale_request)
+    return hit
+
+
+def semantic_bucket_key(language: str, current_page: str) -> str:
+    """Bucket key for the semantic cache. Scoped by (language, page) — never user, because it
+    only ever holds shared/anon (context-free, user-independent) turns."""
+    return "semcache:" + sha256(f"{language}_{current_page}".encode("utf-8")).hexdigest()
+
+
+# Redis hash: semantic bucket key -> "language|page", so the admin endpoint can list buckets
+# by the (language, page) they serve (the bucket key itself is a one-way hash).
+SEMANTIC_INDEX_KEY = "semcache:index"
 
 
 async def semantic_put(bucket_key: str, query_vec: list, payload: dict, max_entries: int,
-                       expire: int = REDIS_CACHE_EXPIRE_SECONDS):
-    """Append {vec, payload} to the bucket, keeping only the most recent `max_entries`."""
-    raw = await get_redis().get(bucket_key)
+                       expire: int = REDIS_CACHE_EXPIRE_SECONDS, label: str | None = None,
+                       request: dict | None = None):
+    """Append {vec, payload} to the bucket and trim it to `max_entries` (see evict_entries).
+    Entries are tagged with the KB version; `request` makes a stale one revalidatable."""
+    r = get_redis()
+    hits_key = semantic_hits_key(bucket_key)
+    raw = await r.get(bucket_key)
     try:
-        entries = json.loads(raw) if raw else []
+        entries = decode_payload(raw) if raw else []
     except (ValueError, TypeError):
         entries = []
-    entries.append({"vec": query_vec, "payload": payload})
-    entries = entries[-max_entries:]
-    await get_redis().set(bucket_key, json.dumps(entries), ex=expire)
+    counts = {_decode(k): int(v) for k, v in (await r.hgetall(hits_key)).items()}
+    for e in entries:
+        e.setdefault("id", uuid.uuid4().hex[:12])  # entries written before ids existed
+        e["hits"] = counts.get(e["id"], int(e.get("hits") or 0))
+    hits = 0
+    if request:
+        # Same question re-answered (e.g. a revalidation): replace the old entry, don't keep
+        # both — and keep its hit count, it's the same popular question.
+        asked = normalize_message(request.get("message", ""))
+        replaced = [e for e in entries
+                    if e.get("req") and normalize_message(e["req"].get("message", "")) == asked]
+        hits = sum(int(e.get("hits") or 0) for e in replaced)
+        entries = [e for e in entries if not any(e is r for r in replaced)]
+    entries.append({"id": uuid.uuid4().hex[:12], "vec": query_vec, "payload": payload, **_tags(),
+                    "req": request, "hits": hits})
+    entries, evicted = evict_entries(entries, max_entries)
+    _age(entries)
+    record_evictions("semantic", evicted)
+    kept_hits = {e["id"]: e.pop("hits") for e in entries}
+    stored = encode_payload(entries)
+    # Hits landing between the HGETALL above and this rewrite are lost: that only nudges
+    # eviction order, the bucket itself is never written from stale data by a hit.
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.set(bucket_key, stored, ex=expire)
+        pipe.delete(hits_key)
+        counted = {entry_id: n for entry_id, n in kept_hits.items() if n}
+        if counted:
+            pipe.hset(hits_key, mapping=counted)
+            pipe.expire(hits_key, expire)
+        await pipe.execute()
+    record_write("semantic", entries, stored)
+    if label:
+        await r.hset(SEMANTIC_INDEX_KEY, bucket_key, label)
+
+
+# --- Admin: inspect / flush (operator-only, see main.require_admin) ---
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+async def _count_keys(pattern: str) -> int:
+    count = 0
+    async for _ in get_redis().scan_iter(match=pattern, count=500):
+        count += 1
+    return count
+
+
+async def describe_buckets() -> dict:
+    """Sizes of every semantic bucket (with its language/page label) and of the anon exact
+    namespace. Identified users' exact keys are bare hashes and are not enumerated."""
+    r = get_redis()
+    index = {_decode(k): _decode(v) for k, v in (await r.hgetall(SEMANTIC_INDEX_KEY)).items()}
+    buckets = []
+    async for raw_key in r.scan_iter(match="semcache:*", count=500):
+        key = _decode(raw_key)
+        if key == SEMANTIC_INDEX_KEY:
+            continue
+        raw = await r.get(key)
+        try:
+            decoded = decode_payload(raw) if raw else []
+        except (ValueError, TypeError):
+            decoded = []
+        language, _, page = index.get(key, "|").partition("|")
+        counts = await r.hgetall(semantic_hits_key(key))
+        buckets.append({"bucket": key, "language": language or None, "page": page or None,
+                        "entries": len(decoded), "ttl_seconds": await r.ttl(key),
+                        "hits": sum(int(v) for v in counts.values())})
+    buckets.sort(key=lambda b: -b["entries"])
+    return {"semantic_buckets": buckets, "exact_anon_keys": await _count_keys("exact:*")}
+
+
+async def flush_namespace(language: str, current_page: str | None = None) -> dict:
+    """Drop the anon exact keys and semantic buckets for a language (optionally one page).
+    Counted as evictions so the stats show the flush."""
+    r = get_redis()
+    if current_page is None:
+        exact_pattern = f"exact:{language}:*"
+    else:
+        exact_pattern = f"exact:{namespace_prefix(language, current_page)}:*"
+    exact_keys = [k async for k in r.scan_iter(match=exact_pattern, count=500)]
+    if exact_keys:
+        await r.delete(*exact_keys)
+
+    index = {_decode(k): _decode(v) for k, v in (await r.hgetall(SEMANTIC_INDEX_KEY)).items()}
+    buckets = [
+        key for key, label in index.items()
+        if label.partition("|")[0] == language
+        and (current_page is None or label.partition("|")[2] == current_page)
+    ]
+    if current_page is not None:
+        # Buckets written before the index existed are still addressable by (language, page).
+        direct = semantic_bucket_key(language, current_page)
+        if direct not in buckets and await r.exists(direct):
+            buckets.append(direct)
+    if buckets:
+        await r.delete(*buckets, *(semantic_hits_key(b) for b in buckets))
+        await r.hdel(SEMANTIC_INDEX_KEY, *buckets)
+
+    record_evictions("exact", len(exact_keys))
+    record_evictions("semantic", len(buckets))
+    return {"language": language, "page": current_page,
+            "exact_keys_deleted": len(exact_keys), "semantic_buckets_deleted": len(buckets)}
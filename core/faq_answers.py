@@ -0,0 +1,250 @@
+"""Canned, per-language answers for the FAQ fast path (see core/faq_router.py).
+
+Grounded in company_info.md — when a fact changes there, change it here too and bump that
+category's `version` (it is returned as `faq_version` and shows in traces/analytics, so an
+outdated canned answer is easy to spot). Plain text: the widget splits bubbles on blank
+lines and renders no markdown. {contact}/{email}/{booking} are filled from config.
+
+`intent` is what the graph would have classified the question as, so analytics and the
+widget treat a fast-path answer like the normal one.
+"""
+
+CONTACT_EMAIL = "bruno@wbdigitalsolutions.com"
+
+FAQ_ANSWERS = {
+    "pricing": {
+        "intent": "request_quote",
+        "version": 1,
+        "answers": {
+            "pt-BR": (
+                "O valor depende do escopo: tipo de projeto, funcionalidades, integrações e prazo. "
+                "Por isso não passamos preço ou faixa de cara — um número prematuro costuma dar "
+                "a ideia errada do valor.\n\n"
+                "Com uma conversa rápida sobre o que você precisa, montamos um orçamento exato. "
+                "A qualidade vem sempre primeiro, e nossa estrutura enxuta deixa o preço bem "
+                "competitivo. Me conta: o que você tem em mente?"
+            ),
+            "en": (
+                "The price depends on the scope: project type, features, integrations and timeline. "
+                "That's why we don't quote prices or ranges up front — a premature number usually "
+                "gives the wrong idea of value.\n\n"
+                "After a quick conversation about what you need, we put together an exact quote. "
+                "Quality always comes first, and our lean structure keeps pricing very "
+                "competitive. Tell me: what do you have in mind?"
+            ),
+            "es": (
+                "El precio depende del alcance: tipo de proyecto, funcionalidades, integraciones y "
+                "plazo. Por eso no damos precios ni rangos de entrada — un número prematuro suele "
+                "dar una idea equivocada del valor.\n\n"
+                "Tras una conversación rápida sobre lo que necesitas, preparamos un presupuesto "
+                "exacto. La calidad siempre va primero y nuestra estructura ágil mantiene precios "
+                "muy competitivos. Cuéntame: ¿qué tienes en mente?"
+            ),
+            "it": (
+                "Il prezzo dipende dal perimetro: tipo di progetto, funzionalità, integrazioni e "
+                "tempi. Per questo non diamo prezzi o fasce in anticipo — un numero prematuro "
+                "spesso dà un'idea sbagliata del valore.\n\n"
+                "Dopo una breve chiacchierata su ciò che ti serve, prepariamo un preventivo "
+                "preciso. La qualità viene sempre prima e la nostra struttura snella mantiene i "
+                "prezzi molto competitivi. Raccontami: cosa hai in mente?"
+            ),
+        },
+    },
+    "deadlines": {
+        "intent": "inquire_services",
+        "version": 1,
+        "answers": {
+            "pt-BR": (
+                "O prazo varia com a complexidade do projeto e a nossa agenda do momento — alguns "
+                "projetos ficam prontos rápido, outros levam mais tempo. Como referência, a faixa "
+                "típica é de 4 a 12 semanas.\n\n"
+                "Trabalhamos com metodologia ágil e você acompanha o progresso o tempo todo. "
+                "Confirmamos um prazo realista depois de entender o escopo — qual projeto você "
+                "tem em mente?"
+            ),
+            "en": (
+                "Timelines vary with the project's complexity and our current workload — some "
+                "builds are fast, others take longer. As a reference, the typical range is 4 to "
+                "12 weeks.\n\n"
+                "We work in an agile way, so you follow the progress throughout. We confirm a "
+                "realistic timeline once we understand the scope — what project do you have in mind?"
+            ),
+            "es": (
+                "El plazo varía según la complejidad del proyecto y nuestra carga de trabajo — "
+                "algunos proyectos salen rápido, otros llevan más tiempo. Como referencia, el rango "
+                "típico es de 4 a 12 semanas.\n\n"
+                "Trabajamos con metodología ágil y sigues el avance en todo momento. Confirmamos "
+                "un plazo realista tras entender el alcance — ¿qué proyecto tienes en mente?"
+            ),
+            "it": (
+                "I tempi dipendono dalla complessità del progetto e dal nostro carico di lavoro — "
+                "alcuni progetti sono rapidi, altri richiedono più tempo. Come riferimento, la "
+                "fascia tipica è da 4 a 12 settimane.\n\n"
+                "Lavoriamo con metodo agile e segui i progressi in ogni momento. Confermiamo una "
+                "tempistica realistica dopo aver capito il perimetro — che progetto hai in mente?"
+            ),
+        },
+    },
+    "contact": {
+        "intent": "share_contact",
+        "version": 1,
+        "answers": {
+            "pt-BR": (
+                "Claro! Você pode falar com a gente no WhatsApp {contact} ou pelo email {email}.\n\n"
+                "Se preferir, agende uma conversa aqui: {booking}."
+            ),
+            "en": (
+                "Sure! You can reach us on WhatsApp {contact} or by email at {email}.\n\n"
+                "If you prefer, book a call here: {booking}."
+            ),
+            "es": (
+                "¡Claro! Puedes escribirnos por WhatsApp {contact} o por email a {email}.\n\n"
+                "Si prefieres, agenda una llamada aquí: {booking}."
+            ),
+            "it": (
+                "Certo! Puoi scriverci su WhatsApp {contact} o via email a {email}.\n\n"
+                "Se preferisci, prenota una chiamata qui: {booking}."
+            ),
+        },
+    },
+    "company": {
+        "intent": "inquire_services",
+        "version": 1,
+        "answers": {
+            "pt-BR": (
+                "A WB Digital Solutions foi fundada em 15 de janeiro de 2023 e é liderada pelo "
+                "Bruno, com um time enxuto e sênior que trabalha 100% remoto com clientes do mundo "
+                "todo, em português, inglês, espanhol e italiano.\n\n"
+                "Nossa missão é entregar soluções digitais inovadoras focadas em performance e "
+                "resultado: sites sob medida, plataformas e sistemas (SaaS e internos), automação "
+                "e inteligência artificial. Quer saber mais sobre alguma dessas áreas?"
+            ),
+            "en": (
+                "WB Digital Solutions was founded on January 15, 2023 and is led by Bruno, with a "
+                "lean, senior team working fully remotely with clients worldwide, in Portuguese, "
+                "English, Spanish and Italian.\n\n"
+                "Our mission is to deliver innovative digital solutions focused on performance and "
+                "results: custom websites, platforms and systems (SaaS and internal), automation "
+                "and AI. Would you like to know more about any of these?"
+            ),
+            "es": (
+                "WB Digital Solutions fue fundada el 15 de enero de 2023 y la lidera Bruno, con un "
+                "equipo ágil y senior que trabaja 100% en remoto con clientes de todo el mundo, en "
+                "portugués, inglés, español e italiano.\n\n"
+                "Nuestra misión es entregar soluciones digitales innovadoras enfocadas en "
+                "rendimiento y resultados: sitios a medida, plataformas y sistemas (SaaS e "
+                "internos), automatización e IA. ¿Quieres saber más de alguna de estas áreas?"
+            ),
+            "it": (
+                "WB Digital Solutions è stata fondata il 15 gennaio 2023 ed è guidata da Bruno, con "
+                "un team snello e senior che lavora completamente da remoto con clienti in tutto il "
+                "mondo, in portoghese, inglese, spagnolo e italiano.\n\n"
+                "La nostra missione è offrire soluzioni digitali innovative orientate a performance "
+                "e risultati: siti su misura, piattaforme e sistemi (SaaS e interni), automazione e "
+                "IA. Vuoi saperne di più su una di queste aree?"
+            ),
+        },
+    },
+    "tech_stack": {
+        "intent": "inquire_services",
+        "version": 1,
+        "answers": {
+            "pt-BR": (
+                "Escolhemos a stack certa para cada desafio. As bases que mais usamos:\n\n"
+                "Web: Next.js, TypeScript, Node.js e NestJS. Automação e integrações: n8n e Docker. "
+                "Machine learning e IA: Python, Rust e Go. Infraestrutura e dados: Redis, "
+                "PostgreSQL e Kubernetes.\n\n"
+                "Tem alguma tecnologia específica que o seu projeto precisa?"
+            ),
+            "en": (
+                "We pick the right stack for each challenge. The foundations we use most:\n\n"
+                "Web: Next.js, TypeScript, Node.js and NestJS. Automation and integrations: n8n and "
+                "Docker. Machine learning and AI: Python, Rust and Go. Infrastructure and data: "
+                "Redis, PostgreSQL and Kubernetes.\n\n"
+                "Is there a specific technology your project needs?"
+            ),
+            "es": (
+                "Elegimos el stack adecuado para cada desafío. Las bases que más usamos:\n\n"
+                "Web: Next.js, TypeScript, Node.js y NestJS. Automatización e integraciones: n8n y "
+                "Docker. Machine learning e IA: Python, Rust y Go. Infraestructura y datos: Redis, "
+                "PostgreSQL y Kubernetes.\n\n"
+                "¿Hay alguna tecnología específica que necesite tu proyecto?"
+            ),
+            "it": (
+                "Scegliamo lo stack giusto per ogni sfida. Le basi che usiamo di più:\n\n"
+                "Web: Next.js, TypeScript, Node.js e NestJS. Automazione e integrazioni: n8n e "
+                "Docker. Machine learning e IA: Python, Rust e Go. Infrastruttura e dati: Redis, "
+                "PostgreSQL e Kubernetes.\n\n"
+                "C'è una tecnologia specifica di cui ha bisogno il tuo progetto?"
+            ),
+        },
+    },
+    "lgpd": {
+        "intent": "inquire_services",
+        "version": 1,
+        "answers": {
+            "pt-BR": (
+                "Sim. Seguimos práticas rígidas de segurança e cumprimos integralmente a LGPD e o "
+                "GDPR nos projetos que entregamos.\n\n"
+                "Confidencialidade (NDA) e propriedade do código também podem ser acordadas no "
+                "contrato. Quer conversar sobre os requisitos de dados do seu projeto?"
+            ),
+            "en": (
+                "Yes. We follow strict security practices and fully comply with data protection "
+                "regulations such as LGPD and GDPR in the projects we deliver.\n\n"
+                "Confidentiality (NDAs) and code ownership can also be agreed in the contract. "
+                "Want to talk about your project's data requirements?"
+            ),
+            "es": (
+                "Sí. Seguimos prácticas de seguridad estrictas y cumplimos plenamente normativas de "
+                "protección de datos como la LGPD y el RGPD en los proyectos que entregamos.\n\n"
+                "La confidencialidad (NDA) y la propiedad del código también se pueden acordar en "
+                "el contrato. ¿Hablamos de los requisitos de datos de tu proyecto?"
+            ),
+            "it": (
+                "Sì. Seguiamo pratiche di sicurezza rigorose e rispettiamo pienamente le normative "
+                "sulla protezione dei dati come LGPD e GDPR nei progetti che consegniamo.\n\n"
+                "Riservatezza (NDA) e proprietà del codice si possono concordare nel contratto. "
+                "Vuoi parlare dei requisiti sui dati del tuo progetto?"
+            ),
+        },
+    },
+    "portfolio": {
+        "intent": "inquire_services",
+        "version": 1,
+        "answers": {
+            "pt-BR": (
+                "Temos projetos reais em vários segmentos. Alguns exemplos:\n\n"
+                "Plataformas e sistemas: WB CRM (CRM de vendas com análise de chamadas por IA), "
+                "WB Project Manager, Finanças e Konnen. IA: agentes de IA multiagente com LangGraph. "
+                "Sites e e-commerce: Revalida Itália (plataforma de ensino), Stylos (loja virtual "
+                "com MercadoPago), Flávia Guedes e Manon Ruivo.\n\n"
+                "Quer ver algum desses em detalhe ou um caso parecido com o seu?"
+            ),
+            "en": (
+                "We have real projects across many sectors. A few examples:\n\n"
+                "Platforms and systems: WB CRM (sales CRM with AI call analysis), WB Project "
+                "Manager, Finanças and Konnen. AI: multi-agent AI agents built with LangGraph. "
+                "Websites and e-commerce: Revalida Itália (education platform), Stylos (online "
+                "store with MercadoPago), Flávia Guedes and Manon Ruivo.\n\n"
+                "Would you like details on one of them, or a case similar to yours?"
+            ),
+            "es": (
+                "Tenemos proyectos reales en muchos sectores. Algunos ejemplos:\n\n"
+                "Plataformas y sistemas: WB CRM (CRM de ventas con análisis de llamadas por IA), "
+                "WB Project Manager, Finanças y Konnen. IA: agentes de IA multiagente con "
+                "LangGraph. Sitios y e-commerce: Revalida Itália (plataforma educativa), Stylos "
+                "(tienda online con MercadoPago), Flávia Guedes y Manon Ruivo.\n\n"
+                "¿Quieres detalles de alguno o un caso parecido al tuyo?"
+            ),
+            "it": (
+                "Abbiamo progetti reali in molti settori. Alcuni esempi:\n\n"
+                "Piattaforme e sistemi: WB CRM (CRM di vendita con analisi delle chiamate via IA), "
+                "WB Project Manager, Finanças e Konnen. IA: agenti IA multi-agente con LangGraph. "
+                "Siti ed e-commerce: Revalida Itália (piattaforma didattica), Stylos (negozio "
+                "online con MercadoPago), Flávia Guedes e Manon Ruivo.\n\n"
+                "Vuoi i dettagli di uno di questi o un caso simile al tuo?"
+            ),
+        },
+    },
+}
@@ -0,0 +1,229 @@
+"""FAQ fast path (docs/cache-optimization-roadmap.md items 1, 4-9): answer the recurring
+pricing / deadline / contact / company / tech-stack / LGPD / portfolio questions from
+canned answers (core/faq_answers.py) in milliseconds, before the graph runs.
+
+Two matchers, both conservative — a miss just falls through to the normal path:
+
+  1. keywords: one compiled regex per category of question-shaped phrases over the
+     normalized message (accents and case folded, see cache.normalize_message), in all
+     four languages. Exactly one category must match, and no other category's topic
+     words may appear; a message touching two ("qual o prazo e o preço?") is left to the
+     graph. Bare topic words (TOPICS) never route on their own; paraphrases the
+     phrases miss are left to the kNN and its margin check.
+  2. embedding kNN: nearest curated exemplar (same MiniLM vectors the semantic cache uses),
+     accepted only above FAQ_ROUTER_THRESHOLD and FAQ_ROUTER_MARGIN ahead of the best
+     exemplar of any other category.
+
+Only short messages are considered (FAQ_ROUTER_MAX_WORDS): a long message carries
+specifics a canned answer would ignore. Which users get the fast path, and the PII guard,
+are decided by the caller (main._faq_fast_path).
+"""
+
+import re
+
+import config
+from core import cache
+from core.faq_answers import CONTACT_EMAIL, FAQ_ANSWERS
+
+# Patterns run against cache.normalize_message output: no accents, casefolded, single spaces.
+# They must be shaped like the question itself: a bare topic word ("orcamento", "stack",
+# "privacy") also turns up in service requests ("site com precos dinamicos", "a privacy
+# policy page") and in asides ("nao tenho orcamento agora"), which the graph should answer.
+KEYWORDS = {
+    "pricing": [
+        r"quanto (?:custa|custaria|cobra[mn]?|sai|fica|e o investimento)",
+        r"qual (?:e )?o (?:preco|valor|custo|investimento)", r"(?:os )?precos de voces",
+        r"tabela de (?:valores|precos)",
+        r"(?:me )?(?:passa|manda|envia|faz|fazem|fazer|pedir) (?:um |o )?orcamento",
+        r"(?:quero|queria|gostaria de|preciso de) (?:um )?orcamento",
+        r"how much (?:does|do|is|are|would|will|for|to)", r"what (?:does|would) (?:it|a|an|one) .*cost",
+        r"(?:what(?:'s| is| are|s)|how is|how's) (?:your|the) (?:pricing|prices?|rates?)",
+        r"(?:get|give me|send me|request|need|want) a (?:price )?quote",
+        r"cuanto (?:cuesta|cobran|vale|sale)", r"(?:cual es|cuales son) (?:el|los|su|sus) precios?",
+        r"(?:quiero|quisiera|necesito|pedir|me (?:das|dan|envian|pasan)) (?:un )?presupuesto",
+        r"quanto (?:costa|costano|chiedete)", r"(?:qual e|quali sono) (?:il|i) (?:vostr[oi] )?prezz[oi]",
+        r"(?:vorrei|voglio|chiedere|mi (?:fate|mandate|inviate)) (?:un )?preventivo",
+        r"(?:quali sono )?le vostre tariffe",
+    ],
+    "deadlines": [
+        r"quanto tempo (?:leva|demora|para|pra|de)", r"qual (?:e )?o prazo", r"prazo de entrega",
+        r"quando fica pronto", r"em quanto tempo",
+        r"how long (?:does|will|would) it take (?:you )?to (?:build|make|develop|deliver|create|launch|finish)",
+        r"how long (?:does|will|would) (?:a|an|the|my|your|one) (?:\w+ )?(?:project|website|site|store|app|"
+        r"e-commerce|landing page|platform|chatbot) take(?: to (?:build|make|develop|deliver|finish))?$",
+        r"how long (?:to|for you to) (?:build|make|develop|deliver|create|launch|finish)",
+        r"(?:what(?:'s| is|s)) (?:the|your) (?:typical |usual )?(?:timeline|turnaround|deadline)",
+        r"turnaround time",
+        r"cuanto (?:tiempo|tarda|demora)", r"(?:cual es el|que) plazo", r"plazo de entrega",
+        r"quanto tempo (?:ci )?(?:vuole|serve|richiede)", r"(?:qual e la|che) tempistica",
+        r"tempi di (?:consegna|realizzazione)",
+    ],
+    "contact": [
+        r"qual (?:e )?(?:o|a) (?:seu |teu )?(?:whatsapp|zap|telefone|numero|email|e-mail|contato)",
+        r"(?:me )?passa (?:o|a) (?:seu |teu )?(?:whatsapp|zap|telefone|numero|email|e-mail|contato)",
+        r"(?:whatsapp|telefone|email|e-mail|contato) de voces", r"como (?:entro em contato|falo com voces)",
+        r"(?:your|what is|what's|whats) (?:the )?(?:whatsapp|phone|email|e-mail|contact)",
+        r"how (?:can|do) i (?:contact|reach)", r"contact (?:details|info|information)",
+        r"(?:su|cual es (?:el|su)) (?:whatsapp|telefono|email|correo)", r"como (?:los|las)? ?contacto",
+        r"como puedo contactar(?:los|las)?",
+        r"(?:il vostro|qual e il) (?:whatsapp|telefono|email|contatto)", r"come (?:posso )?contattarvi",
+    ],
+    "company": [
+        r"quem (?:sao|e) voces", r"quem e a wb", r"sobre a (?:empresa|wb)", r"historia da (?:empresa|wb)",
+        r"quando (?:foi fundada|a empresa foi fundada|voces comecaram)",
+        r"qual (?:e )?a (?:sua )?missao", r"missao (?:da empresa|da wb|de voces)",
+        r"who are you(?: guys)?", r"about (?:the|your) company", r"tell me about (?:wb|your company|yourselves)",
+        r"when was (?:wb|the company|your company|it) founded",
+        r"(?:what(?:'s| is|s)) (?:your|the company's|wb's) mission",
+        r"quienes son", r"sobre la empresa", r"cuando (?:fue fundada|se fundo)",
+        r"cual es (?:la|su) mision", r"mision de la empresa",
+        r"chi siete", r"sulla (?:vostra )?azienda", r"quando (?:e stata fondata|siete nati)",
+        r"(?:qual e )?la vostra missione",
+    ],
+    "tech_stack": [
+        r"(?:quais|que) (?:tecnologias|linguagens|ferramentas)", r"(?:qual|que) (?:e )?a (?:sua )?stack",
+        r"stack de voces", r"linguagens? de programacao",
+        r"(?:what|which) (?:technologies|tech|languages|frameworks|tools) do you use",
+        r"(?:what(?:'s| is|s)) your (?:tech )?stack", r"(?:what|which) stack do you use",
+        r"(?:que|cuales) (?:tecnologias|lenguajes|herramientas)", r"(?:cual es|que) (?:su |el )?stack",
+        r"(?:quali|che) (?:tecnologie|linguaggi|strumenti)", r"(?:qual e )?il vostro stack",
+    ],
+    "lgpd": [
+        r"(?:seguem|cumprem|respeitam|atendem|estao em conformidade com) (?:a |o )?(?:lgpd|gdpr)",
+        r"(?:are you|is wb|is your company) (?:lgpd|gdpr) compliant",
+        r"(?:do|does) (?:you|wb) (?:comply with|follow|respect) (?:the )?(?:lgpd|gdpr)",
+        r"(?:cumplen|siguen|respetan) (?:con )?(?:el |la )?(?:rgpd|gdpr)",
+        r"(?:rispettate|seguite|siete conformi al) (?:il )?gdpr",
+        r"(?:como )?voces (?:tratam|cuidam|protegem) (?:a |da |os |dos )?(?:privacidade|dados)",
+        r"how do you (?:handle|protect|treat|manage) (?:my |our |customer |user |personal )?(?:data|privacy)",
+        r"(?:what(?:'s| is|s)) your privacy policy",
+        r"como (?:tratan|protegen|manejan) (?:la privacidad|los datos)",
+        r"come (?:trattate|gestite|proteggete) (?:i dati|la privacy)",
+    ],
+    "portfolio": [
+        r"(?:tem|tens|possuem) (?:um |algum )?portfolio", r"(?:o |seu )?portfolio de voces",
+        r"(?:ver|mostra|mostrar|manda|mandar|envia|enviar|link do) (?:o |seu |um )?portfolio",
+        r"(?:see|share|send|show)(?: me)? (?:your|a|the) portfolio", r"(?:do you|you) have a portfolio",
+        r"your portfolio",
+        r"(?:tienen|tiene|ver|mostrar|enviar|mandar) (?:un |su |el )?portafolio", r"su portafolio",
+        r"(?:avete|vedere|mostrare|mandare|inviare) (?:un |il |il vostro )?portafoglio", r"il vostro portafoglio",
+        r"cases de sucesso", r"(?:seus|os|alguns) cases",
+        r"exemplos? de (?:trabalhos?|projetos?|sites?)", r"trabalhos? (?:anteriores|feitos|realizados)",
+        r"projetos? (?:anteriores|feitos|realizados)",
+        r"examples? of (?:your )?(?:work|projects?|sites?)", r"previous (?:work|projects?)", r"case stud(?:y|ies)",
+        r"ejemplos? de (?:trabajos?|proyectos?)", r"trabajos? (?:anteriores|realizados)",
+        r"esempi (?:di|dei) (?:lavori|progetti|vostri lavori)", r"lavori (?:precedenti|realizzati)",
+    ],
+}
+
+# Bare topic words. They never route a message on their own, but a second category's
+# topic next to a question ("qual o prazo e o preco?") makes it ambiguous.
+TOPICS = {
+    "pricing": [r"precos?", r"orcamentos?", r"prices?", r"pricing", r"quote", r"precios?",
+                r"presupuestos?", r"prezz[oi]", r"preventiv[oi]", r"tariff[ae]"],
+    "deadlines": [r"prazos?", r"timelines?", r"deadlines?", r"turnaround", r"plazos?", r"tempistic[ah]e?"],
+    "contact": [],
+    "company": [r"missao", r"mission", r"mision", r"missione"],
+    "tech_stack": [r"stack"],
+    "lgpd": [r"lgpd", r"gdpr", r"rgpd", r"privacidade", r"protecao de dados", r"privacy", r"data protection", r"privacidad",
+             r"proteccion de datos", r"protezione dei dati"],
+    "portfolio": [r"portfolio", r"portafolio", r"portafoglio"],
+}
+
+_COMPILED = {cat: re.compile(r"\b(?:" + "|".join(pats) + r")\b") for cat, pats in KEYWORDS.items()}
+_TOPICS = {cat: re.compile(r"\b(?:" + "|".join(pats) + r")\b") for cat, pats in TOPICS.items() if pats}
+
+# Curated paraphrases per category for the kNN matcher (embedded once at startup).
+EXEMPLARS = {
+    "pricing": [
+        "quanto custa um site?", "qual o valor de um projeto?", "quanto vocês cobram?",
+        "how much does a website cost?", "what are your prices?",
+        "¿cuánto cuesta una página web?", "quanto costa un sito web?",
+    ],
+    "deadlines": [
+        "quanto tempo leva para fazer um site?", "qual o prazo de entrega?",
+        "how long does a project take?", "what is the typical timeline?",
+        "¿cuánto tiempo tarda un proyecto?", "quanto tempo ci vuole per un sito?",
+    ],
+    "contact": [
+        "qual o whatsapp de vocês?", "como entro em contato com vocês?",
+        "what's your email?", "how can I contact you?",
+        "¿cuál es su whatsapp?", "come posso contattarvi?",
+    ],
+    "company": [
+        "quem são vocês?", "me fala sobre a empresa", "quando a empresa foi fundada?",
+        "who are you?", "tell me about your company",
+        "¿quiénes son ustedes?", "chi siete?",
+    ],
+    "tech_stack": [
+        "quais tecnologias vocês usam?", "qual a stack de vocês?",
+        "what technologies do you use?", "what is your tech stack?",
+        "¿qué tecnologías usan?", "quali tecnologie usate?",
+    ],
+    "lgpd": [
+        "vocês seguem a LGPD?", "como vocês tratam a privacidade dos dados?",
+        "are you GDPR compliant?", "how do you handle data protection?",
+        "¿cumplen con el RGPD?", "rispettate il GDPR?",
+    ],
+    "portfolio": [
+        "vocês têm portfólio?", "posso ver exemplos de trabalhos de vocês?",
+        "can I see your portfolio?", "do you have examples of previous work?",
+        "¿tienen portafolio?", "posso vedere esempi dei vostri lavori?",
+    ],
+}
+
+_INDEX: list = []  # [(category, vector)], built by build_index()
+
+
+def eligible(message: str) -> bool:
+    words = len((message or "").split())
+    return 0 < words <= config.FAQ_ROUTER_MAX_WORDS
+
+
+def match_keywords(message: str) -> str | None:
+    """The single category whose keywords match, or None (no match, or ambiguous: another
+    category's keywords or topic words match too)."""
+    text = cache.normalize_message(message)
+    hits = [cat for cat, rx in _COMPILED.items() if rx.search(text)]
+    if len(hits) != 1:
+        return None
+    if any(rx.search(text) for cat, rx in _TOPICS.items() if cat != hits[0]):
+        return None
+    return hits[0]
+
+
+def build_index(embed_fn) -> int:
+    """Embed every exemplar once (startup). Returns the index size."""
+    _INDEX[:] = [(cat, embed_fn(text)) for cat, texts in EXEMPLARS.items() for text in texts]
+    return len(_INDEX)
+
+
+def index_ready() -> bool:
+    return bool(_INDEX)
+
+
+def match_knn(query_vec: list) -> str | None:
+    """Category of the nearest exemplar, if it clears the threshold AND beats every other
+    category's nearest exemplar by the margin; else None."""
+    best: dict = {}
+    for cat, vec in _INDEX:
+        sim = cache._cosine(query_vec, vec)
+        if sim > best.get(cat, -1.0):
+            best[cat] = sim
+    if not best:
+        return None
+    ranked = sorted(best.items(), key=lambda kv: -kv[1])
+    cat, sim = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+    if sim >= config.FAQ_ROUTER_THRESHOLD and sim - runner_up >= config.FAQ_ROUTER_MARGIN:
+        return cat
+    return None
+
+
+def answer(category: str, language: str) -> dict:
+    """The canned answer for `category` in `language` (pt-BR if missing):
+    {text, intent, version} where version is "<category>.v<n>"."""
+    faq = FAQ_ANSWERS[category]
+    template = faq["answers"].get(language) or faq["answers"]["pt-BR"]
+    text = template.format(contact=config.WHATSAPP_CONTACT, email=CONTACT_EMAIL, booking=config.BOOKING_URL)
+    return {"text": text, "intent": faq["intent"], "version": f"{category}.v{faq['version']}"}
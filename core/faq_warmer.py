@@ -0,0 +1,196 @@
+"""
+Offline FAQ cache warmer (the "dynamic FAQ cache" of docs/cache-optimization-roadmap.md).
+
+Mines chat_logs for the most frequent FIRST-TURN questions per (language, page), clusters
+paraphrases with the same MiniLM embeddings the semantic cache uses, answers each cluster's
+most common phrasing through the normal graph, and seeds both the exact and the semantic
+cache with it — so the hottest questions are sub-second again right after a deploy or a KB
+change instead of waiting for organic traffic to re-warm them. Run on a schedule (see the
+Ansible cron) and after deploys:
+
+    docker exec chatbot_app python -m core.faq_warmer [--top-n 20] [--max-usd 0.20]
+
+Only first turns are mined: anonymous turns are always context-free, and for an identified
+user only their earliest logged turn is. Greetings/off-topic/handoff are skipped (they are
+canned or not worth caching), as are redacted messages (they carried PII).
+Generation is sequential and rate-limited, and stops at a USD budget.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+
+import config
+from core import cache
+from observability.analytics import QUESTION_INTENTS
+
+_REDACTED_MARK = "redacted]"
+
+
+def first_turn_stream(payloads) -> list:
+    """First-turn question messages in arrival order, as (language, page, message).
+    Also the replay input of evals/replay_semantic_cache.py."""
+    earliest: dict = {}
+    for p in payloads:
+        user_id = p.get("user_id")
+        if user_id in config.SHARED_USER_IDS:
+            continue
+        ts = p.get("timestamp") or 0
+        if user_id not in earliest or ts < earliest[user_id]:
+            earliest[user_id] = ts
+
+    stream = []
+    for p in sorted(payloads, key=lambda p: p.get("timestamp") or 0):
+        user_id = p.get("user_id")
+        if user_id not in config.SHARED_USER_IDS and (p.get("timestamp") or 0) != earliest.get(user_id):
+            continue
+        if p.get("intent") not in QUESTION_INTENTS:
+            continue
+        message = (p.get("user_input") or "").strip()
+        if not message or _REDACTED_MARK in message or not cache.normalize_message(message):
+            continue
+        stream.append((p.get("language") or "pt-BR", p.get("current_page") or "/", message))
+    return stream
+
+
+def first_turn_questions(payloads) -> dict:
+    """Group first-turn question messages by (language, page).
+
+    Returns {(language, page): Counter(normalized_message -> count)} plus, per normalized
+    message, the most common raw phrasing — the one that gets answered and cached.
+    """
+    counts: dict = defaultdict(Counter)
+    variants: dict = defaultdict(Counter)
+    for language, page, message in first_turn_stream(payloads):
+        normalized = cache.normalize_message(message)
+        counts[(language, page)][normalized] += 1
+        variants[normalized][message] += 1
+
+    phrasing = {norm: c.most_common(1)[0][0] for norm, c in variants.items()}
+    return {group: (counter, phrasing) for group, counter in counts.items()}
+
+
+def cluster_questions(counter: Counter, phrasing: dict, embed_fn, threshold: float) -> list:
+    """Greedy frequency-ordered clustering: each normalized question joins the first cluster
+    whose seed is >= threshold cosine-similar, else seeds a new one. Returns clusters
+    (most frequent first) as {question, count, vec}, where `question` is the seed's phrasing.
+    The raw phrasing is what gets embedded: the app embeds the visitor's message as typed, so
+    the seeded semantic vector must come from the same kind of text."""
+    clusters: list = []
+    for normalized, count in counter.most_common():
+        vec = embed_fn(phrasing[normalized])
+        for cluster in clusters:
+            if cache._cosine(vec, cluster["vec"]) >= threshold:
+                cluster["count"] += count
+                break
+        else:
+            clusters.append({"question": phrasing[normalized], "count": count, "vec": vec})
+    clusters.sort(key=lambda c: -c["count"])
+    return clusters
+
+
+def select_faqs(payloads, embed_fn, *, top_n: int, min_count: int, threshold: float) -> list:
+    """The top_n clusters per (language, page) asked at least min_count times."""
+    faqs = []
+    for (language, page), (counter, phrasing) in first_turn_questions(payloads).items():
+        clusters = cluster_questions(counter, phrasing, embed_fn, threshold)
+        for cluster in clusters[:top_n]:
+            if cluster["count"] >= min_count:
+                faqs.append({"language": language, "page": page, **cluster})
+    faqs.sort(key=lambda f: -f["count"])
+    return faqs
+
+
+async def _answer_through_graph(question: str, language: str, page: str) -> tuple:
+    """Run the normal graph for an anonymous first turn (see main._answer_anon_turn)."""
+    import main  # lazy: the app module pulls in FastAPI/the graph, only needed when warming
+
+    return await main._answer_anon_turn(question, language, page)
+
+
+async def warm(faqs: list, *, answer_fn=None, rate_per_minute: float = 6.0,
+               max_usd: float = 0.20, refresh: bool = False) -> dict:
+    """Answer each FAQ (sequentially, at most rate_per_minute) and seed both caches.
+    Questions already cached under the current KB version are skipped unless refresh=True
+    (so a KB change re-warms them). Stops once max_usd is spent."""
+    import main  # lazy, see _answer_through_graph
+
+    answer_fn = answer_fn or _answer_through_graph
+    interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+    summary = {"candidates": len(faqs), "seeded": 0, "skipped_cached": 0,
+               "skipped_uncacheable": 0, "spent_usd": 0.0, "budget_exhausted": False}
+    for i, faq in enumerate(faqs):
+        language, page, question = faq["language"], faq["page"], faq["question"]
+        key = main._exact_cache_key(question, language, page, "anon")
+        if not refresh and await cache.is_fresh(key):
+            summary["skipped_cached"] += 1
+            continue
+        if summary["spent_usd"] >= max_usd:
+            summary["budget_exhausted"] = True
+            break
+        if i and interval:
+            await asyncio.sleep(interval)
+
+        response_data, cost = await answer_fn(question, language, page)
+        summary["spent_usd"] += cost
+        if response_data is None:
+            summary["skipped_uncacheable"] += 1
+            continue
+        request = main._cache_request(question, language, page, "anon")
+        await main._seed_caches(request, response_data, faq["vec"])
+        summary["seeded"] += 1
+        logging.info("faq warmer: seeded %r (%s %s, asked %dx)", question[:60], language, page, faq["count"])
+    summary["spent_usd"] = round(summary["spent_usd"], 6)
+    return summary
+
+
+def _scan_first_turn_logs(client, window_days: int) -> list:
+    from observability.analytics import _scan_chat_logs
+
+    since = int(time.time()) - window_days * 86400 if window_days else None
+    return _scan_chat_logs(client, since)
+
+
+async def run(client, *, top_n: int, min_count: int, window_days: int, rate_per_minute: float,
+              max_usd: float, refresh: bool, dry_run: bool = False) -> dict:
+    from nodes.embeddings import EMBEDDING_MODEL_NAME, compute_embedding
+    from rag import ingest
+
+    # Tag what we seed (and judge what is already cached) with the KB/model the app runs
+    # under, as main's lifespan does; untagged entries would read as stale to the app.
+    try:
+        cache.set_kb_version(ingest.kb_version(), EMBEDDING_MODEL_NAME)
+    except OSError as exc:
+        logging.warning("faq warmer: KB version unavailable (cache versioning off): %s", exc)
+    payloads = await asyncio.to_thread(_scan_first_turn_logs, client, window_days)
+    faqs = select_faqs(payloads, compute_embedding, top_n=top_n, min_count=min_count,
+                       threshold=config.SEMANTIC_CACHE_THRESHOLD)
+    logging.info("faq warmer: %d FAQ clusters from %d logged turns", len(faqs), len(payloads))
+    if dry_run:
+        return {"candidates": len(faqs), "faqs": [
+            {k: f[k] for k in ("language", "page", "question", "count")} for f in faqs
+        ]}
+    return await warm(faqs, rate_per_minute=rate_per_minute, max_usd=max_usd, refresh=refresh)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    from rag.db import get_qdrant_client
+
+    ap = argparse.ArgumentParser(description="Seed the exact + semantic caches with the top FAQs.")
+    ap.add_argument("--top-n", type=int, default=config.FAQ_WARM_TOP_N, help="clusters per (language, page)")
+    ap.add_argument("--min-count", type=int, default=config.FAQ_WARM_MIN_COUNT)
+    ap.add_argument("--window-days", type=int, default=config.FAQ_WARM_WINDOW_DAYS)
+    ap.add_argument("--rate-per-minute", type=float, default=config.FAQ_WARM_RATE_PER_MINUTE)
+    ap.add_argument("--max-usd", type=float, default=config.FAQ_WARM_MAX_USD)
+    ap.add_argument("--refresh", action="store_true", help="regenerate even if already cached")
+    ap.add_argument("--dry-run", action="store_true", help="list the FAQs, don't call the LLM")
+    args = ap.parse_args()
+
+    print(asyncio.run(run(
+        get_qdrant_client(), top_n=args.top_n, min_count=args.min_count,
+        window_days=args.window_days, rate_per_minute=args.rate_per_minute,
+        max_usd=args.max_usd, refresh=args.refresh, dry_run=args.dry_run,
+    )))
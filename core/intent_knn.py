@@ -0,0 +1,125 @@
+"""Local intent classifier (#49): embedding kNN over curated exemplars, LLM only when unsure.
+
+Every graph turn used to spend a DeepSeek round trip on detect_intent, although most
+messages are unambiguous and the query is embedded anyway (semantic cache, retrieval — the
+vector is memoised per text, see nodes.embeddings). detect_intent now embeds the message,
+finds the nearest exemplar of each intent (same MiniLM vectors as the FAQ router) and
+answers locally when the best one clears INTENT_KNN_THRESHOLD and beats every other
+intent's best by INTENT_KNN_MARGIN. Anything less confident — mixed messages like "boa
+tarde, vocês fazem app?", typos far from every exemplar — goes to the LLM as before.
+
+Exemplars are curated per language (all four) and deliberately share no text with the
+messages in evals/intents.jsonl — after normalization no exemplar contains an eval message
+or is contained in one — so `python evals/run_intent_knn.py` measures coverage (the share
+of DeepSeek intent calls removed) and accuracy on unseen text.
+"""
+
+import config
+from core import cache
+
+EXEMPLARS = {
+    "greeting": {
+        "pt-BR": ["tudo bem?", "opa, tudo bom?", "fala, pessoal!", "salve, tudo certo?", "oie, como vai?"],
+        "en": ["hey!", "good morning", "good afternoon", "good evening!", "hey, how's it going?"],
+        "es": ["buenos días", "buenas noches", "¿qué tal?", "saludos, ¿cómo están?"],
+        "it": ["buonasera", "salve", "come va?", "ehi, come state?"],
+    },
+    "inquire_services": {
+        "pt-BR": ["vocês fazem sites?", "vocês desenvolvem loja virtual?", "quero automatizar meu atendimento",
+                  "vocês trabalham com inteligência artificial?", "fazem chatbot para whatsapp?",
+                  "vocês criam plataforma de cursos online?", "como funciona o desenvolvimento de um site?"],
+        "en": ["do you build websites?", "can you automate my sales process?", "do you make chatbots?",
+               "I need an online store", "do you do e-learning platforms?"],
+        "es": ["¿hacen páginas web?", "¿desarrollan tiendas online?", "necesito automatizar procesos",
+               "¿trabajan con inteligencia artificial?"],
+        "it": ["fate siti web?", "sviluppate e-commerce?", "mi serve un'automazione", "lavorate con l'intelligenza artificiale?"],
+    },
+    "request_quote": {
+        "pt-BR": ["quanto custa uma loja virtual?", "qual o valor de um chatbot?", "me passa um orçamento",
+                  "quanto vocês cobram por um site?"],
+        "en": ["how much does a website cost?", "what are your prices?", "can I get a quote?"],
+        "es": ["¿cuánto cuesta una web?", "¿cuál es el precio de una tienda online?", "quiero un presupuesto"],
+        "it": ["quanto costa un sito?", "qual è il prezzo di un e-commerce?", "vorrei un preventivo"],
+    },
+    "share_contact": {
+        "pt-BR": ["qual o telefone de vocês?", "me passa o email de vocês", "como entro em contato?"],
+        "en": ["what's your phone number?", "how can I contact you?", "what is your email?"],
+        "es": ["¿cuál es su teléfono?", "¿cómo los contacto?", "¿tienen whatsapp?"],
+        "it": ["qual è il vostro numero?", "come posso contattarvi?", "avete un'email?"],
+    },
+    "chat_with_agent": {
+        "pt-BR": ["quero falar com uma pessoa", "tem algum humano aí?", "me transfere para um atendente"],
+        "en": ["I want to talk to a human", "can I speak to a real person?", "connect me to an agent"],
+        "es": ["quiero hablar con una persona", "¿puedo hablar con un humano?", "pásame con un agente"],
+        "it": ["voglio parlare con una persona", "posso parlare con un operatore?", "passami un umano"],
+    },
+    "off_topic": {
+        "pt-BR": ["qual a previsão do tempo?", "quem ganhou o jogo ontem?", "me conta uma piada",
+                  "qual a capital da França?", "quanto é 5 vezes 3?"],
+        "en": ["what time is it?", "who won the game last night?", "tell me a joke", "what is the capital of Italy?"],
+        "es": ["¿qué tiempo hace hoy?", "cuéntame un chiste", "¿cuál es la capital de Francia?"],
+        "it": ["che tempo fa oggi?", "raccontami una barzelletta", "qual è la capitale della Spagna?"],
+    },
+}
+
+_INDEX: list = []  # [(intent, vector)], built by build_index()
+_stats = {"local": 0, "llm": 0, "by_intent": {}}
+
+
+def build_index(embed_fn) -> int:
+    """Embed every exemplar once (startup). Returns the index size."""
+    _INDEX[:] = [(intent, embed_fn(text))
+                 for intent, by_language in EXEMPLARS.items()
+                 for texts in by_language.values() for text in texts]
+    return len(_INDEX)
+
+
+def index_ready() -> bool:
+    return bool(_INDEX)
+
+
+def scores(query_vec: list) -> list:
+    """[(intent, best exemplar similarity)], most similar first."""
+    best: dict = {}
+    for intent, vec in _INDEX:
+        sim = cache._cosine(query_vec, vec)
+        if sim > best.get(intent, -1.0):
+            best[intent] = sim
+    return sorted(best.items(), key=lambda kv: -kv[1])
+
+
+def classify(query_vec: list, threshold: float | None = None, margin: float | None = None) -> str | None:
+    """The intent of the nearest exemplar if it clears the threshold AND beats every other
+    intent's nearest exemplar by the margin; else None (ask the LLM)."""
+    threshold = config.INTENT_KNN_THRESHOLD if threshold is None else threshold
+    margin = config.INTENT_KNN_MARGIN if margin is None else margin
+    ranked = scores(query_vec)
+    if not ranked:
+        return None
+    intent, sim = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+    if sim >= threshold and sim - runner_up >= margin:
+        return intent
+    return None
+
+
+def record(intent: str | None) -> None:
+    """Tally one detect_intent outcome: answered locally (`intent`) or by the LLM (None)."""
+    if intent is None:
+        _stats["llm"] += 1
+    else:
+        _stats["local"] += 1
+        _stats["by_intent"][intent] = _stats["by_intent"].get(intent, 0) + 1
+
+
+def get_stats() -> dict:
+    """Local vs LLM intent decisions and the share of LLM calls avoided, for /usage-report."""
+    total = _stats["local"] + _stats["llm"]
+    return {"enabled": config.INTENT_KNN_ENABLED, "exemplars": len(_INDEX),
+            "local": _stats["local"], "llm": _stats["llm"], "by_intent": dict(_stats["by_intent"]),
+            "coverage": round(_stats["local"] / total, 3) if total else None}
+
+
+def reset() -> None:
+    _stats["local"] = _stats["llm"] = 0
+    _stats["by_intent"] = {}
@@ -0,0 +1,63 @@
+"""Lexical fast path (#50): unambiguous greetings and "talk to a human" requests, pre-graph.
+
+Both already get canned replies (nodes.greeting.GREETINGS, nodes.handoff.HANDOFFS), but
+reaching them took a detect_intent LLM call, a LangGraph run with checkpoint
+serialization, and an embedded Qdrant log write. main now checks the message against the
+patterns below first and answers straight away; the log write is queued in the background.
+
+Patterns must match the WHOLE normalized message (accents, case and punctuation folded,
+emoji dropped), in all four languages, so anything carrying more than the greeting or the
+handoff ask — "boa tarde, vocês fazem apps?", "quero falar com alguém sobre um site" — is
+left to the graph. A miss costs a few regex checks.
+"""
+
+import re
+
+from core import cache
+
+_POLITE = r"(?: (?:por favor|please|per favore|pls|agora|now|ahora|adesso))?"
+_FILLER = (r"(?: (?:pessoal|gente|galera|everyone|all|there|team|folks|a todos|chicos|amigos|tutti|ragazzi|"
+           r"tudo bem|tudo bom|tudo certo|como vai|how are you|que tal|como estas|come va|come stai))*")
+
+PATTERNS = {
+    "greeting": [
+        r"(?:oi+|ola|ole|opa|eai|e ai|salve|bom dia|boa tarde|boa noite|hey|hi+|hello|hiya|howdy|"
+        r"good (?:morning|afternoon|evening)|hola|buenas|buenos dias|buenas (?:tardes|noches)|"
+        r"ciao|buongiorno|buon pomeriggio|buonasera|buona sera)" + _FILLER,
+        r"(?:tudo bem|tudo bom|how are you|que tal|come va)",
+    ],
+    "chat_with_agent": [
+        r"(?:(?:eu )?(?:quero|queria|preciso|gostaria de|posso) )?"
+        r"(?:falar|conversar) com (?:um |uma |o |a |algum |alguma )?(?:atendente|humano|pessoa(?: de verdade| real)?|"
+        r"consultor|vendedor|especialista)" + _POLITE,
+        r"(?:atendimento humano|atendente)" + _POLITE,
+        r"(?:(?:i )?(?:want|need|would like) to |i'd like to |can i |could i |let me )?"
+        r"(?:talk|speak|chat) (?:to|with) (?:a |an |someone |somebody )?(?:real )?(?:human|person|agent|representative|operator)"
+        + _POLITE,
+        r"(?:human|real person|live agent)" + _POLITE,
+        r"(?:(?:quiero|necesito|quisiera|puedo) )?hablar con (?:un |una |alguna )?(?:persona(?: real)?|humano|agente|asesor)"
+        + _POLITE,
+        r"(?:(?:voglio|vorrei|devo|posso) )?parlare con (?:un |una |un')?(?:persona(?: vera| reale)?|umano|operatore|consulente)"
+        + _POLITE,
+    ],
+}
+
+_COMPILED = {intent: re.compile("^(?:" + "|".join(pats) + ")$") for intent, pats in PATTERNS.items()}
+_NON_WORD = re.compile(r"[^\w' ]+")
+_SPACES = re.compile(r"\s+")
+
+
+def _normalize(message: str) -> str:
+    text = _NON_WORD.sub(" ", cache.normalize_message(message))
+    return _SPACES.sub(" ", text).strip()
+
+
+def match(message: str) -> str | None:
+    """"greeting" / "chat_with_agent" when the whole message is one, else None."""
+    text = _normalize(message)
+    if not text or len(text) > 80:
+        return None
+    for intent, rx in _COMPILED.items():
+        if rx.match(text):
+            return intent
+    return None
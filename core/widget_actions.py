@@ -0,0 +1,65 @@
+"""Registry of the widget's canned button messages (core/widget_actions.json).
+
+Buttons like "Ver serviços" post a fixed text (and no language). They used to run the full
+path — language resolution, intent detection, retrieval, generation, revision — for an
+answer that never changes. The registry maps each known label (in any of the four
+languages) to an action with precomputed, pre-split `response_parts` per language and per
+page, so main serves it with no LLM, embedding or Qdrant call.
+
+Labels are compared after cache.normalize_message (case, accents, trailing punctuation), so
+"Ver serviços" and "ver servicos" are the same button. Loaded at startup (main.lifespan);
+match() loads lazily if that hasn't happened. Edit the JSON and bump `version` to change a
+reply — the version is returned as `widget_version`.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+
+from core import cache
+
+REGISTRY_PATH = Path(__file__).with_name("widget_actions.json")
+DEFAULT_LANGUAGE = "pt-BR"
+
+# A leading locale segment on localized pages: "/en/websites" -> "/websites".
+_LOCALE_PREFIX = re.compile(r"^/(?:pt-br|pt|en|es|it)(?=/|$)", re.IGNORECASE)
+
+_REGISTRY: dict = {"version": None, "actions": {}, "labels": {}}
+
+
+def load(path: Path = REGISTRY_PATH) -> int:
+    """(Re)load the registry. Every action needs a pt-BR reply and every language a "default"
+    one (the fallback for pages it doesn't cover). Returns the number of labels indexed."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    labels = {}
+    for action_id, action in data["actions"].items():
+        responses = action["responses"]
+        if DEFAULT_LANGUAGE not in responses or any("default" not in r for r in responses.values()):
+            raise ValueError(f"widget action {action_id!r} needs {DEFAULT_LANGUAGE} and a default reply per language")
+        for label in action["labels"]:
+            labels[cache.normalize_message(label)] = action_id
+    _REGISTRY.update(version=data.get("version"), actions=data["actions"], labels=labels)
+    return len(labels)
+
+
+def match(message: str) -> str | None:
+    """The action id for a known button text, else None."""
+    if _REGISTRY["version"] is None:
+        try:
+            load()
+        except (OSError, ValueError, KeyError) as exc:
+            logging.warning("widget action registry unavailable: %s", exc)
+            _REGISTRY["version"] = 0  # don't retry on every request
+    return _REGISTRY["labels"].get(cache.normalize_message(message or ""))
+
+
+def response(action_id: str, language: str, current_page: str) -> dict:
+    """{parts, intent, version} for the action, picking the page-specific reply when there
+    is one (with or without a locale prefix) and falling back to the language's default,
+    then to pt-BR."""
+    action = _REGISTRY["actions"][action_id]
+    by_page = action["responses"].get(language) or action["responses"][DEFAULT_LANGUAGE]
+    page = current_page or "/"
+    parts = by_page.get(page) or by_page.get(_LOCALE_PREFIX.sub("", page) or "/") or by_page["default"]
+    return {"parts": list(parts), "intent": action["intent"], "version": f"{action_id}.v{_REGISTRY['version']}"}
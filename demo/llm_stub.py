@@ -0,0 +1,290 @@
+"""
+Stand-in for an OpenAI-compatible /v1/chat/completions API (DeepSeek), for offline load and
+latency testing only.
+
+Point the app at it and every LLM call stays on this box — no credit burned, no network:
+
+    python demo/llm_stub.py --latency lognormal:800:0.5 --error-rate 0.02
+    DEEPSEEK_API_URL=http://localhost:3020/v1/chat/completions uvicorn main:app
+
+What it answers, so each code path gets exercised:
+  - response_format json_object  -> {"intent": ...} guessed from keywords (intent node)
+  - tools offered + a matching ask -> a tool call (handoff / schedule / lead), then text
+  - anything else                -> a short canned text; `stream: true` sends it as SSE deltas
+  - every response has a `usage` block, including DeepSeek's prompt_cache_hit/miss split,
+    simulated per 64-token prefix block, so prompt-prefix work can be measured
+  - max_tokens and stop are honoured (finish_reason "length" / "stop")
+
+Latency: --latency fixed:MS | uniform:LO:HI | lognormal:MEDIAN_MS:SIGMA is the time to the
+first byte; --token-ms spaces out streamed deltas. Errors: --error-rate with --error-status
+(comma list, one picked at random) and --hang-rate (sleeps --hang-seconds, for timeouts).
+Per request, X-Stub-Latency-Ms / X-Stub-Status headers override both (deterministic tests).
+GET /v1/models answers too (evals/bench_llm_pool.py). Stdlib only, like crm_stub.py.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX_BLOCK_CHARS = 256  # ~64 tokens, DeepSeek's cache granularity
+PREFIX_CACHE_SIZE = 50_000
+
+_INTENT_KEYWORDS = [
+    ("chat_with_agent", r"humano|atendente|pessoa|human|person|agent|persona|umano"),
+    ("share_contact", r"whatsapp|telefone|email|contato|contact|phone|contatto"),
+    ("request_quote", r"quanto custa|pre[cç]o|or[cç]amento|how much|price|cost|cu[aá]nto|prezzo"),
+    ("greeting", r"\"?(oi|ol[aá]|hi|hello|hey|hola|ciao|bom dia|boa tarde|boa noite|buongiorno)\W*\"?$"),
+]
+_USER_MESSAGE = re.compile(r'user message:\s*"(.*)"')
+_QUOTED = re.compile(r'"([^"\n]*)"')
+# (tool, trigger, arguments) — arguments satisfy agents/tools.py's schemas.
+_TOOL_KEYWORDS = [
+    ("handoff_to_human", r"humano|atendente|falar com|talk to|human|persona|umano",
+     lambda text: {"reason": "user asked for a person"}),
+    ("schedule_meeting", r"agendar|reuni[aã]o|schedule|meeting|reuni[oó]n|riunione",
+     lambda text: {"description": text[:200]}),
+    ("create_lead", r"meu nome|my name|me llamo|mi chiamo",
+     lambda text: {"business_name": "Stub Lead", "description": text[:200]}),
+]
+REPLY = ("Podemos ajudar com sites, automações e soluções de IA sob medida. Conte um pouco mais "
+         "sobre o seu projeto e eu indico o melhor caminho para começar.")
+
+
+def parse_latency(spec: str):
+    """A sampler (seconds) for fixed:MS, uniform:LO:HI or lognormal:MEDIAN_MS:SIGMA."""
+    kind, *args = spec.split(":")
+    nums = [float(a) for a in args]
+    if kind == "fixed":
+        return lambda: nums[0] / 1000
+    if kind == "uniform":
+        return lambda: random.uniform(nums[0], nums[1]) / 1000
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(nums[0]), nums[1]) / 1000
+    raise ValueError(f"unknown latency distribution {spec!r}")
+
+
+class PrefixCache:
+    """Simulates DeepSeek's context cache: a prompt's leading 64-token blocks seen before hit."""
+
+    def __init__(self, size: int = PREFIX_CACHE_SIZE):
+        self.seen: OrderedDict = OrderedDict()
+        self.size = size
+        self.lock = threading.Lock()
+
+    def hit_tokens(self, text: str) -> int:
+        blocks = len(text) // PREFIX_BLOCK_CHARS
+        digest = hashlib.sha256()
+        hits, still_hitting = 0, True
+        with self.lock:
+            for i in range(blocks):
+                digest.update(text[i * PREFIX_BLOCK_CHARS:(i + 1) * PREFIX_BLOCK_CHARS].encode())
+                key = digest.copy().hexdigest()
+                if still_hitting and key in self.seen:
+                    hits += 1
+                    self.seen.move_to_end(key)
+                else:
+                    still_hitting = False
+                    self.seen[key] = True
+            while len(self.seen) > self.size:
+                self.seen.popitem(last=False)
+        return hits * PREFIX_BLOCK_CHARS // 4
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _last_user(messages: list) -> str:
+    for m in reversed(messages):
+        if m.get("role") == "user" and isinstance(m.get("content"), str):
+            return m["content"]
+    return ""
+
+
+def _intent_message(prompt: str) -> str:
+    """The user's text inside an intent prompt: the Langfuse prompt quotes it on a
+    `User message: "..."` line, the local fallback (nodes/intent.py) in the first line's
+    quotes — the rest of the prompt (the intent list names chat_with_agent) must not be read."""
+    for rx in (_USER_MESSAGE, _QUOTED):
+        found = rx.search(prompt)
+        if found:
+            return found.group(1)
+    return prompt.strip().splitlines()[-1] if prompt.strip() else ""
+
+
+def plan_reply(body: dict) -> dict:
+    """{"content": str} or {"tool_call": (name, args)} for a request body."""
+    messages = body.get("messages") or []
+    text = _last_user(messages).lower()
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        message = _intent_message(text)
+        intent = next((i for i, rx in _INTENT_KEYWORDS if re.search(rx, message)), "inquire_services")
+        return {"content": json.dumps({"intent": intent})}
+    if body.get("tools") and messages and messages[-1].get("role") != "tool":
+        offered = {t.get("function", {}).get("name") for t in body["tools"]}
+        for name, rx, arguments in _TOOL_KEYWORDS:
+            if name in offered and re.search(rx, text):
+                return {"tool_call": (name, arguments(text))}
+    return {"content": REPLY}
+
+
+def apply_limits(content: str, body: dict) -> tuple:
+    """(content, finish_reason) after stop sequences and max_tokens."""
+    for stop in body.get("stop") or []:
+        if stop and stop in content:
+            content = content[:content.index(stop)]
+    max_tokens = body.get("max_tokens")
+    if max_tokens and _tokens(content) > max_tokens:
+        return content[:max_tokens * 4], "length"
+    return content, "stop"
+
+
+class Stub:
+    def __init__(self, latency, token_seconds=0.0, error_rate=0.0, error_statuses=(503,),
+                 hang_rate=0.0, hang_seconds=60.0):
+        self.latency = latency
+        self.token_seconds = token_seconds
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.cache = PrefixCache()
+
+    def usage(self, body: dict, completion: str) -> dict:
+        prompt = json.dumps(body.get("tools") or [], ensure_ascii=False) + json.dumps(
+            body.get("messages") or [], ensure_ascii=False)
+        prompt_tokens = _tokens(prompt)
+        hit = min(self.cache.hit_tokens(prompt), prompt_tokens)
+        completion_tokens = _tokens(completion) if completion else 0
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_cache_hit_tokens": hit, "prompt_cache_miss_tokens": prompt_tokens - hit}
+
+
+def make_handler(stub: Stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients are measured fairly
+
+        def _json(self, code, obj):
+            data = json.dumps(obj).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/") in ("/models", "/v1/models"):
+                self._json(200, {"object": "list", "data": [{"id": "stub-model", "object": "model"}]})
+            else:
+                self._json(200, {"ok": True})
+
+        def do_POST(self):
+            if self.path.rstrip("/") not in ("/chat/completions", "/v1/chat/completions"):
+                self._json(404, {"error": {"message": "not found"}})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._json(400, {"error": {"message": "invalid JSON body"}})
+                return
+
+            forced = self.headers.get("X-Stub-Latency-Ms")
+            time.sleep(float(forced) / 1000 if forced else stub.latency())
+            status = self.headers.get("X-Stub-Status")
+            if status is None and random.random() < stub.error_rate:
+                status = random.choice(stub.error_statuses)
+            if status is not None and int(status) != 200:
+                self._json(int(status), {"error": {"message": "injected failure", "type": "stub"}})
+                return
+            if forced is None and random.random() < stub.hang_rate:
+                time.sleep(stub.hang_seconds)
+
+            plan = plan_reply(body)
+            model = body.get("model") or "stub-model"
+            if "tool_call" in plan:
+                name, args = plan["tool_call"]
+                message = {"role": "assistant", "content": None, "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(args, ensure_ascii=False)}}]}
+                content, finish = "", "tool_calls"
+            else:
+                content, finish = apply_limits(plan["content"], body)
+                message = {"role": "assistant", "content": content}
+            usage = stub.usage(body, content)
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:16]}"
+
+            if not body.get("stream"):
+                self._json(200, {"id": completion_id, "object": "chat.completion", "created": int(time.time()),
+                                 "model": model, "choices": [{"index": 0, "message": message,
+                                                              "finish_reason": finish}],
+                                 "usage": usage})
+                return
+            self._stream(completion_id, model, message, finish, usage,
+                         (body.get("stream_options") or {}).get("include_usage"))
+
+        def _stream(self, completion_id, model, message, finish, usage, include_usage):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            def send(chunk):
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+
+            base = {"id": completion_id, "object": "chat.completion.chunk", "model": model}
+            if message.get("tool_calls"):
+                calls = [{"index": i, **call} for i, call in enumerate(message["tool_calls"])]
+                send({**base, "choices": [{"index": 0, "delta": {"tool_calls": calls}, "finish_reason": None}]})
+            for i, word in enumerate(re.findall(r"\S+\s*", message.get("content") or "")):
+                if i and stub.token_seconds:
+                    time.sleep(stub.token_seconds)
+                send({**base, "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]})
+            send({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": finish}]})
+            if include_usage:
+                send({**base, "choices": [], "usage": usage})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def log_message(self, *args):
+            pass  # quiet
+
+    return Handler
+
+
+def serve(stub: Stub, host: str = "0.0.0.0", port: int = 3020) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(stub))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local OpenAI-compatible LLM stub.")
+    ap.add_argument("--port", type=int, default=3020)
+    ap.add_argument("--latency", default="lognormal:600:0.4", help="fixed:MS | uniform:LO:HI | lognormal:MEDIAN_MS:SIGMA")
+    ap.add_argument("--token-ms", type=float, default=15.0, help="delay between streamed deltas")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--error-status", default="503", help="comma list of injected statuses, e.g. 503,429,402")
+    ap.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that stall (timeouts)")
+    ap.add_argument("--hang-seconds", type=float, default=60.0)
+    args = ap.parse_args()
+    stub = Stub(parse_latency(args.latency), args.token_ms / 1000, args.error_rate,
+                [int(s) for s in args.error_status.split(",") if s.strip()], args.hang_rate, args.hang_seconds)
+    print(f"LLM stub listening on :{args.port} (latency {args.latency}, error rate {args.error_rate})")
+    serve(stub, port=args.port).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
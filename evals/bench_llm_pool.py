@@ -0,0 +1,98 @@
+"""
+LLM transport benchmark (#36): per-call latency with a fresh client per call vs the pooled
+keep-alive HTTP/2 client main.lifespan now holds (providers/deepseek_client.build_client).
+
+A chat turn makes several sequential provider calls (intent, generation, revision, plus
+tool-loop rounds and the judge). With a client per call each one paid DNS + TCP + TLS before
+sending a byte; pooled, only the first call of the process does. This replays `--turns`
+turns of `--calls` sequential requests in both modes against the provider's model listing
+(authenticated, but no tokens billed) and reports per-call latency and the time saved per
+turn.
+
+    python evals/bench_llm_pool.py [--turns 10] [--calls 4] [--url https://api.deepseek.com/models]
+
+Point --url at any OpenAI-compatible endpoint to compare offline, e.g. demo/llm_stub.py
+(`--url http://localhost:3020/v1/models`).
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+import config  # noqa: E402
+from providers import deepseek_client  # noqa: E402
+
+
+def _default_url() -> str:
+    base = config.DEEPSEEK_API_URL.rsplit("/chat/completions", 1)[0]
+    return base.rsplit("/v1", 1)[0] + "/models"
+
+
+async def run_turns(url: str, headers: dict, *, turns: int, calls: int, pooled: bool,
+                    client_factory=deepseek_client.build_client) -> list:
+    """Per-call latencies (ms) over `turns` x `calls` sequential GETs."""
+    samples = []
+    shared = client_factory() if pooled else None
+    try:
+        for _ in range(turns):
+            for _ in range(calls):
+                start = time.perf_counter()
+                if shared is not None:
+                    resp = await shared.get(url, headers=headers)
+                else:
+                    async with httpx.AsyncClient(timeout=deepseek_client.DEFAULT_TIMEOUT) as client:
+                        resp = await client.get(url, headers=headers)
+                resp.raise_for_status()
+                samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        if shared is not None:
+            await shared.aclose()
+    return samples
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+    }
+
+
+async def _bench(args) -> int:
+    headers = {"Authorization": f"Bearer {config.DEEPSEEK_API_KEY}"}
+    fresh = summarize(await run_turns(args.url, headers, turns=args.turns, calls=args.calls, pooled=False))
+    pooled = summarize(await run_turns(args.url, headers, turns=args.turns, calls=args.calls, pooled=True))
+    print(f"{args.url}  ({args.turns} turns x {args.calls} calls, http2={config.LLM_HTTP2})")
+    print(f"  {'mode':<8}{'calls':>7}{'mean':>10}{'p50':>10}{'p95':>10}")
+    for name, row in (("fresh", fresh), ("pooled", pooled)):
+        print(f"  {name:<8}{row['calls']:>7}{row['mean_ms']:>8.1f}ms{row['p50_ms']:>8.1f}ms{row['p95_ms']:>8.1f}ms")
+    saved = fresh["mean_ms"] - pooled["mean_ms"]
+    print(f"\nsaved per call: {saved:.1f} ms  |  per {args.calls}-call turn: {saved * args.calls:.1f} ms")
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Compare per-call vs pooled LLM transport latency.")
+    ap.add_argument("--url", default=_default_url(), help="endpoint to GET (default: the provider's /models)")
+    ap.add_argument("--turns", type=int, default=10)
+    ap.add_argument("--calls", type=int, default=4, help="sequential provider calls per chat turn")
+    args = ap.parse_args()
+    try:
+        return asyncio.run(_bench(args))
+    except httpx.HTTPError as exc:
+        print(f"endpoint unreachable: {exc}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
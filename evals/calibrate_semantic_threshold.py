@@ -0,0 +1,137 @@
+"""
+Semantic-cache threshold calibration (#33): hit rate vs false-hit rate, per language.
+
+SEMANTIC_CACHE_THRESHOLD was a guessed 0.92. This embeds labelled question pairs with the
+production model (nodes.compute_embedding) and, per language, sweeps the threshold:
+
+  - hit rate:        share of PARAPHRASE pairs whose similarity clears it (LLM calls saved)
+  - false-hit rate:  share of NON-paraphrase pairs that clear it (wrong answers served)
+
+Pairs come from evals/semantic_pairs.jsonl (curated paraphrases + hard negatives such as
+"quanto custa um site" vs "... um e-commerce") plus automatic negatives seeded from
+evals/intents.jsonl (messages with different expected intents) and evals/rag.jsonl
+(different KB questions). Add your own with --pairs (same JSONL shape: a, b, language,
+paraphrase).
+
+    python evals/calibrate_semantic_threshold.py [--max-false-hit 0.0] [--csv curve.csv]
+
+Prints a text curve per language and the recommended threshold — the lowest one whose
+false-hit rate stays within --max-false-hit — ready for SEMANTIC_CACHE_THRESHOLDS. No LLM
+calls, so it's free to run.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import config  # noqa: E402
+from core import cache  # noqa: E402
+
+EVALS = Path(__file__).resolve().parent
+STEPS = [round(0.70 + i * 0.01, 2) for i in range(30)]  # 0.70 .. 0.99
+
+
+def _read_jsonl(path: Path) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def seeded_negatives(intents: list, rag: list) -> list:
+    """Same-language pairs that must never share a cached answer: messages labelled with
+    different intents, and distinct KB questions (each needs its own facts)."""
+    pairs = []
+    for x, y in itertools.combinations(intents, 2):
+        if x["language"] == y["language"] and x["expected"] != y["expected"]:
+            pairs.append({"a": x["message"], "b": y["message"], "language": x["language"], "paraphrase": False})
+    for x, y in itertools.combinations(rag, 2):
+        if x["language"] == y["language"]:
+            pairs.append({"a": x["question"], "b": y["question"], "language": x["language"], "paraphrase": False})
+    return pairs
+
+
+def load_pairs(extra: list = ()) -> list:
+    pairs = _read_jsonl(EVALS / "semantic_pairs.jsonl")
+    pairs += seeded_negatives(_read_jsonl(EVALS / "intents.jsonl"), _read_jsonl(EVALS / "rag.jsonl"))
+    for path in extra:
+        pairs += _read_jsonl(Path(path))
+    return pairs
+
+
+def score_pairs(pairs: list, embed_fn) -> dict:
+    """{language: {"pos": [sim, ...], "neg": [sim, ...]}} — each distinct text embedded once."""
+    vectors: dict = {}
+    by_language: dict = defaultdict(lambda: {"pos": [], "neg": []})
+    for pair in pairs:
+        for text in (pair["a"], pair["b"]):
+            if text not in vectors:
+                vectors[text] = embed_fn(text)
+        sim = cache._cosine(vectors[pair["a"]], vectors[pair["b"]])  # the similarity the cache thresholds
+        by_language[pair["language"]]["pos" if pair["paraphrase"] else "neg"].append(sim)
+    return dict(by_language)
+
+
+def sweep(pos: list, neg: list, steps: list = STEPS) -> list:
+    """[{threshold, hit_rate, false_hit_rate}] — None where a side has no pairs."""
+    return [{
+        "threshold": t,
+        "hit_rate": round(sum(s >= t for s in pos) / len(pos), 3) if pos else None,
+        "false_hit_rate": round(sum(s >= t for s in neg) / len(neg), 3) if neg else None,
+    } for t in steps]
+
+
+def recommend(curve: list, max_false_hit: float) -> float | None:
+    """Lowest threshold within the false-hit budget (= highest hit rate under it)."""
+    for row in curve:
+        if row["false_hit_rate"] is not None and row["false_hit_rate"] <= max_false_hit:
+            return row["threshold"]
+    return None
+
+
+def _bar(rate: float | None, width: int = 30) -> str:
+    return "-" * width if rate is None else ("#" * round(rate * width)).ljust(width)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Calibrate the semantic-cache threshold per language.")
+    ap.add_argument("--pairs", action="append", default=[], help="extra labelled pairs JSONL (repeatable)")
+    ap.add_argument("--max-false-hit", type=float, default=0.0,
+                    help="tolerated share of non-paraphrase pairs served from cache")
+    ap.add_argument("--csv", help="write the full curve (language, threshold, rates) here")
+    args = ap.parse_args()
+
+    from nodes import compute_embedding
+
+    scores = score_pairs(load_pairs(args.pairs), compute_embedding)
+    recommended, rows = {}, []
+    for language, sims in sorted(scores.items()):
+        curve = sweep(sims["pos"], sims["neg"])
+        rec = recommend(curve, args.max_false_hit)
+        print(f"\n{language}: {len(sims['pos'])} paraphrase / {len(sims['neg'])} non-paraphrase pairs")
+        print(f"  thr   hit rate{' ' * 24}false-hit rate")
+        for row in curve:
+            mark = "  <- recommended" if row["threshold"] == rec else ""
+            print(f"  {row['threshold']:.2f}  {_bar(row['hit_rate'])}  {_bar(row['false_hit_rate'])}{mark}")
+            rows.append({"language": language, **row})
+        if rec is not None and sims["pos"]:
+            recommended[language] = rec
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["language", "threshold", "hit_rate", "false_hit_rate"])
+            writer.writeheader()
+            writer.writerows(rows)
+    print(f"\ncurrent: SEMANTIC_CACHE_THRESHOLD={config.SEMANTIC_CACHE_THRESHOLD} "
+          f"SEMANTIC_CACHE_THRESHOLDS={config.SEMANTIC_CACHE_THRESHOLDS}")
+    print("recommended: SEMANTIC_CACHE_THRESHOLDS=" + ",".join(f"{k}:{v}" for k, v in recommended.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
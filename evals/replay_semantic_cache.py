@@ -0,0 +1,104 @@
+"""
+Semantic-cache eviction replay (#31): hit rate of the TinyLFU-style policy vs recency-only.
+
+Replays historical first-turn questions (the only turns the semantic cache serves) in
+arrival order through in-memory per-(language, page) buckets, using the production
+embedding model, similarity threshold and the same eviction code as core/cache.py
+(evict_entries / touch_entry). A hit counts when the best cached vector clears the
+threshold; a miss "answers" the question and inserts it, evicting per the policy.
+
+    python evals/replay_semantic_cache.py [--window-days 30] [--sizes 10,25,50]
+    python evals/replay_semantic_cache.py --file chat_logs.jsonl   # exported payloads, no Qdrant
+
+Prints one row per (policy, bucket size). It never calls the LLM, so it's free to run.
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import config  # noqa: E402
+from core import cache  # noqa: E402
+from core.faq_warmer import first_turn_stream  # noqa: E402
+
+
+def replay(stream: list, embed_fn, *, max_entries: int, threshold: float, policy: str,
+           window_ratio: float = config.SEMANTIC_CACHE_WINDOW_RATIO) -> dict:
+    """Run `stream` [(language, page, message)] through fresh buckets; returns hit stats."""
+    buckets: dict = defaultdict(list)
+    hits = evictions = 0
+    for language, page, message in stream:
+        entries = buckets[(language, page)]
+        vec = embed_fn(message)
+        best, best_sim = None, -1.0
+        for entry in entries:
+            sim = cache._cosine(vec, entry["vec"])
+            if sim > best_sim:
+                best, best_sim = entry, sim
+        if best is not None and best_sim >= threshold:
+            hits += 1
+            cache.touch_entry(entries, best)
+            continue
+        entries.append({"vec": vec, "hits": 0})
+        buckets[(language, page)], evicted = cache.evict_entries(entries, max_entries, policy, window_ratio)
+        evictions += evicted
+    lookups = len(stream)
+    return {"policy": policy, "max_entries": max_entries, "lookups": lookups, "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0, "evictions": evictions}
+
+
+def _memoized(embed_fn):
+    """Embed each distinct normalized message once — replays repeat the same questions a lot."""
+    seen: dict = {}
+
+    def embed(message: str) -> list:
+        key = cache.normalize_message(message)
+        if key not in seen:
+            seen[key] = embed_fn(message)
+        return seen[key]
+
+    return embed
+
+
+def _load_payloads(args) -> list:
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    from observability.analytics import _scan_chat_logs
+    from rag.db import get_qdrant_client
+
+    since = int(time.time()) - args.window_days * 86400 if args.window_days else None
+    return _scan_chat_logs(get_qdrant_client(), since)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Replay first-turn questions through semantic-cache eviction policies.")
+    ap.add_argument("--file", help="JSONL of chat_logs payloads (default: scan Qdrant)")
+    ap.add_argument("--window-days", type=int, default=30)
+    ap.add_argument("--sizes", default=str(config.SEMANTIC_CACHE_MAX_ENTRIES),
+                    help="comma-separated bucket sizes to compare")
+    ap.add_argument("--threshold", type=float, default=config.SEMANTIC_CACHE_THRESHOLD)
+    ap.add_argument("--window-ratio", type=float, default=config.SEMANTIC_CACHE_WINDOW_RATIO)
+    args = ap.parse_args()
+
+    from nodes import compute_embedding
+
+    stream = first_turn_stream(_load_payloads(args))
+    print(f"{len(stream)} first-turn questions in {len({(l, p) for l, p, _ in stream})} buckets")
+    embed = _memoized(compute_embedding)
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        for policy in cache.SEMANTIC_EVICTION_POLICIES:
+            row = replay(stream, embed, max_entries=size, threshold=args.threshold,
+                         policy=policy, window_ratio=args.window_ratio)
+            print(json.dumps(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Local intent classifier report (#49): how many DeepSeek intent calls the kNN removes, and
+how often it is right when it answers.
+
+Builds the exemplar index exactly as startup does (core/intent_knn.py, production MiniLM
+model via nodes.compute_embedding), classifies every labelled message in
+evals/intents.jsonl (plus any --dataset files, same JSONL shape: message, language,
+expected) and reports:
+
+  - coverage:  share of messages answered locally = share of LLM intent calls removed
+  - accuracy:  share of those local answers matching the label (a wrong local answer is a
+               misrouted turn the LLM would likely have got right)
+
+per language and per intent at the configured INTENT_KNN_THRESHOLD / INTENT_KNN_MARGIN,
+then a threshold sweep so both knobs can be tuned against the same data:
+
+    python evals/run_intent_knn.py [--min-accuracy 0.95] [--dataset more.jsonl]
+
+No LLM calls, so it's free to run. Exits non-zero if local accuracy < --min-accuracy.
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import config  # noqa: E402
+from core import intent_knn  # noqa: E402
+
+EVALS = Path(__file__).resolve().parent
+STEPS = [round(0.70 + i * 0.02, 2) for i in range(15)]  # 0.70 .. 0.98
+
+
+def _read_jsonl(path: Path) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(rows: list, vectors: dict, threshold: float, margin: float) -> dict:
+    """{"covered", "correct", "total"} plus the same per language / per expected intent, and
+    the wrong local answers."""
+    totals = {"covered": 0, "correct": 0, "total": 0}
+    groups: dict = defaultdict(lambda: {"covered": 0, "correct": 0, "total": 0})
+    wrong = []
+    for r in rows:
+        got = intent_knn.classify(vectors[r["message"]], threshold=threshold, margin=margin)
+        for bucket in (totals, groups[f"language {r.get('language', 'pt-BR')}"], groups[f"intent {r['expected']}"]):
+            bucket["total"] += 1
+            bucket["covered"] += got is not None
+            bucket["correct"] += got == r["expected"]
+        if got is not None and got != r["expected"]:
+            wrong.append((r["message"], r["expected"], got))
+    return {**totals, "groups": dict(groups), "wrong": wrong}
+
+
+def _rates(b: dict) -> str:
+    coverage = b["covered"] / b["total"] if b["total"] else 0.0
+    accuracy = f"{b['correct'] / b['covered']:.1%}" if b["covered"] else "  n/a"
+    return f"coverage {b['covered']:>3}/{b['total']:<3} = {coverage:6.1%}   local accuracy {accuracy}"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Coverage/accuracy of the local intent classifier.")
+    ap.add_argument("--dataset", action="append", default=[], help="extra labelled JSONL (repeatable)")
+    ap.add_argument("--min-accuracy", type=float, default=0.95)
+    args = ap.parse_args()
+
+    from nodes import compute_embedding
+
+    rows = _read_jsonl(EVALS / "intents.jsonl")
+    for path in args.dataset:
+        rows += _read_jsonl(Path(path))
+    print(f"indexed {intent_knn.build_index(compute_embedding)} exemplars; {len(rows)} labelled messages")
+    vectors = {r["message"]: compute_embedding(r["message"]) for r in rows}
+
+    threshold, margin = config.INTENT_KNN_THRESHOLD, config.INTENT_KNN_MARGIN
+    result = evaluate(rows, vectors, threshold, margin)
+    print(f"\nINTENT_KNN_THRESHOLD={threshold} INTENT_KNN_MARGIN={margin}")
+    print(f"  all               {_rates(result)}")
+    for name, bucket in sorted(result["groups"].items()):
+        print(f"  {name:<18}{_rates(bucket)}")
+    for message, expected, got in result["wrong"]:
+        print(f"  WRONG: {message!r}  expected={expected}  got={got}")
+    print(f"  -> {result['covered'] / len(rows):.1%} of DeepSeek intent calls removed" if rows else "")
+
+    print(f"\nsweep (margin {margin}):")
+    for t in STEPS:
+        row = evaluate(rows, vectors, t, margin)
+        mark = "  <- current" if t == threshold else ""
+        print(f"  {t:.2f}  {_rates(row)}{mark}")
+
+    accuracy = result["correct"] / result["covered"] if result["covered"] else 1.0
+    if accuracy < args.min_accuracy:
+        print(f"LOCAL ACCURACY BELOW {args.min_accuracy:.0%} — raise INTENT_KNN_THRESHOLD / _MARGIN or curate exemplars")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
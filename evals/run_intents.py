@@ -12,12 +12,20 @@ Calls the DeepSeek API, so it needs a real key. Run locally or in a gated CI job
 
 Exits non-zero if accuracy < threshold, so it can gate a build (this is what #11 wires
 into CI).
+
+`--mode fused` instead runs the fused single-call mode (#48, nodes/fused.py): the real
+generation request (system prompt, tool specs + route_intent) per message, scored on
+routing — did greetings and handoff requests get routed to their canned reply, and did
+nothing else? `--mode both` runs the two side by side and also reports routing accuracy,
+LLM calls per turn, call latency and prompt tokens for the classifier, to compare the cost
+of the modes (the gate then applies to each mode's own accuracy).
 """
 
 import argparse
 import json
 import os
 import sys
+import time
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent.parent
@@ -25,7 +33,20 @@ sys.path.insert(0, str(ROOT))  # so `python evals/run_intents.py` finds the root
 
 import _deepseek  # noqa: E402 — evals/_deepseek.py (resilient DeepSeek call)
 from observability.langfuse_client import LOCAL_PROMPTS, LocalPrompt  # noqa: E402
-from nodes import parse_intent  # noqa: E402
+from agents import tools  # noqa: E402
+from nodes import build_llm_messages, fused, parse_intent  # noqa: E402
+
+_usage: dict = {}  # mode -> {"calls", "seconds", "prompt_tokens"}
+
+
+def _chat(mode: str, body: dict) -> dict:
+    started = time.monotonic()
+    data = _deepseek.chat(body)
+    tally = _usage.setdefault(mode, {"calls": 0, "seconds": 0.0, "prompt_tokens": 0})
+    tally["calls"] += 1
+    tally["seconds"] += time.monotonic() - started
+    tally["prompt_tokens"] += data.get("usage", {}).get("prompt_tokens", 0)
+    return data
 
 
 def classify(message: str, language: str, current_page: str = "/") -> str:
@@ -40,40 +61,79 @@ def classify(message: str, language: str, current_page: str = "/") -> str:
     }
     if "json" in prompt.lower():
         body["response_format"] = {"type": "json_object"}
-    data = _deepseek.chat(body)
+    data = _chat("classifier", body)
     content = data["choices"][0]["message"]["content"]
     return parse_intent(content)
 
 
+def route_fused(message: str, language: str) -> str | None:
+    """The intent the fused generation call routes `message` to, or None if it answered."""
+    messages, _ = build_llm_messages({"user_input": message, "language": language, "fused_intent": True})
+    body = {
+        "model": "deepseek-v4-flash",
+        "messages": messages,
+        "tools": tools.TOOL_SPECS + [fused.ROUTE_INTENT_SPEC],
+        "temperature": 0,
+    }
+    data = _chat("fused", body)
+    return fused.routed_intent(data["choices"][0]["message"].get("tool_calls"))
+
+
+def _routed(intent: str | None) -> str | None:
+    return intent if intent in fused.ROUTED_INTENTS else None
+
+
+def _report(mode: str, passed: int, total: int, fails: list, threshold: float, label: str) -> bool:
+    accuracy = passed / total if total else 0.0
+    print(f"{mode} {label}: {passed}/{total} = {accuracy:.1%}")
+    for message, expected, got in fails:
+        print(f"  FAIL: {message!r}  expected={expected}  got={got}")
+    if accuracy < threshold:
+        print(f"BELOW THRESHOLD ({threshold:.0%}) — failing the build")
+        return False
+    return True
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--threshold", type=float, default=0.9)
     ap.add_argument("--dataset", default=str(ROOT / "evals" / "intents.jsonl"))
+    ap.add_argument("--mode", choices=("classifier", "fused", "both"), default="classifier")
     args = ap.parse_args()
 
     rows = [json.loads(line) for line in Path(args.dataset).read_text(encoding="utf-8").splitlines() if line.strip()]
-    passed, fails = 0, []
+    classifier, fused_routes = {}, {}
     try:
-        for r in rows:
-            got = classify(r["message"], r.get("language", "pt-BR"))
-            if got == r["expected"]:
-                passed += 1
-            else:
-                fails.append((r["message"], r["expected"], got))
+        for i, r in enumerate(rows):
+            language = r.get("language", "pt-BR")
+            if args.mode in ("classifier", "both"):
+                classifier[i] = classify(r["message"], language)
+            if args.mode in ("fused", "both"):
+                fused_routes[i] = route_fused(r["message"], language)
     except _deepseek.InfraError as e:
         # Infra problem, NOT a quality regression — exit 2 so a red build is legible & re-runnable.
         print(f"::error::eval aborted (infra, not a regression): {e}")
         return 2
 
-    accuracy = passed / len(rows) if rows else 0.0
-    print(f"intent accuracy: {passed}/{len(rows)} = {accuracy:.1%}")
-    for message, expected, got in fails:
-        print(f"  FAIL: {message!r}  expected={expected}  got={got}")
-
-    if accuracy < args.threshold:
-        print(f"BELOW THRESHOLD ({args.threshold:.0%}) — failing the build")
-        return 1
-    return 0
+    ok = True
+    if classifier:
+        fails = [(r["message"], r["expected"], classifier[i]) for i, r in enumerate(rows) if classifier[i] != r["expected"]]
+        ok &= _report("classifier", len(rows) - len(fails), len(rows), fails, args.threshold, "intent accuracy")
+    if fused_routes:
+        fails = [(r["message"], _routed(r["expected"]), fused_routes[i])
+                 for i, r in enumerate(rows) if fused_routes[i] != _routed(r["expected"])]
+        ok &= _report("fused", len(rows) - len(fails), len(rows), fails, args.threshold, "routing accuracy")
+    if args.mode == "both":
+        agree = sum(_routed(classifier[i]) == _routed(r["expected"]) for i, r in enumerate(rows))
+        print(f"classifier routing accuracy: {agree}/{len(rows)} = {agree / len(rows):.1%}")
+        # The classifier mode's call comes before every non-canned turn's generation (or
+        # off-topic) call; the fused mode's one call is the generation call.
+        answered = sum(_routed(classifier[i]) is None for i in classifier)
+        print(f"LLM calls per turn: classifier {(len(rows) + answered) / len(rows):.2f}, fused 1.00")
+        for mode, tally in _usage.items():
+            print(f"  {mode} call: avg {tally['seconds'] / tally['calls'] * 1000:.0f} ms, "
+                  f"avg {tally['prompt_tokens'] / tally['calls']:.0f} prompt tokens")
+    return 0 if ok else 1
 
 
 if __name__ == "__main__":
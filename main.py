@@ -20,7 +20,7 @@ from dotenv import load_dotenv
 import config
 from rag import ingest
 from rag.db import get_qdrant_client
-from core import cache
+from core import cache, faq_router, intent_knn, lexical_router, widget_actions
 from core.cache import get_cached_response, set_cached_response
 from nodes.embeddings import compute_embedding
 from hashlib import sha256
@@ -30,10 +30,10 @@ from providers.deepseek_optimizer import (
     begin_request_cost,
     get_request_cost,
 )
-from safety.security import enforce_chat_limits, record_spend, get_spend_snapshot
+from safety.security import check_spend_cap, enforce_chat_limits, record_spend, get_spend_snapshot
 from agents import tools
 from safety import guardrails
-from providers import llm
+from providers import bulkhead, circuit_breaker, deepseek_client, llm, pool, response_cache, tokens
 from observability import analytics
 from core.language import resolve_language
 from observability.langfuse_client import create_trace, update_trace, flush_langfuse, evaluate_response, score_trace, set_current_trace
@@ -59,8 +59,34 @@ async def lifespan(app: FastAPI):
     """
     Startup: ensure the Qdrant collections exist and the knowledge base is ingested as
     chunks (idempotent — cheap when unchanged). Moving this out of the /chat hot path means
-    a request no longer re-checks/creates collections on every call. Shutdown: flush Langfuse.
+    a request no longer re-checks/creates collections on every call. Also stamps the cache
+    with the KB/embedding-model version, so answers built on an older KB revalidate.
+    Opens the pooled LLM client. Shutdown: close it and flush Langfuse.
     """
+    await deepseek_client.start_client()
+    try:
+        cache.set_kb_version(ingest.kb_version(), nodes.EMBEDDING_MODEL_NAME)
+    except OSError as exc:  # no KB file: versioning stays off, cache behaves as before
+        logging.warning("KB version unavailable (cache versioning off): %s", exc)
+    try:
+        logging.info("Widget actions: %d button labels loaded", widget_actions.load())
+    except (OSError, ValueError, KeyError) as exc:  # a broken registry just means no fast path
+        logging.warning("Widget action registry failed to load: %s", exc)
+    if config.FAQ_ROUTER_ENABLED:
+        # Embed the FAQ exemplars once; until (or unless) this succeeds the router still
+        # answers keyword matches, only the kNN matcher is off.
+        try:
+            size = await asyncio.to_thread(faq_router.build_index, compute_embedding)
+            logging.info("FAQ router: %d exemplars indexed", size)
+        except Exception as exc:  # noqa: BLE001 — an optimization must not block startup
+            logging.warning("FAQ router exemplar index unavailable (keywords only): %s", exc)
+    if config.INTENT_KNN_ENABLED:
+        # Same for the local intent classifier: without its index every turn asks the LLM.
+        try:
+            size = await asyncio.to_thread(intent_knn.build_index, compute_embedding)
+            logging.info("Intent kNN: %d exemplars indexed", size)
+        except Exception as exc:  # noqa: BLE001 — an optimization must not block startup
+            logging.warning("Intent kNN exemplar index unavailable (LLM only): %s", exc)
     try:
         client = get_qdrant_client()
         # Centralized collection init. collection_exists() returns a bool, so we create only
@@ -77,6 +103,7 @@ async def lifespan(app: FastAPI):
     except Exception as exc:  # never let startup init crash the app
         logging.error("Startup init failed (continuing): %s", exc)
     yield
+    await deepseek_client.aclose_client()
     flush_langfuse()
 
 
@@ -359,10 +386,32 @@ async def _stream_chat(payload: ChatRequest):
         yield _sse({"type": "done", "cached": False, "intent": "off_topic", "language_used": language})
         return
 
+    # Widget button text: precomputed reply, streamed one pre-shaped part at a time.
+    widget_reply = _widget_action_response(payload.message, language, current_page)
+    if widget_reply:
+        yield _sse({"type": "start", "intent": widget_reply["detected_intent"]})
+        for i, part in enumerate(widget_reply["response_parts"]):
+            yield _sse({"type": "token", "text": part if i == 0 else "\n\n" + part})
+        yield _sse({"type": "done", "cached": True, "cache_type": "widget",
+                    "intent": widget_reply["detected_intent"], "language_used": language,
+                    "widget_version": widget_reply["widget_version"]})
+        return
+
+    # Whole-message greeting / handoff ask: canned reply, no intent call or graph (#50).
+    lexical_reply = await _lexical_fast_path(payload)
+    if lexical_reply:
+        yield _sse({"type": "start", "intent": lexical_reply["detected_intent"]})
+        for piece in _chunk_text(lexical_reply["revised_response"]):
+            yield _sse({"type": "token", "text": piece})
+        yield _sse({"type": "done", "cached": False, "intent": lexical_reply["detected_intent"],
+                    "language_used": language})
+        return
+
     # Exact-match cache: stream the stored answer in chunks.
-    cache_key = sha256(f"{payload.message}_{language}_{current_page}_{payload.user_id}".encode("utf-8")).hexdigest()
+    cache_key = _exact_cache_key(payload.message, language, current_page, payload.user_id)
     cached = await get_cached_response(cache_key)
     if cached:
+        _record_cache_hit("exact")
         yield _sse({"type": "start", "intent": cached.get("detected_intent")})
         for piece in _chunk_text(cached.get("revised_response", "")):
             yield _sse({"type": "token", "text": piece})
@@ -370,9 +419,27 @@ async def _stream_chat(payload: ChatRequest):
                     "intent": cached.get("detected_intent"), "language_used": language})
         return
 
+    faq_hit, _ = await _faq_fast_path(payload.message, language, current_page, payload.user_id)
+    if faq_hit:
+        yield _sse({"type": "start", "intent": faq_hit["detected_intent"]})
+        for piece in _chunk_text(faq_hit["revised_response"]):
+            yield _sse({"type": "token", "text": piece})
+        yield _sse({"type": "done", "cached": True, "cache_type": "faq",
+                    "intent": faq_hit["detected_intent"], "language_used": language,
+                    "faq_version": faq_hit["faq_version"]})
+        return
+
     state = _build_state(payload, _page_context(current_page))
-    state = await nodes.detect_intent(state)
+    # Retrieval runs alongside intent detection (#47); dropped below unless the turn is RAG.
+    speculative = nodes.speculation.start(state, (nodes.retrieve_company_context, nodes.retrieve_user_context))
+    try:
+        state = await nodes.detect_intent(state)
+    except BaseException:
+        nodes.speculation.discard(speculative)
+        raise
     intent = state.get("intent", "inquire_services")
+    if intent in nodes.speculation.CANNED_INTENTS:
+        nodes.speculation.discard(speculative)
     yield _sse({"type": "start", "intent": intent})
 
     if intent == "greeting":
@@ -391,16 +458,22 @@ async def _stream_chat(payload: ChatRequest):
         for piece in _chunk_text(full):
             yield _sse({"type": "token", "text": piece})
     else:
-        # Normal RAG path: retrieve + augment (fast), then stream the generation tokens live.
-        state = await nodes.retrieve_company_context(state)
-        state = await nodes.retrieve_user_context(state)
+        # Normal RAG path: retrieve (usually already done speculatively) + augment, then
+        # stream the generation tokens live.
+        retrieved = await nodes.speculation.commit(speculative)
+        if retrieved is not None:
+            state = {**state, **retrieved}
+        else:
+            state = await nodes.retrieve_company_context(state)
+            state = await nodes.retrieve_user_context(state)
         state = await nodes.augment_query(state)
         # Same message assembly as /chat (hardened system prompt + personalization hint +
         # instruction), so the streamed answer matches the non-streaming one.
         messages, _ = nodes.build_llm_messages(state)
+        tokens.record_composition(nodes.prompt_composition(state, messages))
         usage: dict = {}
         try:
-            async for delta in llm.stream_completion(messages, task="generation",
+            async for delta in llm.stream_completion(messages, task="generation", intent=intent,
                                                      temperature=0.7, usage_sink=usage):
                 full += delta
                 # Output guardrail DURING the stream: if the canary starts leaking, abort now
@@ -419,22 +492,25 @@ async def _stream_chat(payload: ChatRequest):
                     yield _sse({"type": "token", "text": piece})
         # Bill the streamed generation against the spend cap — a streamed request would
         # otherwise cost 0 to the cap, defeating the daily/per-IP abuse backstop. Use the real
-        # usage chunk when present, else estimate from text (~4 chars/token).
+        # usage chunk when present, else count the tokens locally (#46).
         if usage:
             DeepSeekOptimizer.update_usage(
                 input_tokens=usage.get("prompt_tokens", 0),
                 output_tokens=usage.get("completion_tokens", 0),
+                cache_hit_tokens=usage.get("prompt_cache_hit_tokens"),
+                model=usage.get("model"),
             )
         else:
             DeepSeekOptimizer.update_usage(
-                input_tokens=sum(len(m.get("content") or "") for m in messages) // 4,
-                output_tokens=len(full) // 4,
+                input_tokens=tokens.count_messages(messages),
+                output_tokens=tokens.count(full),
             )
         # Backstop scrub on the accumulated text (a leak mid-stream is already aborted above;
         # this also catches the paraphrased-structure case for the persisted copy).
         full = guardrails.scrub_output(full, language)
 
     yield _sse({"type": "done", "cached": False, "intent": intent, "language_used": language})
+    _record_turn_outcome(intent, get_request_cost())
 
     # After the stream closes: persist the turn + sample the judge, best-effort.
     state["response"] = full
@@ -566,10 +642,233 @@ def _maybe_schedule_judge(langfuse_trace, user_input: str, response: str, result
     task.add_done_callback(_BACKGROUND_TASKS.discard)
 
 
+# Exact-cache namespace shared by every SHARED_USER_IDS visitor. Their turns are context-free
+# (ephemeral thread, no user recall), so the user_id component only split identical answers
+# into per-id copies ("anon" vs "" vs "experiment").
+ANON_CACHE_NAMESPACE = "anon"
+
+
+def _exact_cache_key(message: str, language: str, current_page: str, user_id: str) -> str:
+    """Exact-match Redis key. Shared/anon ids hash the NORMALIZED message under one shared
+    namespace, so "Quanto custa um site?" and "quanto custa um site ?" hit the same entry.
+    Identified users keep the original raw-message, per-user key: their answers depend on
+    conversation memory, and existing entries must stay readable.
+
+    The anon key carries a readable (language, page) prefix so an operator can flush one
+    namespace (see /admin/cache/flush)."""
+    if user_id in config.SHARED_USER_IDS:
+        normalized = cache.normalize_message(message)
+        digest = sha256(f"{ANON_CACHE_NAMESPACE}_{normalized}".encode("utf-8")).hexdigest()
+        return f"exact:{cache.namespace_prefix(language, current_page)}:{digest}"
+    return sha256(f"{message}_{language}_{current_page}_{user_id}".encode("utf-8")).hexdigest()
+
+
 def _semantic_cache_bucket(language: str, current_page: str) -> str:
-    """Bucket key for the semantic cache. Scoped by (language, page) — never user, because it
-    only ever holds shared/anon (context-free, user-independent) turns."""
-    return "semcache:" + sha256(f"{language}_{current_page}".encode("utf-8")).hexdigest()
+    """Bucket key for the semantic cache (see cache.semantic_bucket_key)."""
+    return cache.semantic_bucket_key(language, current_page)
+
+
+def _semantic_threshold(language: str) -> float:
+    """Calibrated per-language similarity threshold, else the global one."""
+    return config.SEMANTIC_CACHE_THRESHOLDS.get(language, config.SEMANTIC_CACHE_THRESHOLD)
+
+
+def _widget_action_response(message: str, language: str, current_page: str) -> dict | None:
+    """The precomputed reply when `message` is one of the widget's button texts, else None.
+    Pure in-process lookup: no LLM, embedding, Redis or Qdrant call. Like the canned greeting
+    and handoff replies, it is not added to the conversation memory."""
+    started = time.perf_counter()
+    action = widget_actions.match(message)
+    cache.record_lookup("widget", action is not None, (time.perf_counter() - started) * 1000)
+    if action is None:
+        return None
+    _record_cache_hit("widget")
+    reply = widget_actions.response(action, language, current_page)
+    return {
+        "raw_response": None,
+        "revised_response": "\n\n".join(reply["parts"]),
+        "response_parts": reply["parts"],
+        "detected_intent": reply["intent"],
+        "final_step": "widget_action",
+        "language_used": language,
+        "context_page": current_page,
+        "is_greeting": False,
+        "cached": True,
+        "cache_type": "widget",
+        "widget_action": action,
+        "widget_version": reply["version"],
+    }
+
+
+async def _lexical_fast_path(payload: ChatRequest) -> dict | None:
+    """The canned greeting / handoff reply when the whole message is one (#50), else None.
+
+    A regex check and a template fill: no intent call, graph run or checkpoint. The turn is
+    still persisted to chat_logs, but in a background task, so the embedding + Qdrant upsert
+    never delays the reply. Like the graph's canned nodes, it leaves conversation memory
+    untouched."""
+    if not config.LEXICAL_FAST_PATH_ENABLED:
+        return None
+    started = time.perf_counter()
+    intent = lexical_router.match(payload.message)
+    cache.record_lookup("lexical", intent is not None, (time.perf_counter() - started) * 1000)
+    if intent is None:
+        return None
+    state = {**_build_state(payload, _page_context(payload.current_page)), "intent": intent}
+    if intent == "greeting":
+        state = await nodes.generate_greeting_response(state)
+    else:
+        state = await nodes.generate_handoff_response(state)
+    state["step"] = "lexical_fast_path"
+    _record_turn_outcome(intent, get_request_cost())
+    task = asyncio.create_task(_save_log_quietly(state))
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    return _shape_response(state, payload.language, payload.current_page)
+
+
+async def _save_log_quietly(state: dict) -> None:
+    try:
+        await nodes.save_log_qdrant(state)
+    except Exception as exc:  # noqa: BLE001 — logging must never surface to the client
+        logging.warning("background chat log write failed: %s", exc)
+
+
+def _faq_response(category: str, language: str, current_page: str) -> dict:
+    """A canned FAQ answer in the /chat response shape (plus which answer version served it)."""
+    faq = faq_router.answer(category, language)
+    data = _shape_response({"response": faq["text"], "revised_response": faq["text"],
+                            "intent": faq["intent"], "step": "faq_router"}, language, current_page)
+    return {**data, "cached": True, "cache_type": "faq",
+            "faq_category": category, "faq_version": faq["version"]}
+
+
+async def _faq_fast_path(message: str, language: str, current_page: str, user_id: str) -> tuple:
+    """Try the FAQ router before the graph. Returns (response or None, query_vec or None);
+    the vector, when the kNN matcher had to embed, is reused by the semantic cache.
+
+    Shared/anon users only — an identified user's turn belongs in their conversation memory,
+    which the graph writes. Messages carrying PII (an email/phone being shared) always go to
+    the graph, where lead capture happens.
+    """
+    if not config.FAQ_ROUTER_ENABLED or user_id not in config.SHARED_USER_IDS:
+        return None, None
+    if not faq_router.eligible(message) or guardrails.redact_pii(message) != message:
+        return None, None
+    started = time.perf_counter()
+    query_vec = None
+    category = faq_router.match_keywords(message)
+    if category is None and faq_router.index_ready():
+        try:
+            query_vec = await asyncio.to_thread(compute_embedding, message)
+            category = faq_router.match_knn(query_vec)
+        except Exception as exc:  # noqa: BLE001 — optimization must never break the chat
+            logging.warning("FAQ router kNN failed (continuing): %s", exc)
+            query_vec = None
+    cache.record_lookup("faq", category is not None, (time.perf_counter() - started) * 1000)
+    if category is None:
+        return None, query_vec
+    _record_cache_hit("faq")
+    return _faq_response(category, language, current_page), query_vec
+
+
+def _cache_request(message: str, language: str, current_page: str, user_id: str) -> dict | None:
+    """What a shared/anon cache entry records about its question, so a stale entry can be
+    regenerated in the background (see cache stale-while-revalidate). None for identified
+    users: their entries are per-user and simply miss once stale."""
+    if user_id not in config.SHARED_USER_IDS:
+        return None
+    return {"message": message, "language": language, "page": current_page}
+
+
+async def _answer_anon_turn(message: str, language: str, current_page: str) -> tuple:
+    """Answer a context-free anonymous turn through the normal graph OUTSIDE a visitor's
+    request (cache revalidation, the FAQ warmer). Returns (response_data, cost_usd), with
+    response_data None when the answer must not be cached (tool call, error step).
+
+    The turn is marked synthetic so save_log_qdrant skips it, and is billed to its own cost
+    box — the caller decides how to account for it."""
+    payload = ChatRequest(message=message, user_id="anon", language=language, current_page=current_page)
+    state = _build_state(payload, _page_context(current_page))
+    state["metadata"]["synthetic"] = True
+    thread_id = _memory_thread_id(payload.user_id)
+    begin_request_cost()
+    try:
+        result = await graph.ainvoke(state, config={"configurable": {"thread_id": thread_id}})
+    finally:
+        evict_thread(thread_id)
+    cost = get_request_cost()
+    if result.get("tool_results") or str(result.get("step", "")).startswith("error"):
+        return None, cost
+    return _shape_response(result, language, current_page), cost
+
+
+async def _seed_caches(request: dict, response_data: dict, query_vec: list | None = None) -> None:
+    """Write an anon answer to the exact cache and (when enabled) the semantic bucket."""
+    message, language, page = request["message"], request["language"], request["page"]
+    await set_cached_response(_exact_cache_key(message, language, page, "anon"), response_data,
+                              request=request)
+    if not config.SEMANTIC_CACHE_ENABLED:
+        return
+    if query_vec is None:
+        query_vec = await asyncio.to_thread(compute_embedding, message)
+    await cache.semantic_put(
+        _semantic_cache_bucket(language, page), query_vec, response_data,
+        config.SEMANTIC_CACHE_MAX_ENTRIES, label=f"{language}|{page}", request=request,
+    )
+
+
+# Spend-cap bucket for background revalidations: they run outside any visitor's request, so
+# they're billed (global + this pseudo-IP's daily slice) under their own name.
+REVALIDATION_SPEND_KEY = "cache-revalidation"
+
+
+async def _revalidate(request: dict) -> None:
+    """Regenerate a stale anon answer and swap it into both caches. Best-effort."""
+    try:
+        await check_spend_cap(REVALIDATION_SPEND_KEY)
+    except HTTPException:
+        logging.warning("cache revalidation skipped: spend cap reached")
+        return
+    try:
+        response_data, cost = await _answer_anon_turn(request["message"], request["language"], request["page"])
+        await record_spend(REVALIDATION_SPEND_KEY, cost)
+        if response_data is not None:
+            await _seed_caches(request, response_data)
+            logging.info("cache revalidated for %r", guardrails.redact_pii(request["message"])[:60])
+    except Exception as exc:  # noqa: BLE001 — a failed refresh leaves the stale entry in place
+        logging.warning("cache revalidation failed: %s", exc)
+
+
+def _schedule_revalidation(request: dict) -> None:
+    task = asyncio.create_task(_revalidate(request))
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+cache.set_revalidator(_schedule_revalidation)
+
+
+def _record_cache_hit(layer: str) -> None:
+    """A turn answered from cache: credit the avoided spend and bump the optimizer's
+    cached_responses counter (which nothing used to increment)."""
+    cache.record_saving(layer)
+    DeepSeekOptimizer.update_usage(is_cached_response=True)
+
+
+# Intents answered by a canned/cheap node; their cost doesn't represent a full RAG turn.
+_SHORT_CIRCUIT_INTENTS = {"greeting", "chat_with_agent", "off_topic"}
+
+
+def _record_turn_outcome(intent: str | None, turn_cost: float) -> None:
+    """After a graph run: count the greeting short-circuit (hit = greeting turn, which skipped
+    retrieval, generation and revision) and feed full-turn costs into the savings estimate."""
+    is_greeting = intent == "greeting"
+    cache.record_lookup("greeting", is_greeting)
+    if is_greeting:
+        cache.record_saving("greeting", cache.avg_turn_cost() - turn_cost)
+    elif intent not in _SHORT_CIRCUIT_INTENTS:
+        cache.record_turn_cost(turn_cost)
 
 
 async def _handle_chat(payload: ChatRequest):
@@ -578,29 +877,46 @@ async def _handle_chat(payload: ChatRequest):
     current_page = payload.current_page
     logging.info(f"Request received - User: {user_id}, Language: {language}, Page: {current_page}")
 
-    # Exact-match Redis cache. The key includes user_id so one visitor's answer is never
-    # served to another (responses are conversation-dependent now that memory exists); we
-    # only WRITE the cache for context-free turns (below).
-    cache_key = sha256(f"{payload.message}_{language}_{current_page}_{user_id}".encode("utf-8")).hexdigest()
+    widget_reply = _widget_action_response(payload.message, language, current_page)
+    if widget_reply:
+        return widget_reply
+
+    lexical_reply = await _lexical_fast_path(payload)
+    if lexical_reply:
+        return lexical_reply
+
+    # Exact-match Redis cache. An identified user's key includes user_id so one visitor's
+    # answer is never served to another (responses are conversation-dependent now that memory
+    # exists); shared/anon ids share one normalized namespace (see _exact_cache_key). We only
+    # WRITE the cache for context-free turns (below).
+    cache_key = _exact_cache_key(payload.message, language, current_page, user_id)
     cached_result = await get_cached_response(cache_key)
     if cached_result:
+        _record_cache_hit("exact")
         return {**cached_result, "cached": True, "cache_type": "redis"}
 
+    # FAQ fast path (#34): canned answers for pricing/contact/... questions. Its query
+    # embedding (if it computed one) is reused by the semantic cache below.
+    faq_hit, query_vec = await _faq_fast_path(payload.message, language, current_page, user_id)
+    if faq_hit:
+        return faq_hit
+
     # Semantic cache (#12): only for shared/anon users, whose turns are context-free and
     # user-independent, so serving a paraphrase's cached answer is safe. Logged-in users with
     # memory skip it (a paraphrase must not bypass their live conversation). Computed once and
     # reused for the write below.
     semantic_enabled = config.SEMANTIC_CACHE_ENABLED and user_id in config.SHARED_USER_IDS
-    query_vec = None
     if semantic_enabled:
         # The semantic cache is an optimization, never a dependency: any failure (embedding
         # model cold-start, Redis hiccup) must degrade to the normal graph path, not 500 the
         # request. query_vec stays None on failure so the write below is skipped too.
         try:
-            query_vec = await asyncio.to_thread(compute_embedding, payload.message)
+            if query_vec is None:
+                query_vec = await asyncio.to_thread(compute_embedding, payload.message)
             bucket = _semantic_cache_bucket(language, current_page)
-            semantic_hit = await cache.semantic_get(bucket, query_vec, config.SEMANTIC_CACHE_THRESHOLD)
+            semantic_hit = await cache.semantic_get(bucket, query_vec, _semantic_threshold(language))
             if semantic_hit:
+                _record_cache_hit("semantic")
                 return {**semantic_hit, "cached": True, "cache_type": "semantic"}
         except Exception as exc:  # noqa: BLE001 — optimization must never break the chat
             logging.warning("semantic cache lookup failed (continuing): %s", exc)
@@ -634,6 +950,7 @@ async def _handle_chat(payload: ChatRequest):
 
     response_data = _shape_response(result, language, current_page)
     full_response = response_data["revised_response"]
+    _record_turn_outcome(result.get("intent"), get_request_cost())
 
     update_trace(
         langfuse_trace,
@@ -647,13 +964,15 @@ async def _handle_chat(payload: ChatRequest):
     # Only cache CONTEXT-FREE turns: once a conversation has history (messages grows 2/turn),
     # the answer depends on it, so caching by message would serve a stale answer. First turn <= 2.
     if len(result.get("messages", [])) <= 2:
-        await set_cached_response(cache_key, response_data)
+        request = _cache_request(payload.message, language, current_page, user_id)
+        await set_cached_response(cache_key, response_data, request=request)
         # Also seed the semantic cache so a later paraphrase hits (shared/anon users only).
         if semantic_enabled and query_vec is not None:
             try:
                 await cache.semantic_put(
                     _semantic_cache_bucket(language, current_page),
                     query_vec, response_data, config.SEMANTIC_CACHE_MAX_ENTRIES,
+                    label=f"{language}|{current_page}", request=request,
                 )
             except Exception as exc:  # noqa: BLE001 — seeding the cache must never break the reply
                 logging.warning("semantic cache write failed (continuing): %s", exc)
@@ -668,11 +987,39 @@ async def get_usage_report(_: None = Depends(require_admin)):
     return {
         "status": "success",
         "report": report,
+        "cache": cache.get_cache_stats(),
+        "llm_cache": response_cache.get_stats(),
+        "llm_hedging": llm.get_hedge_stats(),
+        "llm_breakers": circuit_breaker.get_stats(),
+        "llm_pools": pool.get_stats(),
+        "llm_bulkhead": bulkhead.get_stats(),
+        "prompt_cache": llm.get_prompt_cache_stats(),
+        "prompt_composition": tokens.get_stats(),
+        "speculative_retrieval": nodes.speculation.get_stats(),
+        "intent_knn": intent_knn.get_stats(),
         "spend": await get_spend_snapshot(),
         "message": f"{'🎉 Desconto de 50% ATIVO!' if report['current_discount'] else '⚠️ Fora do horário de desconto'}"
     }
 
 
+@app.get("/admin/cache")
+async def admin_cache(_: None = Depends(require_admin)):
+    """Cache inspection: per-layer counters (incl. the active KB version) plus semantic
+    bucket / anon exact-key sizes. Operator-only (see require_admin)."""
+    return {"stats": cache.get_cache_stats(), **await cache.describe_buckets()}
+
+
+@app.post("/admin/cache/flush")
+async def admin_cache_flush(language: str, page: str | None = None, _: None = Depends(require_admin)):
+    """Flush one cache namespace: the anon exact keys + semantic buckets for `language`
+    (and only `page`, if given). Targeted, so a KB fix doesn't need a blunt FLUSHDB.
+    Operator-only (see require_admin)."""
+    language = resolve_language(language)
+    result = await cache.flush_namespace(language, page)
+    logging.info("admin cache flush: %s", result)
+    return {"status": "success", **result}
+
+
 @app.get("/analytics/funnel")
 async def analytics_funnel(window_days: int = 30, _: None = Depends(require_admin)):
     """Conversion funnel (greeting → question → lead) from chat_logs (#24). Operator-only.
@@ -12,12 +12,14 @@ from providers import deepseek_client  # noqa: F401  (kept so nodes.deepseek_cli
 # Import submodules so `nodes.generation`, `nodes.embeddings`, etc. resolve (tests patch there).
 from nodes import (  # noqa: F401
     embeddings,
+    fused,
     generation,
     greeting,
     intent,
     logging_node,
     offtopic,
     retrieval,
+    speculation,
     revision,
 )
 from nodes.embeddings import EMBEDDING_MODEL_NAME, compute_embedding, get_embedding_model
@@ -30,6 +32,7 @@ from nodes.generation import (
     build_llm_messages,
     generate_response,
     language_instruction_for,
+    prompt_composition,
 )
 from nodes.greeting import GREETINGS, generate_greeting_response
 from nodes.handoff import HANDOFFS, generate_handoff_response
@@ -49,3 +52,4 @@ from nodes.retrieval import (
     retrieve_user_context,
 )
 from nodes.revision import needs_revision, revise_response
+from nodes.speculation import detect_intent_speculative
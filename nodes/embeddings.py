@@ -1,5 +1,7 @@
 """FastEmbed (ONNX) embeddings — no PyTorch."""
 
+from functools import lru_cache
+
 from fastembed import TextEmbedding
 
 # FastEmbed - lightweight ONNX-based embeddings (no PyTorch required).
@@ -26,7 +28,13 @@ def compute_embedding(text: str) -> list:
     max_length = 512
     if len(text) > max_length * 4:
         text = text[:max_length * 4]
+    return list(_embed(text))
+
 
+# A turn embeds the same message up to three times (semantic cache, company retrieval, user
+# recall — speculatively, #47); a small memo makes the repeats free.
+@lru_cache(maxsize=256)
+def _embed(text: str) -> tuple:
     # FastEmbed retorna um generator, pegamos o primeiro resultado
     embeddings = list(get_embedding_model().embed([text]))
-    return embeddings[0].tolist()
+    return tuple(embeddings[0].tolist())
@@ -0,0 +1,99 @@
+"""Fused intent mode (#48): the generation call classifies the turn too.
+
+In the default mode every on-topic turn makes two sequential DeepSeek calls — detect_intent,
+then the tool-calling generation loop. With FUSED_INTENT_ENABLED the graph skips the
+classifier (detect_intent_speculative marks the turn `fused_intent`), retrieves and augments
+as for any RAG turn, and offers the generation call one extra, lightweight tool:
+
+    route_intent(intent: "greeting" | "chat_with_agent")
+
+The model calls it instead of answering when the message is only a greeting or asks for a
+person; the loop stops there (no tool result is fed back) and the turn gets the canned
+GREETINGS / HANDOFFS reply from that same response. Every other message is answered in the
+same call — off-topic ones with a short redirect — and keeps the provisional DEFAULT_INTENT.
+
+Trade-offs: greeting and handoff turns now pay retrieval and a full generation prompt, and
+only two intents are labelled precisely. /chat/stream still classifies first — it announces
+the intent before streaming. Compare the modes with `evals/run_intents.py --mode fused`.
+"""
+
+import json
+
+import config
+from nodes.greeting import generate_greeting_response
+from nodes.handoff import generate_handoff_response
+from nodes.intent import DEFAULT_INTENT
+
+ROUTE_TOOL = "route_intent"
+ROUTED_INTENTS = ("greeting", "chat_with_agent")
+
+ROUTE_INTENT_SPEC = {
+    "type": "function",
+    "function": {
+        "name": ROUTE_TOOL,
+        "description": (
+            "Call this INSTEAD of answering when the user's message is only a greeting "
+            "(greeting) or asks to talk to a person / human agent (chat_with_agent). A canned "
+            "reply is sent for you. Never call it together with another tool."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {"intent": {"type": "string", "enum": list(ROUTED_INTENTS)}},
+            "required": ["intent"],
+        },
+    },
+}
+
+# Appended to the generation system prompt in fused mode (a fixed string, so the prefix
+# stays byte-identical per mode for the prompt cache, #42).
+FUSED_INSTRUCTION = (
+    "There is no separate intent classifier: if the message is only a greeting, or the user "
+    "asks to talk to a person, call route_intent and write nothing else. If the message has "
+    "nothing to do with websites, automation, AI or e-learning, redirect politely in one or "
+    "two sentences to what we do."
+)
+
+_CANNED = {"greeting": generate_greeting_response, "chat_with_agent": generate_handoff_response}
+
+
+def enabled() -> bool:
+    return config.FUSED_INTENT_ENABLED
+
+
+def skip_classifier(state: dict) -> dict:
+    """Entry-node update in fused mode: no classifier call, a provisional intent."""
+    return {**state, "intent": DEFAULT_INTENT, "fused_intent": True, "speculative_retrieval": False}
+
+
+def routed_intent(tool_calls: list) -> str | None:
+    """The intent of a valid route_intent call, if the model made one and nothing else.
+    A route_intent next to real tool calls (create_lead, schedule_meeting) is ignored, so
+    those calls are dispatched instead of being dropped for a canned reply."""
+    if any(call.get("function", {}).get("name") != ROUTE_TOOL for call in tool_calls or ()):
+        return None
+    for call in tool_calls or ():
+        fn = call.get("function", {})
+        try:
+            intent = json.loads(fn.get("arguments") or "{}").get("intent")
+        except (ValueError, TypeError, AttributeError):
+            continue
+        if intent in ROUTED_INTENTS:
+            return intent
+    return None
+
+
+def pop_route(tool_results: list) -> tuple[str | None, list]:
+    """Split the route_intent marker the tool loop left in `tool_results` from the real tool
+    results: (routed intent or None, remaining results)."""
+    intent, rest = None, []
+    for item in tool_results:
+        if item.get("tool") == ROUTE_TOOL:
+            intent = item["result"].get("intent")
+        else:
+            rest.append(item)
+    return intent, rest
+
+
+async def canned_response(state: dict, intent: str) -> dict:
+    """The canned reply for a routed intent (greeting / handoff)."""
+    return await _CANNED[intent]({**state, "intent": intent})
@@ -8,8 +8,10 @@ from core import behavior as behavior_ctx
 from providers import deepseek_client  # noqa: F401  (tests patch nodes.deepseek_client; llm delegates to it)
 from safety import guardrails
 from observability import langfuse_client
-from providers import llm
+from providers import llm, tokens
 from agents import tools
+from nodes import fused
+import config
 from config import MAX_HISTORY_MESSAGES
 from providers.deepseek_optimizer import DeepSeekOptimizer
 
@@ -33,8 +35,14 @@ async def augment_query(state: dict) -> dict:
     """
     Prepara o contexto para geração de resposta usando prompt do Langfuse.
     """
-    company_context = state.get("company_context", "")
+    # Retrieval context is trimmed to LLM_CONTEXT_TOKEN_BUDGET (#46): company chunks first
+    # (best-ranked first, so the tail goes), then recalled exchanges with what is left.
+    budget = config.LLM_CONTEXT_TOKEN_BUDGET
+    company_context = tokens.trim_blocks(state.get("company_context", ""), budget, "\n\n---\n\n")
     user_context = state.get("user_context", "")
+    if budget > 0:
+        remaining = budget - tokens.count(company_context)
+        user_context = tokens.trim_blocks(user_context, remaining, "\n\n") if remaining > 0 else ""
     user_input = state.get("user_input", "")
     language = state.get("language", "pt-BR")
     page_context = state.get("page_context", "")
@@ -73,18 +81,20 @@ async def augment_query(state: dict) -> dict:
         except Exception as e:
             logging.warning(f"Error compiling system prompt: {e}")
             # Fallback simples
-            augmented = f"""You are WB Digital Solutions assistant. {language_instruction}
-Answer: {user_input}
-End with a helpful next step. Do NOT paste a phone number; if the user asks for contact or to talk to someone, offer to connect them with our team or share the booking link."""
+            augmented = f"""You are WB Digital Solutions assistant.
+End with a helpful next step. Do NOT paste a phone number; if the user asks for contact or to talk to someone, offer to connect them with our team or share the booking link.
+{language_instruction}
+Answer: {user_input}"""
     else:
-        # Fallback se não encontrar prompt no Langfuse
+        # Fallback se não encontrar prompt no Langfuse. Static text first, per-request last (#42).
         augmented = f"""You are WB Digital Solutions assistant specializing in websites, automation, and AI.
+End with a helpful next step. Do NOT include a phone number or WhatsApp; if the user asks for contact or to talk to a person, offer to connect them with our team or share the booking link.
 {language_instruction}
 Context: {company_context}
-User question: {user_input}
-End with a helpful next step. Do NOT include a phone number or WhatsApp; if the user asks for contact or to talk to a person, offer to connect them with our team or share the booking link."""
+User question: {user_input}"""
 
-    return {**state, "augmented_input": augmented, "step": "augment_query"}
+    return {**state, "company_context": company_context, "user_context": user_context,
+            "augmented_input": augmented, "step": "augment_query"}
 
 
 TOOL_SYSTEM_PROMPT = (
@@ -103,13 +113,17 @@ TOOL_SYSTEM_PROMPT = (
 )
 
 
-async def _deepseek_chat(messages: list, temperature: float = 0.7, use_tools: bool = False) -> dict:
-    """Single DeepSeek chat call. Returns the parsed JSON. Offers the tools when asked."""
+async def _deepseek_chat(messages: list, temperature: float = 0.7, use_tools: bool = False,
+                         intent: str | None = None, extra_tools: list | None = None) -> dict:
+    """Single DeepSeek chat call. Returns the parsed JSON. Offers the tools (plus
+    `extra_tools`) when asked. `intent` picks the output-token cap for the reply (llm task
+    profiles, #41)."""
     resp = await llm.chat_completion(
         messages,
         task="generation",  # stronger model for generation (#13)
+        intent=intent,
         temperature=temperature,
-        tools=tools.TOOL_SPECS if use_tools else None,
+        tools=tools.TOOL_SPECS + (extra_tools or []) if use_tools else None,
         extra_headers=DeepSeekOptimizer.get_optimization_headers(),
     )
     try:
@@ -121,11 +135,16 @@ async def _deepseek_chat(messages: list, temperature: float = 0.7, use_tools: bo
         return {}
 
 
-async def _run_tool_loop(messages: list, trace, instruction_prompt, max_iters: int = 3):
+async def _run_tool_loop(messages: list, trace, instruction_prompt, max_iters: int = 3,
+                         intent: str | None = None, extra_tools: list | None = None):
     """
     Generate a reply, letting the model DECIDE to call tools. Any tool call is executed via
     tools.dispatch (validated + resilient), the result is fed back, and we loop until the
     model returns text (bounded by max_iters). Returns (reply_text, tool_results).
+
+    In fused intent mode (#48) `extra_tools` offers route_intent: a valid call to it, alone,
+    ends the loop at once with a {"tool": "route_intent"} marker in tool_results
+    (fused.pop_route). Made next to real tool calls it is ignored and those are dispatched.
     """
     tool_results = []
     for _ in range(max_iters):
@@ -133,12 +152,14 @@ async def _run_tool_loop(messages: list, trace, instruction_prompt, max_iters: i
             trace=trace, name="generate_response", model="deepseek-v4-flash",
             input_messages=messages, metadata={"temperature": 0.7}, prompt=instruction_prompt,
         )
-        data = await _deepseek_chat(messages, use_tools=True)
+        data = await _deepseek_chat(messages, use_tools=True, intent=intent, extra_tools=extra_tools)
         usage = data.get("usage", {})
         if usage:
             DeepSeekOptimizer.update_usage(
                 input_tokens=usage.get("prompt_tokens", 0),
                 output_tokens=usage.get("completion_tokens", 0),
+                cache_hit_tokens=usage.get("prompt_cache_hit_tokens"),
+                model=data.get("model"),
             )
         try:
             msg = data["choices"][0]["message"]
@@ -152,6 +173,10 @@ async def _run_tool_loop(messages: list, trace, instruction_prompt, max_iters: i
         tool_calls = msg.get("tool_calls")
         if not tool_calls:
             return msg.get("content") or "", tool_results
+        routed = fused.routed_intent(tool_calls)
+        if routed:
+            # The reply is canned, so nothing is fed back — no second round trip.
+            return "", tool_results + [{"tool": fused.ROUTE_TOOL, "result": {"ok": True, "intent": routed}}]
 
         # Record the assistant's tool-call turn, then execute each call and feed results back.
         messages.append({"role": "assistant", "content": msg.get("content"), "tool_calls": tool_calls})
@@ -162,8 +187,11 @@ async def _run_tool_loop(messages: list, trace, instruction_prompt, max_iters: i
                 args = json.loads(fn.get("arguments") or "{}")
             except (ValueError, TypeError):
                 args = {}
-            result = await tools.dispatch(name, args)
-            tool_results.append({"tool": name, "result": result})
+            if name == fused.ROUTE_TOOL:  # unusable intent, or made alongside real tool calls
+                result = {"ok": False, "message": "Answer the user directly."}
+            else:
+                result = await tools.dispatch(name, args)
+                tool_results.append({"tool": name, "result": result})
             messages.append({"role": "tool", "tool_call_id": call.get("id", ""), "content": json.dumps(result, ensure_ascii=False)})
 
     # Still asking for tools after max_iters: force a final text answer (tools off).
@@ -171,12 +199,14 @@ async def _run_tool_loop(messages: list, trace, instruction_prompt, max_iters: i
         trace=trace, name="generate_response", model="deepseek-v4-flash",
         input_messages=messages, metadata={"temperature": 0.7}, prompt=instruction_prompt,
     )
-    data = await _deepseek_chat(messages, use_tools=False)
+    data = await _deepseek_chat(messages, use_tools=False, intent=intent)
     usage = data.get("usage", {})
     if usage:
         DeepSeekOptimizer.update_usage(
             input_tokens=usage.get("prompt_tokens", 0),
             output_tokens=usage.get("completion_tokens", 0),
+            cache_hit_tokens=usage.get("prompt_cache_hit_tokens"),
+            model=data.get("model"),
         )
     try:
         content = data["choices"][0]["message"].get("content") or ""
@@ -195,38 +225,68 @@ _DEFAULT_INSTRUCTION = (
 
 
 def build_llm_messages(state: dict):
-    """Assemble the [system, ...history, user] messages for the generation call.
+    """Assemble the [system, ...history, (hint), user] messages for the generation call.
 
     Shared by the graph node (generate_response) and the streaming endpoint so both send the
     identical hardened system prompt, personalization hint (#8b), replayed history, and the
     RAG-augmented current turn. Returns (messages, instruction_prompt) — the latter is passed
     to Langfuse for prompt linkage.
+
+    Layout for DeepSeek's prefix cache (#42): the first message is byte-identical for every
+    visitor and turn — tool instructions, the answer checklist and the anti-injection rules —
+    so together with the tool specs it is billed at the cache-hit price. Everything volatile
+    comes after it: history, the per-visitor hint (its own system message right before the
+    current turn) and the augmented question.
     """
     user_input = state["user_input"]
     augmented_input = state.get("augmented_input")
 
     instruction_prompt = langfuse_client.get_prompt("generate_response_instruction")
     instruction = (instruction_prompt.compile() + "\n\n") if instruction_prompt else _DEFAULT_INSTRUCTION
-    query = f"{instruction}{augmented_input}" if augmented_input else f"{instruction}{user_input}"
+    if state.get("fused_intent"):
+        instruction += fused.FUSED_INSTRUCTION
+    system_prompt = guardrails.harden_system_prompt(f"{TOOL_SYSTEM_PROMPT}\n\n{instruction.rstrip()}")
 
     # `history` = accumulated prior turns (raw user/assistant text, no system prompt), replayed
-    # for short-term memory. The current turn is sent AUGMENTED (RAG context); only the RAW user
-    # text is persisted, so past turns don't carry stale retrieval context.
-    history = state.get("messages", [])
+    # for short-term memory, newest pairs first within LLM_HISTORY_TOKEN_BUDGET (#46). The
+    # current turn is sent AUGMENTED (RAG context); only the RAW user text is persisted, so
+    # past turns don't carry stale retrieval context.
+    history = tokens.trim_history(state.get("messages", []), config.LLM_HISTORY_TOKEN_BUDGET)
     # Light personalization (#8b): a behavioral hint that forbids revealing we track browsing.
-    system_prompt = guardrails.harden_system_prompt(TOOL_SYSTEM_PROMPT)
     hint = behavior_ctx.personalization_hint(state.get("behavior"))
-    if hint:
-        system_prompt = f"{system_prompt}\n\n{hint}"
 
     messages = (
         [{"role": "system", "content": system_prompt}]
         + history
-        + [{"role": "user", "content": query}]
+        + ([{"role": "system", "content": hint}] if hint else [])
+        + [{"role": "user", "content": augmented_input or user_input}]
     )
     return messages, instruction_prompt
 
 
+def prompt_composition(state: dict, messages: list) -> dict:
+    """Token breakdown of the generation prompt (#46): system (system messages, the augmented
+    template's fixed text and the tool specs), history, context (retrieval), query, plus the
+    history tokens trimming dropped and the call's pre-flight cost bound."""
+    history = [m for m in messages[1:-1] if m.get("role") != "system"]
+    total = tokens.count_messages(messages, tools.TOOL_SPECS + _extra_tools(state))
+    parts = {
+        "history": tokens.count_messages(history),
+        "context": tokens.count(state.get("company_context", "")) + tokens.count(state.get("user_context", "")),
+        "query": tokens.count(state.get("user_input", "")),
+    }
+    parts["system"] = max(0, total - sum(parts.values()))
+    parts["total"] = total
+    parts["trimmed"] = max(0, tokens.count_messages(state.get("messages", [])) - parts["history"])
+    max_tokens = llm.apply_profile("generation", state.get("intent"), {}).get("max_tokens") or 0
+    parts["estimated_cost_usd"] = round(tokens.estimate_cost(total, max_tokens, llm.model_for("generation")), 6)
+    return parts
+
+
+def _extra_tools(state: dict) -> list:
+    return [fused.ROUTE_INTENT_SPEC] if state.get("fused_intent") else []
+
+
 async def generate_response(state: dict) -> dict:
     user_input = state["user_input"]
     augmented_input = state.get("augmented_input")
@@ -244,9 +304,17 @@ async def generate_response(state: dict) -> dict:
         }
 
     llm_messages, instruction_prompt = build_llm_messages(state)
+    composition = prompt_composition(state, llm_messages)
+    tokens.record_composition(composition)
 
     try:
-        reply, tool_results = await _run_tool_loop(llm_messages, trace, instruction_prompt)
+        reply, tool_results = await _run_tool_loop(llm_messages, trace, instruction_prompt,
+                                                   intent=state.get("intent"),
+                                                   extra_tools=_extra_tools(state))
+        routed, tool_results = fused.pop_route(tool_results)
+        if routed:
+            return {**await fused.canned_response(state, routed), "tool_results": tool_results,
+                    "prompt_composition": composition}
         # output guardrail: block a prompt/canary leak, refusing in the user's language
         reply = guardrails.scrub_output(reply, state.get("language", "pt-BR"))
     except httpx.HTTPError as e:
@@ -272,6 +340,7 @@ async def generate_response(state: dict) -> dict:
         "response": reply,
         "tool_results": tool_results,
         "messages": new_history,
+        "prompt_composition": composition,
         "step": "generate_response",
         # NOTE: instruction_prompt is intentionally NOT returned — it's a live, unserializable
         # prompt object (would break the checkpointer) and nothing downstream reads it.
@@ -1,9 +1,13 @@
 """Intent detection + robust parsing of the classifier output."""
 
+import asyncio
 import json
 import logging
 import re
 
+import config
+from core import intent_knn
+import nodes.embeddings as embeddings
 from providers import deepseek_client  # noqa: F401  (tests patch nodes.deepseek_client; llm delegates to it)
 from observability import langfuse_client
 from providers import llm
@@ -74,12 +78,31 @@ def parse_intent(raw: str) -> str:
     return DEFAULT_INTENT
 
 
+async def _detect_local(user_input: str) -> str | None:
+    """The local kNN classifier's intent (#49), or None when it is off, not indexed yet,
+    unsure, or failed — then the LLM decides."""
+    if not config.INTENT_KNN_ENABLED or not intent_knn.index_ready():
+        return None
+    try:
+        query_vec = await asyncio.to_thread(embeddings.compute_embedding, user_input)
+        return intent_knn.classify(query_vec)
+    except Exception as exc:  # noqa: BLE001 — an optimization must never break the turn
+        logging.warning("local intent classifier failed (asking the LLM): %s", exc)
+        return None
+
+
 async def detect_intent(state: dict) -> dict:
     """
     Detecta intent usando prompt do Langfuse.
-    Sem bypass hardcoded - sempre usa o prompt para consistência.
+    Com INTENT_KNN_ENABLED, mensagens inequívocas são classificadas localmente antes (kNN
+    sobre exemplos, #49) e não chamam o LLM; as demais sempre usam o prompt.
     """
     user_input = state["user_input"]
+    local = await _detect_local(user_input)
+    if config.INTENT_KNN_ENABLED and intent_knn.index_ready():
+        intent_knn.record(local)
+    if local:
+        return {**state, "intent": local, "step": "detect_intent"}
     language = state.get("language", "pt-BR")
     current_page = state.get("current_page", "/")
 
@@ -143,7 +166,8 @@ Respond with ONLY JSON: {{"intent": "<greeting|request_quote|inquire_services|sh
             DeepSeekOptimizer.update_usage(
                 input_tokens=usage.get("prompt_tokens", 0),
                 output_tokens=usage.get("completion_tokens", 0),
-                cache_hit=response.headers.get("X-Cache-Status") == "hit"
+                cache_hit_tokens=usage.get("prompt_cache_hit_tokens"),
+                model=data.get("model"),
             )
 
         # Guard against API errors (429/500 return JSON without "choices" -> KeyError).
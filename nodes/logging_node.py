@@ -1,5 +1,6 @@
 """Persist each exchange (embedded) into the Qdrant chat_logs collection."""
 
+import asyncio
 import logging
 import time
 import uuid
@@ -12,6 +13,11 @@ from rag.db import get_qdrant_client
 
 
 async def save_log_qdrant(state: dict) -> dict:
+    # Synthetic turns (the FAQ cache warmer answering mined questions) are not real traffic:
+    # persisting them would skew the funnel and feed the warmer its own output next run.
+    if (state.get("metadata") or {}).get("synthetic"):
+        return state
+
     # Redact PII (email/CPF/CNPJ/phone) before it is PERSISTED to chat_logs — LGPD/GDPR.
     # The live response the user already received is untouched, and create_lead has already
     # sent the real contact to the CRM; only this stored copy is masked.
@@ -37,6 +43,13 @@ async def save_log_qdrant(state: dict) -> dict:
         f"Revised Response: {data_to_save.get('revised_response', '')}\n"
         f"Intent: {data_to_save.get('intent', '')}"
     )
+    # The embedding and the sync Qdrant client run in a worker thread so the write never
+    # stalls the event loop (it is queued in the background on the lexical fast path, #50).
+    await asyncio.to_thread(_write_log, combined_text, data_to_save)
+    return state
+
+
+def _write_log(combined_text: str, data_to_save: dict) -> None:
     log_embedding = embeddings.compute_embedding(combined_text)
     point = {
         "id": str(uuid.uuid4()),
@@ -63,5 +76,3 @@ async def save_log_qdrant(state: dict) -> dict:
             logging.info("Log saved to Qdrant after ensuring collection.")
         except Exception as e2:
             logging.error("Error saving log to Qdrant after retry: %s", e2)
-
-    return state
@@ -4,6 +4,7 @@ import logging
 
 from observability import langfuse_client
 from providers import llm
+from providers.deepseek_optimizer import DeepSeekOptimizer
 
 
 async def generate_off_topic_response(state: dict) -> dict:
@@ -43,9 +44,18 @@ async def generate_off_topic_response(state: dict) -> dict:
         resp = await llm.chat_completion(
             [{"role": "user", "content": prompt}],
             task="generation",
+            intent="off_topic",
             temperature=0.7,
         )
         data = resp.json()
+        usage = data.get("usage", {})
+        if usage:  # this call was never billed, so the spend cap didn't see it
+            DeepSeekOptimizer.update_usage(
+                input_tokens=usage.get("prompt_tokens", 0),
+                output_tokens=usage.get("completion_tokens", 0),
+                cache_hit_tokens=usage.get("prompt_cache_hit_tokens"),
+                model=data.get("model"),
+            )
         response = data["choices"][0]["message"]["content"].strip()
 
         # End generation AFTER LLM call
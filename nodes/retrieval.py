@@ -1,5 +1,6 @@
 """RAG retrieval: company-knowledge chunks + prior-user context from Qdrant."""
 
+import asyncio
 import logging
 
 from safety import guardrails
@@ -30,10 +31,13 @@ async def retrieve_company_context(state: dict) -> dict:
     Langfuse trace as citations and logged, so the threshold can be re-calibrated from
     real traffic.
     """
-    embedding = embeddings.compute_embedding(state["user_input"])
+    # Embedding and search are blocking; off the event loop so they overlap with the intent
+    # call when run speculatively (#47) instead of stalling every other request.
+    embedding = await asyncio.to_thread(embeddings.compute_embedding, state["user_input"])
     chunks, sources = [], []
     try:
-        results = get_qdrant_client().search(
+        results = await asyncio.to_thread(
+            get_qdrant_client().search,
             collection_name="company_info",
             query_vector=embedding,
             limit=COMPANY_TOP_K,
@@ -75,11 +79,12 @@ async def retrieve_user_context(state: dict) -> dict:
     if user_id in SHARED_USER_IDS:
         return {**state, "user_context": "", "step": "retrieve_user_context"}
 
-    embedding = embeddings.compute_embedding(state["user_input"])
+    embedding = await asyncio.to_thread(embeddings.compute_embedding, state["user_input"])
     query_filter = {"must": [{"key": "user_id", "match": {"value": user_id}}]}
     exchanges = []
     try:
-        results = get_qdrant_client().search(
+        results = await asyncio.to_thread(
+            get_qdrant_client().search,
             collection_name="chat_logs",
             query_vector=embedding,
             limit=USER_CONTEXT_TOP_K,
@@ -92,7 +92,8 @@ async def revise_response(state: dict) -> dict:
             DeepSeekOptimizer.update_usage(
                 input_tokens=usage.get("prompt_tokens", 0),
                 output_tokens=usage.get("completion_tokens", 0),
-                cache_hit=response.headers.get("X-Cache-Status") == "hit",
+                cache_hit_tokens=usage.get("prompt_cache_hit_tokens"),
+                model=data.get("model"),
             )
         revised = data["choices"][0]["message"]["content"]
     except (ValueError, KeyError, IndexError, TypeError):
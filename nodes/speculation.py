@@ -0,0 +1,94 @@
+"""Speculative retrieval (#47): embed + retrieve while the intent classifier is still running.
+
+Intent detection is a full LLM round trip, and retrieval used to start only after it. Now
+the retrieval steps start in the background as the turn begins; if the intent routes to the
+RAG path their result is committed (route_after_intent then skips straight to
+augment_query), and for greeting / off-topic / handoff turns the task is cancelled and its
+result dropped. A cancelled task stops at its next step — an embedding or Qdrant query
+already running in its thread finishes but is ignored. Any failure in the speculative run
+just means the turn retrieves sequentially, as before.
+"""
+
+import asyncio
+import logging
+
+import config
+from nodes import fused, intent, retrieval
+
+# Intents answered by a canned node, so retrieval is never needed (see route_after_intent).
+CANNED_INTENTS = frozenset({"greeting", "off_topic", "chat_with_agent"})
+RETRIEVAL_KEYS = ("company_context", "rag_sources", "user_context")
+
+_stats = {"started": 0, "committed": 0, "discarded": 0, "failed": 0}
+
+
+async def _run(state: dict, steps) -> dict:
+    for step in steps:
+        state = await step(state)
+    return state
+
+
+def start(state: dict, steps=None) -> asyncio.Task | None:
+    """Run the retrieval `steps` (node functions, in order) on `state` in the background;
+    None when speculation is off."""
+    if not config.SPECULATIVE_RETRIEVAL_ENABLED:
+        return None
+    steps = steps or (retrieval.retrieve_company_context, retrieval.retrieve_user_context)
+    _stats["started"] += 1
+    return asyncio.create_task(_run(state, steps))
+
+
+async def commit(task: asyncio.Task | None) -> dict | None:
+    """The speculative run's retrieval fields, or None if there was none or it failed."""
+    if task is None:
+        return None
+    try:
+        result = await task
+    except Exception as exc:  # noqa: BLE001 — the sequential path retries it
+        _stats["failed"] += 1
+        logging.warning("speculative retrieval failed (retrieving sequentially): %s", exc)
+        return None
+    _stats["committed"] += 1
+    return {key: result[key] for key in RETRIEVAL_KEYS if key in result}
+
+
+def discard(task: asyncio.Task | None) -> None:
+    if task is None:
+        return
+    _stats["discarded"] += 1
+    task.cancel()
+    # Swallow the outcome so a task that already failed isn't reported as never retrieved.
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+async def detect_intent_speculative(state: dict) -> dict:
+    """Graph entry node: detect_intent with retrieval running alongside it. Sets
+    `speculative_retrieval` every turn, so a previous turn's flag never leaks through the
+    checkpointer. In fused intent mode (#48) there is no classifier call to overlap with, so
+    retrieval just runs next in the graph."""
+    if fused.enabled():
+        return fused.skip_classifier(state)
+    state = {**state, "fused_intent": False}
+    task = start(state)
+    try:
+        state = await intent.detect_intent(state)
+    except BaseException:
+        discard(task)
+        raise
+    if task is None or state.get("intent") in CANNED_INTENTS:
+        discard(task)
+        return {**state, "speculative_retrieval": False}
+    retrieved = await commit(task)
+    if retrieved is None:
+        return {**state, "speculative_retrieval": False}
+    return {**state, **retrieved, "speculative_retrieval": True}
+
+
+def get_stats() -> dict:
+    """Speculation outcomes, for /usage-report."""
+    return dict(_stats)
+
+
+def reset() -> None:
+    for key in _stats:
+        _stats[key] = 0
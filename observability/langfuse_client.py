@@ -238,6 +238,10 @@ def end_llm_generation(
                 "output": usage.get("completion_tokens", 0),
                 "total": usage.get("total_tokens", 0),
             }
+            # DeepSeek's context-cache split of the prompt (#42): how much of it was a prefix hit.
+            if "prompt_cache_hit_tokens" in usage:
+                metadata = {**(metadata or {}), "prompt_cache_hit_tokens": usage["prompt_cache_hit_tokens"],
+                            "prompt_cache_miss_tokens": usage.get("prompt_cache_miss_tokens", 0)}
 
         if metadata:
             end_kwargs["metadata"] = metadata
@@ -319,14 +323,16 @@ async def evaluate_response(
             return None
 
         # Call LLM for evaluation (routed via llm.py — same model routing + provider fallback;
-        # runs on a tighter timeout).
+        # runs on a tighter timeout, lowest in the bulkhead so it never delays a visitor).
         from providers import llm
 
         resp = await llm.chat_completion(
             [{"role": "user", "content": compiled}],
-            task="generation",
+            task="judge",
             temperature=0.1,
             timeout=15.0,
+            max_tokens=None,  # a JSON score object, not a visitor reply: no generation cap
+            stop=None,
         )
         data = resp.json()
         eval_text = data["choices"][0]["message"]["content"].strip()
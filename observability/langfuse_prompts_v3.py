@@ -31,10 +31,6 @@ Company services: websites, e-commerce, custom platforms/systems/apps (SaaS, int
 systems, CRMs, dashboards, e-learning/EAD — any bespoke software), automation, and
 AI solutions / AI agents.
 
-User message: "{{user_input}}"
-User language: {{language}}
-Current page: {{current_page}}
-
 Messages are short, informal, and often contain typos, abbreviations (vc, vcs, pq),
 missing accents, or spelling mistakes ("automassao" = automação). Classify by INTENT,
 not by spelling.
@@ -81,7 +77,11 @@ Examples:
 - "qual a capital do Brasil?" → off_topic
 
 Respond with ONLY a JSON object, no prose:
-{"intent": "<one of: greeting, request_quote, inquire_services, share_contact, chat_with_agent, off_topic>"}""",
+{"intent": "<one of: greeting, request_quote, inquire_services, share_contact, chat_with_agent, off_topic>"}
+
+User language: {{language}}
+Current page: {{current_page}}
+User message: "{{user_input}}\"""",
         "config": {"model": "deepseek-v4-flash", "temperature": 0.1},
     },
 
@@ -114,14 +114,6 @@ Generate the redirect response in {{language}}:""",
         "type": "text",
         "prompt": """Generate a response about WB Digital Solutions services.
 
-User question: "{{user_input}}"
-Language: {{language}}
-Current page: {{current_page}}
-Detected intent: {{intent}}
-
-COMPANY CONTEXT:
-{{company_context}}
-
 RULES:
 1. Answer the specific question asked
 2. Be informative but concise (max 3 paragraphs)
@@ -144,6 +136,14 @@ SERVICES TO MENTION (if relevant):
 FORMATTING: reply in PLAIN TEXT. Do NOT use markdown — no **bold**, no #, no backticks;
 the chat widget shows raw characters, so asterisks would appear literally.
 
+COMPANY CONTEXT:
+{{company_context}}
+
+Language: {{language}}
+Current page: {{current_page}}
+Detected intent: {{intent}}
+User question: "{{user_input}}"
+
 Generate response in {{language}}:""",
         "config": {"model": "deepseek-v4-flash", "temperature": 0.7},
     },
@@ -172,20 +172,20 @@ Generate response in {{language}}:""",
         "type": "text",
         "prompt": """Revise this chatbot response.
 
-Original: {{response}}
-Language: {{language}}
-Intent: {{intent}}
-
 STRICT RULES:
 1. MAX 500 characters
 2. MAX 3 paragraphs
-3. Keep original language ({{language}})
+3. Keep the original language
 4. Do NOT add a phone number or WhatsApp that isn't already in the original — contact is
    surfaced elsewhere (a booking link / human handoff), only when the user asks or is ready
 5. If contact is already present, keep it (consolidate if fragmented)
 6. Remove redundancy
 7. Keep friendly, professional tone
 
+Language: {{language}}
+Intent: {{intent}}
+Original: {{response}}
+
 Return ONLY the revised text:""",
         "config": {"model": "deepseek-v4-flash", "temperature": 0.5},
     },
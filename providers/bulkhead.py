@@ -0,0 +1,179 @@
+"""Priority bulkhead for outbound LLM calls (#45), used by llm.
+
+Without it every task hit the provider with unbounded concurrency: under a spike the
+background judge, revisions and generations all raced the visitor-facing intent call and the
+provider answered 429. Every routed call now holds a slot for its duration (a stream until it
+ends). Slots are capped per task class (LLM_BULKHEAD_LIMITS, "task:cap") and in total
+(LLM_BULKHEAD_MAX_CONCURRENCY); when they run out, callers queue and a freed slot goes to
+the highest-priority waiter whose class is under its cap:
+
+    intent > generation > revision > judge
+
+Tasks without a class of their own (off-topic replies, ad-hoc callers) queue as generation.
+When more than LLM_BULKHEAD_MAX_QUEUE calls are waiting, the lowest-priority, most recent
+waiter is shed with Shed — an httpx.RequestError, so callers' existing transport-error
+handling applies (revision keeps the draft, the judge skips scoring).
+
+Queue waits are tallied per class in latency ("queue:<class>") for /usage-report. State is
+per process and bound to the running event loop, like pool.Endpoint's semaphore.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+import config
+from providers import latency
+
+PRIORITY = ("intent", "generation", "revision", "judge")  # highest first
+DEFAULT_CLASS = "generation"
+
+
+class Shed(httpx.RequestError):
+    """The call was dropped by the bulkhead before being sent."""
+
+
+_limits_parsed: tuple = (None, {})  # (raw LLM_BULKHEAD_LIMITS, {class: cap})
+
+
+def _limits() -> dict:
+    """Parse LLM_BULKHEAD_LIMITS once per distinct value; classes left out are uncapped
+    (bounded only by the global cap)."""
+    global _limits_parsed
+    raw = config.LLM_BULKHEAD_LIMITS or ""
+    if raw != _limits_parsed[0]:
+        caps = {}
+        for item in raw.split(","):
+            name, _, cap = (p.strip() for p in item.partition(":"))
+            if name in PRIORITY and cap.isdigit() and int(cap) > 0:
+                caps[name] = int(cap)
+        _limits_parsed = (raw, caps)
+    return _limits_parsed[1]
+
+
+def class_for(task: str) -> str:
+    return task if task in PRIORITY else DEFAULT_CLASS
+
+
+class _Waiter:
+    __slots__ = ("klass", "rank", "seq", "future", "queued_at")
+
+    def __init__(self, klass: str, seq: int, future: asyncio.Future):
+        self.klass = klass
+        self.rank = PRIORITY.index(klass)
+        self.seq = seq
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+_loop = None
+_active: dict = {}  # class -> calls holding a slot
+_waiters: list = []  # _Waiter, kept sorted by (rank, seq)
+_seq = itertools.count()
+_stats: dict = {}  # class -> {"granted", "queued", "shed"}
+
+
+def _bind_loop() -> None:
+    """Drop slot/queue state that belongs to a previous event loop (tests, reloads)."""
+    global _loop
+    loop = asyncio.get_running_loop()
+    if loop is not _loop:
+        _loop = loop
+        _active.clear()
+        _waiters.clear()
+
+
+def _counter(klass: str) -> dict:
+    return _stats.setdefault(klass, {"granted": 0, "queued": 0, "shed": 0})
+
+
+def _has_room(klass: str) -> bool:
+    cap = _limits().get(klass)
+    if cap is not None and _active.get(klass, 0) >= cap:
+        return False
+    return sum(_active.values()) < config.LLM_BULKHEAD_MAX_CONCURRENCY
+
+
+def _dispatch() -> None:
+    """Hand free slots to waiters in priority order, skipping classes at their own cap."""
+    for waiter in list(_waiters):
+        if sum(_active.values()) >= config.LLM_BULKHEAD_MAX_CONCURRENCY:
+            return
+        if _has_room(waiter.klass):
+            _waiters.remove(waiter)
+            _active[waiter.klass] = _active.get(waiter.klass, 0) + 1
+            waiter.future.set_result(None)
+
+
+def _shed_overflow() -> None:
+    while len(_waiters) > config.LLM_BULKHEAD_MAX_QUEUE:
+        victim = _waiters.pop()  # lowest priority, newest
+        _counter(victim.klass)["shed"] += 1
+        logging.warning("LLM bulkhead shed a queued %s call (%d waiting)", victim.klass, len(_waiters))
+        victim.future.set_exception(Shed(f"LLM bulkhead queue full; {victim.klass} call shed"))
+
+
+@asynccontextmanager
+async def slot(task: str):
+    """Hold one outbound-call slot for `task`, queueing by priority when none is free."""
+    if not config.LLM_BULKHEAD_ENABLED:
+        yield
+        return
+    _bind_loop()
+    klass = class_for(task)
+    waiter = _Waiter(klass, next(_seq), asyncio.get_running_loop().create_future())
+    _waiters.append(waiter)
+    _waiters.sort(key=lambda w: (w.rank, w.seq))
+    _dispatch()
+    if not waiter.future.done():
+        _counter(klass)["queued"] += 1
+        _shed_overflow()
+    try:
+        await waiter.future
+    except asyncio.CancelledError:
+        if waiter in _waiters:
+            _waiters.remove(waiter)
+        elif waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+            _release(klass)  # granted just as we were cancelled: give the slot back
+        raise
+    latency.record(f"queue:{klass}", time.monotonic() - waiter.queued_at)
+    _counter(klass)["granted"] += 1
+    try:
+        yield
+    finally:
+        _release(klass)
+
+
+def _release(klass: str) -> None:
+    _active[klass] = max(0, _active.get(klass, 0) - 1)
+    _dispatch()
+
+
+def get_stats() -> dict:
+    """Per-class slots in use, queue depth, counters and queue-wait p50/p95, for /usage-report."""
+    caps = _limits()
+    out = {}
+    for klass in PRIORITY:
+        key = f"queue:{klass}"
+        p50, p95 = latency.percentile(key, 50), latency.percentile(key, 95)
+        out[klass] = {
+            **_counter(klass), "cap": caps.get(klass), "active": _active.get(klass, 0),
+            "waiting": sum(1 for w in _waiters if w.klass == klass),
+            "wait_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "wait_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+    return {"max_concurrency": config.LLM_BULKHEAD_MAX_CONCURRENCY,
+            "max_queue": config.LLM_BULKHEAD_MAX_QUEUE, "classes": out}
+
+
+def reset() -> None:
+    global _loop, _limits_parsed
+    _loop = None
+    _active.clear()
+    _waiters.clear()
+    _stats.clear()
+    _limits_parsed = (None, {})
@@ -0,0 +1,105 @@
+"""Per provider+model circuit breakers (#38), consulted by providers/llm.py.
+
+Without one, a degraded primary made every request wait out its own timeout before failing
+over. Each (provider, model) pair keeps its last LLM_BREAKER_WINDOW outcomes; a call counts
+as a failure when it raised, returned a failover status (5xx/402/429), took longer than
+LLM_BREAKER_SLOW_CALL_SECONDS, or was cancelled because a hedged fallback answered first. Once at least LLM_BREAKER_MIN_CALLS are in the window and the
+failure rate reaches LLM_BREAKER_ERROR_RATE the breaker OPENS: llm routes straight to the
+fallback. After LLM_BREAKER_COOLDOWN_SECONDS it goes HALF-OPEN and lets a single probe
+through — success closes it (with a clean window), failure re-opens it.
+
+In-process state: each worker learns the provider's health from its own traffic.
+"""
+
+import time
+from collections import deque
+
+import config
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_EWMA_ALPHA = 0.2
+
+
+class CircuitBreaker:
+    def __init__(self):
+        self.state = CLOSED
+        self.outcomes: deque = deque(maxlen=config.LLM_BREAKER_WINDOW)  # True = failure
+        self.opened_at = 0.0
+        self.probe_started = None
+        self.trips = 0
+        self.ewma_latency = None
+
+    def allow(self) -> bool:
+        """May a request go to this provider now? Claims the half-open probe slot."""
+        if not config.LLM_BREAKER_ENABLED or self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < config.LLM_BREAKER_COOLDOWN_SECONDS:
+                return False
+            self.state = HALF_OPEN
+            self.probe_started = None
+        # HALF_OPEN: one probe at a time; a probe that never reported (cancelled) frees its
+        # slot after another cooldown so the breaker can't wedge half-open.
+        if self.probe_started is not None and now - self.probe_started < config.LLM_BREAKER_COOLDOWN_SECONDS:
+            return False
+        self.probe_started = now
+        return True
+
+    def record(self, ok: bool, seconds: float | None = None) -> None:
+        """One finished call: `ok` False for an error/failover status; slow calls fail too."""
+        if seconds is not None:
+            self.ewma_latency = seconds if self.ewma_latency is None else (
+                _EWMA_ALPHA * seconds + (1 - _EWMA_ALPHA) * self.ewma_latency)
+            if config.LLM_BREAKER_SLOW_CALL_SECONDS and seconds >= config.LLM_BREAKER_SLOW_CALL_SECONDS:
+                ok = False
+        if self.state == HALF_OPEN:
+            if ok:
+                self.state = CLOSED
+                self.outcomes.clear()
+            else:
+                self._trip()
+            self.probe_started = None
+            return
+        self.outcomes.append(not ok)
+        if (self.state == CLOSED and config.LLM_BREAKER_ENABLED
+                and len(self.outcomes) >= config.LLM_BREAKER_MIN_CALLS
+                and self.error_rate() >= config.LLM_BREAKER_ERROR_RATE):
+            self._trip()
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+
+    def error_rate(self) -> float:
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "calls": len(self.outcomes),
+            "error_rate": round(self.error_rate(), 3),
+            "ewma_latency_seconds": round(self.ewma_latency, 3) if self.ewma_latency is not None else None,
+            "trips": self.trips,
+            "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.state != CLOSED else None,
+        }
+
+
+_breakers: dict = {}  # (provider, model) -> CircuitBreaker
+
+
+def get(provider: str, model: str) -> CircuitBreaker:
+    key = (provider, model)
+    if key not in _breakers:
+        _breakers[key] = CircuitBreaker()
+    return _breakers[key]
+
+
+def get_stats() -> dict:
+    """{"provider:model": snapshot} for /usage-report."""
+    return {f"{provider}:{model}": breaker.snapshot() for (provider, model), breaker in _breakers.items()}
+
+
+def reset() -> None:
+    _breakers.clear()
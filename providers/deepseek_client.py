@@ -5,16 +5,57 @@ The same httpx POST was copy-pasted at five call sites (intent detection, the to
 revision, off-topic, and the eval judge), each repeating the URL, auth headers, model name,
 timeout, and error-prone response unpack. A change to any of those had to be made in five
 places. This centralizes the call so provider/model/timeout live in one spot (config).
+
+Connections: the app holds one long-lived, pooled AsyncClient (keep-alive + HTTP/2), opened
+in main.lifespan via start_client() and closed on shutdown, so the intent, generation,
+revision, tool-loop and judge calls of a turn reuse one TLS connection instead of paying a
+fresh TCP+TLS handshake each. Without it (scripts, evals, tests) every call opens its own
+short-lived client, as before.
 """
 
 import json
 
 import httpx
 
+import config
 from config import DEEPSEEK_API_KEY, DEEPSEEK_API_URL, DEEPSEEK_MODEL
 
 DEFAULT_TIMEOUT = 30.0
 
+_client: httpx.AsyncClient | None = None
+
+
+def build_client() -> httpx.AsyncClient:
+    """A pooled keep-alive client (HTTP/2 when LLM_HTTP2, multiplexing concurrent calls)."""
+    return httpx.AsyncClient(
+        http2=config.LLM_HTTP2,
+        timeout=DEFAULT_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=config.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=config.LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=config.LLM_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+async def start_client() -> None:
+    global _client
+    if _client is None:
+        _client = build_client()
+
+
+async def aclose_client() -> None:
+    # Detach first: a background task (judge, revalidation) finishing during shutdown falls
+    # back to a one-off client instead of hitting a closed pool.
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+def get_client() -> httpx.AsyncClient | None:
+    return _client
+
 
 async def chat_completion(
     messages: list,
@@ -22,6 +63,8 @@ async def chat_completion(
     temperature: float = 0.7,
     tools: list | None = None,
     response_format: dict | None = None,
+    max_tokens: int | None = None,
+    stop: list | None = None,
     extra_headers: dict | None = None,
     timeout: float = DEFAULT_TIMEOUT,
     model: str | None = None,
@@ -45,6 +88,10 @@ async def chat_completion(
         body["tool_choice"] = "auto"
     if response_format is not None:
         body["response_format"] = response_format
+    if max_tokens is not None:
+        body["max_tokens"] = max_tokens
+    if stop:
+        body["stop"] = stop
 
     headers = {
         "Authorization": f"Bearer {api_key or DEEPSEEK_API_KEY}",
@@ -53,6 +100,8 @@ async def chat_completion(
     if extra_headers:
         headers.update(extra_headers)
 
+    if _client is not None:
+        return await _client.post(api_url or DEEPSEEK_API_URL, headers=headers, json=body, timeout=timeout)
     async with httpx.AsyncClient(timeout=timeout) as client:
         return await client.post(api_url or DEEPSEEK_API_URL, headers=headers, json=body)
 
@@ -61,6 +110,8 @@ async def stream_chat_completion(
     messages: list,
     *,
     temperature: float = 0.7,
+    max_tokens: int | None = None,
+    stop: list | None = None,
     extra_headers: dict | None = None,
     timeout: float = DEFAULT_TIMEOUT,
     model: str | None = None,
@@ -84,6 +135,10 @@ async def stream_chat_completion(
         "temperature": temperature,
         "stream": True,
     }
+    if max_tokens is not None:
+        body["max_tokens"] = max_tokens
+    if stop:
+        body["stop"] = stop
     if usage_sink is not None:
         body["stream_options"] = {"include_usage": True}
     headers = {
@@ -93,25 +148,38 @@ async def stream_chat_completion(
     if extra_headers:
         headers.update(extra_headers)
 
+    url = api_url or DEEPSEEK_API_URL
+    if _client is not None:
+        async for delta in _stream_deltas(_client, url, headers, body, usage_sink, timeout=timeout):
+            yield delta
+        return
     async with httpx.AsyncClient(timeout=timeout) as client:
-        async with client.stream("POST", api_url or DEEPSEEK_API_URL, headers=headers, json=body) as resp:
-            resp.raise_for_status()  # a 4xx/5xx surfaces to the endpoint, which degrades gracefully
-            async for line in resp.aiter_lines():
-                if not line or not line.startswith("data:"):
-                    continue
-                data = line[len("data:"):].strip()
-                if data == "[DONE]":
-                    break
-                try:
-                    chunk = json.loads(data)
-                except ValueError:
-                    continue
-                # The final usage chunk (choices=[]) carries token counts when include_usage is on.
-                if usage_sink is not None and isinstance(chunk.get("usage"), dict):
-                    usage_sink.update(chunk["usage"])
-                try:
-                    delta = chunk["choices"][0]["delta"].get("content")
-                except (KeyError, IndexError, TypeError):
-                    continue
-                if delta:
-                    yield delta
+        async for delta in _stream_deltas(client, url, headers, body, usage_sink):
+            yield delta
+
+
+async def _stream_deltas(client, url: str, headers: dict, body: dict, usage_sink, **request_kwargs):
+    async with client.stream("POST", url, headers=headers, json=body, **request_kwargs) as resp:
+        resp.raise_for_status()  # a 4xx/5xx surfaces to the endpoint, which degrades gracefully
+        async for line in resp.aiter_lines():
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data)
+            except ValueError:
+                continue
+            # The final usage chunk (choices=[]) carries token counts when include_usage is on;
+            # the serving model is kept alongside so the caller bills it at the right price.
+            if usage_sink is not None and isinstance(chunk.get("usage"), dict):
+                usage_sink.update(chunk["usage"])
+                if chunk.get("model"):
+                    usage_sink["model"] = chunk["model"]
+            try:
+                delta = chunk["choices"][0]["delta"].get("content")
+            except (KeyError, IndexError, TypeError):
+                continue
+            if delta:
+                yield delta
@@ -12,6 +12,8 @@ import pytz
 import logging
 from typing import Dict, Optional, Tuple
 
+import config
+
 # --- Per-request cost accumulator ---
 #
 # Feeds the spend cap in security.py: every DeepSeek call routed through
@@ -66,6 +68,14 @@ class DeepSeekOptimizer:
         }
     }
     
+    # Per-model prices (USD per 1M tokens). INTENT_MODEL, GENERATION_MODEL, the fallback and
+    # pool endpoints may each run a different model; the model named in the response body
+    # picks the row. LLM_PRICING ("model:cache_hit:cache_miss:output,...") adds or overrides
+    # rows without a deploy; a model in neither falls back to PRICING above.
+    MODEL_PRICING = {
+        "deepseek-v4-flash": {"input_cache_hit": 0.0028, "input_cache_miss": 0.14, "output": 0.28},
+    }
+
     # Contadores para monitoramento
     token_usage = {
         "input_tokens": 0,
@@ -73,7 +83,11 @@ class DeepSeekOptimizer:
         "cache_hits": 0,
         "cache_misses": 0,
         "api_calls": 0,
-        "cached_responses": 0
+        "cached_responses": 0,
+        "cache_hit_tokens": 0,
+        "cache_miss_tokens": 0,
+        "cost_usd": 0.0,
+        "by_model": {},
     }
     
     @staticmethod
@@ -105,70 +119,95 @@ class DeepSeekOptimizer:
         return brazil_time.strftime("%H:%M:%S")
     
     @staticmethod
-    def get_current_pricing() -> Dict[str, float]:
+    def get_current_pricing(model: Optional[str] = None) -> Dict[str, float]:
         """
-        Retorna preços atuais baseado no horário
-        
+        Retorna preços atuais: a linha do modelo (MODEL_PRICING / LLM_PRICING) ou, para um
+        modelo desconhecido, a tabela padrão conforme o horário
+
         Returns:
             dict: Preços atuais por tipo de token
         """
+        if model:
+            pricing = DeepSeekOptimizer.model_pricing().get(model)
+            if pricing:
+                return pricing
         if DeepSeekOptimizer.is_discount_time():
             return DeepSeekOptimizer.PRICING["discount"]
         return DeepSeekOptimizer.PRICING["standard"]
-    
+
+    @staticmethod
+    def model_pricing() -> Dict[str, Dict[str, float]]:
+        """MODEL_PRICING merged with the LLM_PRICING overrides (malformed entries skipped)."""
+        table = dict(DeepSeekOptimizer.MODEL_PRICING)
+        for item in (config.LLM_PRICING or "").split(","):
+            parts = [p.strip() for p in item.rsplit(":", 3)]
+            if len(parts) != 4 or not parts[0]:
+                continue
+            try:
+                hit, miss, out = (float(p) for p in parts[1:])
+            except ValueError:
+                continue
+            table[parts[0]] = {"input_cache_hit": hit, "input_cache_miss": miss, "output": out}
+        return table
+
+    @staticmethod
+    def _split_input(input_tokens: int, cache_hit: bool, cache_hit_tokens: Optional[int]) -> Tuple[int, int]:
+        """(hit, miss) prompt tokens. DeepSeek reports the split in usage; without it the old
+        whole-prompt `cache_hit` flag decides."""
+        if cache_hit_tokens is None:
+            hit = input_tokens if cache_hit else 0
+        else:
+            hit = max(0, min(cache_hit_tokens, input_tokens))
+        return hit, input_tokens - hit
+
     @staticmethod
-    def estimate_cost(input_tokens: int, output_tokens: int, 
-                     cache_hit: bool = False) -> Tuple[float, float]:
+    def estimate_cost(input_tokens: int, output_tokens: int,
+                     cache_hit: bool = False, cache_hit_tokens: Optional[int] = None,
+                     model: Optional[str] = None) -> Tuple[float, float]:
         """
         Estima custo de uma requisição
-        
+
         Args:
             input_tokens: Número de tokens de entrada
             output_tokens: Número de tokens de saída
-            cache_hit: Se houve cache hit no context caching
-            
+            cache_hit: Se o prompt inteiro foi cache hit (quando não há o split abaixo)
+            cache_hit_tokens: usage.prompt_cache_hit_tokens — cobrados ao preço de hit, o
+                restante do prompt ao preço de miss
+            model: Modelo que atendeu a chamada (escolhe a linha de preços)
+
         Returns:
             tuple: (custo_atual, economia_se_desconto)
         """
-        pricing = DeepSeekOptimizer.get_current_pricing()
-        
-        # Calcular custo atual
-        if cache_hit:
-            input_cost = (input_tokens / 1_000_000) * pricing["input_cache_hit"]
-        else:
-            input_cost = (input_tokens / 1_000_000) * pricing["input_cache_miss"]
-        
-        output_cost = (output_tokens / 1_000_000) * pricing["output"]
-        total_cost = input_cost + output_cost
-        
-        # Calcular economia potencial
-        if DeepSeekOptimizer.is_discount_time():
-            # Já está com desconto, economia seria 0
+        hit, miss = DeepSeekOptimizer._split_input(input_tokens, cache_hit, cache_hit_tokens)
+
+        def cost_at(pricing):
+            return (hit * pricing["input_cache_hit"] + miss * pricing["input_cache_miss"]
+                    + output_tokens * pricing["output"]) / 1_000_000
+
+        total_cost = cost_at(DeepSeekOptimizer.get_current_pricing(model))
+
+        # Calcular economia potencial (só a tabela padrão tem faixa de desconto)
+        if DeepSeekOptimizer.is_discount_time() or (model and model in DeepSeekOptimizer.model_pricing()):
             savings = 0
         else:
-            # Calcular quanto economizaria se fosse horário de desconto
-            discount_pricing = DeepSeekOptimizer.PRICING["discount"]
-            if cache_hit:
-                discount_input = (input_tokens / 1_000_000) * discount_pricing["input_cache_hit"]
-            else:
-                discount_input = (input_tokens / 1_000_000) * discount_pricing["input_cache_miss"]
-            discount_output = (output_tokens / 1_000_000) * discount_pricing["output"]
-            discount_total = discount_input + discount_output
-            savings = total_cost - discount_total
-        
+            savings = total_cost - cost_at(DeepSeekOptimizer.PRICING["discount"])
+
         return total_cost, savings
     
     @staticmethod
     def update_usage(input_tokens: int = 0, output_tokens: int = 0,
-                    cache_hit: bool = False, is_cached_response: bool = False):
+                    cache_hit: bool = False, is_cached_response: bool = False,
+                    cache_hit_tokens: Optional[int] = None, model: Optional[str] = None):
         """
         Atualiza contadores de uso
-        
+
         Args:
             input_tokens: Tokens de entrada usados
             output_tokens: Tokens de saída gerados
-            cache_hit: Se houve cache hit no context caching
+            cache_hit: Se o prompt inteiro foi cache hit (legado, sem o split do usage)
             is_cached_response: Se foi resposta do cache local
+            cache_hit_tokens: usage.prompt_cache_hit_tokens da resposta
+            model: Modelo que atendeu a chamada (usage/response "model")
         """
         if is_cached_response:
             DeepSeekOptimizer.token_usage["cached_responses"] += 1
@@ -177,16 +216,28 @@ class DeepSeekOptimizer:
             DeepSeekOptimizer.token_usage["input_tokens"] += input_tokens
             DeepSeekOptimizer.token_usage["output_tokens"] += output_tokens
             DeepSeekOptimizer.token_usage["api_calls"] += 1
-            
-            if cache_hit:
+
+            hit, miss = DeepSeekOptimizer._split_input(input_tokens, cache_hit, cache_hit_tokens)
+            if hit:
                 DeepSeekOptimizer.token_usage["cache_hits"] += 1
             else:
                 DeepSeekOptimizer.token_usage["cache_misses"] += 1
-            
+
             # Calcular e logar custo
             cost, savings = DeepSeekOptimizer.estimate_cost(
-                input_tokens, output_tokens, cache_hit
+                input_tokens, output_tokens, cache_hit, cache_hit_tokens, model
             )
+            usage = DeepSeekOptimizer.token_usage
+            usage["cache_hit_tokens"] = usage.get("cache_hit_tokens", 0) + hit
+            usage["cache_miss_tokens"] = usage.get("cache_miss_tokens", 0) + miss
+            usage["cost_usd"] = usage.get("cost_usd", 0.0) + cost
+            row = usage.setdefault("by_model", {}).setdefault(model or "unknown", {
+                "api_calls": 0, "cache_hit_tokens": 0, "cache_miss_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+            row["api_calls"] += 1
+            row["cache_hit_tokens"] += hit
+            row["cache_miss_tokens"] += miss
+            row["output_tokens"] += output_tokens
+            row["cost_usd"] += cost
 
             # Bill this call to the in-flight /chat request so the spend cap sees it.
             add_request_cost(cost)
@@ -198,7 +249,7 @@ class DeepSeekOptimizer:
                 f"💰 API Call - Custo: ${cost:.4f} | "
                 f"Desconto: {'✅ ATIVO' if discount_active else '❌ INATIVO'} | "
                 f"Horário Brasil: {brazil_time} | "
-                f"Tokens: {input_tokens}→{output_tokens}"
+                f"Tokens: {input_tokens} ({hit} cache hit)→{output_tokens}"
             )
             
             if savings > 0:
@@ -208,49 +259,40 @@ class DeepSeekOptimizer:
     def get_usage_report() -> Dict:
         """
         Gera relatório de uso e custos
-        
+
+        Custo e taxa de cache vêm do que cada chamada realmente cobrou: os tokens de prompt
+        em cache hit e em miss (usage do DeepSeek), a preço do modelo que atendeu.
+
         Returns:
             dict: Relatório detalhado de uso e custos
         """
         usage = DeepSeekOptimizer.token_usage
-        
-        # Calcular custos totais (assumindo média de cache hits)
-        avg_cache_hit_rate = (
-            usage["cache_hits"] / max(usage["api_calls"], 1)
-        ) if usage["api_calls"] > 0 else 0
-        
-        # Estimar custos
-        standard_pricing = DeepSeekOptimizer.PRICING["standard"]
-        discount_pricing = DeepSeekOptimizer.PRICING["discount"]
-        
-        # Custo médio ponderado
-        input_cost_standard = (
-            (usage["input_tokens"] / 1_000_000) * 
-            (avg_cache_hit_rate * standard_pricing["input_cache_hit"] +
-             (1 - avg_cache_hit_rate) * standard_pricing["input_cache_miss"])
-        )
-        
-        output_cost_standard = (
-            (usage["output_tokens"] / 1_000_000) * standard_pricing["output"]
-        )
-        
-        total_cost = input_cost_standard + output_cost_standard
-        
-        # Calcular economia do cache local
+        hit_tokens = usage.get("cache_hit_tokens", 0)
+        miss_tokens = usage.get("cache_miss_tokens", 0)
+        total_cost = usage.get("cost_usd", 0.0)
+
+        # Share of prompt tokens billed at the cache-hit price
+        cache_hit_rate = hit_tokens / (hit_tokens + miss_tokens) if hit_tokens + miss_tokens else 0
+
+        # Calcular economia do cache local (cada resposta servida do cache evita uma chamada média)
         cache_savings = usage["cached_responses"] * (total_cost / max(usage["api_calls"], 1))
-        
+
         return {
             "total_api_calls": usage["api_calls"],
             "cached_responses": usage["cached_responses"],
-            "cache_hit_rate": f"{avg_cache_hit_rate * 100:.1f}%",
+            "cache_hit_rate": f"{cache_hit_rate * 100:.1f}%",
             "total_input_tokens": usage["input_tokens"],
             "total_output_tokens": usage["output_tokens"],
+            "prompt_cache_hit_tokens": hit_tokens,
+            "prompt_cache_miss_tokens": miss_tokens,
             "estimated_cost": f"${total_cost:.4f}",
             "cache_savings": f"${cache_savings:.4f}",
+            "by_model": {model: {**row, "cost_usd": round(row["cost_usd"], 6)}
+                         for model, row in usage.get("by_model", {}).items()},
             "current_discount": DeepSeekOptimizer.is_discount_time(),
             "brazil_time": DeepSeekOptimizer.get_brazil_time()
         }
-    
+
     @staticmethod
     def get_optimization_headers() -> Dict[str, str]:
         """
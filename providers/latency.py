@@ -0,0 +1,37 @@
+"""Rolling per-task latency of primary LLM calls (#37), the basis for hedging.
+
+Each task keeps its last LLM_LATENCY_WINDOW completed primary calls; percentile() answers
+"how long does this task usually take". Kept in-process: it only steers this worker's own
+hedge decisions, and a cold window just means the configured default delay applies.
+"""
+
+from collections import deque
+
+import config
+
+_windows: dict = {}  # task -> deque[seconds]
+
+
+def record(task: str, seconds: float) -> None:
+    window = _windows.get(task)
+    if window is None or window.maxlen != config.LLM_LATENCY_WINDOW:
+        window = _windows[task] = deque(window or (), maxlen=config.LLM_LATENCY_WINDOW)
+    window.append(seconds)
+
+
+def count(task: str) -> int:
+    return len(_windows.get(task, ()))
+
+
+def percentile(task: str, p: float) -> float | None:
+    """Nearest-rank p-th percentile (0-100) of the task's window, or None when empty."""
+    window = _windows.get(task)
+    if not window:
+        return None
+    ordered = sorted(window)
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def reset() -> None:
+    _windows.clear()
@@ -7,20 +7,52 @@ a secondary OpenAI-compatible provider when the primary errors or returns a 5xx.
 Every call site goes through `chat_completion(messages, task=...)`. Model routing and the
 failover are pure config, so with the defaults (both models = DEEPSEEK_MODEL, no fallback
 configured) behaviour is identical to calling deepseek_client directly.
+
+Hedging (#37): a primary that is merely slow never errors, so it never failed over. Tasks
+listed in LLM_HEDGE also send the request to the fallback once the primary has been pending
+longer than the task's latency percentile; the first good answer wins and the other call is
+cancelled, so only the winner's `usage` ever reaches billing.
+
+Circuit breakers (#38): every primary and fallback outcome feeds the (provider, model)
+breaker in circuit_breaker.py. While the primary's breaker is open, requests skip it and go
+straight to the fallback instead of waiting out a timeout first.
+
+Provider pools (#39): a task listed in LLM_TASK_POOLS is spread over several endpoints
+(pool.py) instead — best EWMA latency x cost first, the next one on failure, FALLBACK_* last.
+
+Task profiles (#41): every call gets its task's timeout, max_tokens and stop sequences unless
+the caller passes its own. The timeout is a ceiling that shrinks to a multiple of the task's
+observed tail latency, so a 20-token intent call no longer waits as long as a generation;
+generation's max_tokens can be tightened per intent (LLM_INTENT_MAX_TOKENS).
+
+Prompt-cache accounting (#42): DeepSeek reports how many prompt tokens were served from its
+context cache (`prompt_cache_hit_tokens`); every provider call's split is tallied per task
+so /usage-report shows the hit ratio the stable prompt prefix buys.
+
+Bulkhead (#45): every call that reaches a provider (cache hits don't) holds a slot in
+bulkhead.py for its duration, so under load the visitor-facing intent and generation calls
+are served before revisions and background judge calls, which are shed first.
+
+Token counting (#46): every answered call's real prompt_tokens calibrates the local token
+counter (tokens.py), and estimate_turn_cost() gives the spend cap a turn's worst-case cost
+before anything is dispatched.
 """
 
+import asyncio
 import logging
+import time
 
 import httpx
 
 import config
-from providers import deepseek_client
+from providers import bulkhead, circuit_breaker, deepseek_client, latency, pool, response_cache, tokens
 
 # task -> configured model. Unknown tasks fall back to the primary model.
 _TASK_MODELS = {
     "intent": lambda: config.INTENT_MODEL,
     "generation": lambda: config.GENERATION_MODEL,
     "revision": lambda: config.GENERATION_MODEL,
+    "judge": lambda: config.GENERATION_MODEL,
 }
 
 
@@ -48,25 +80,195 @@ def _should_failover(status: int) -> bool:
 async def _fallback_completion(messages, **kwargs) -> httpx.Response:
     """Same request against the secondary provider (model/url/key from config)."""
     kwargs.pop("model", None)
-    return await deepseek_client.chat_completion(
-        messages,
-        model=config.FALLBACK_MODEL,
-        api_url=config.FALLBACK_API_URL,
-        api_key=config.FALLBACK_API_KEY,
-        **kwargs,
-    )
+    breaker = circuit_breaker.get("fallback", config.FALLBACK_MODEL)
+    breaker.allow()  # the last resort is always tried; this only advances open -> half-open
+    started = time.monotonic()
+    try:
+        resp = await deepseek_client.chat_completion(
+            messages,
+            model=config.FALLBACK_MODEL,
+            api_url=config.FALLBACK_API_URL,
+            api_key=config.FALLBACK_API_KEY,
+            **kwargs,
+        )
+    except httpx.HTTPError:
+        breaker.record(False, time.monotonic() - started)
+        raise
+    breaker.record(not _should_failover(getattr(resp, "status_code", 200)), time.monotonic() - started)
+    return resp
+
+
+# ---- Task profiles (#41) ----
+
+# Stop sequences per task. Generation must never continue into a made-up next turn of the
+# transcript; a free-text intent answer is a single label line (not applied in JSON mode,
+# where a pretty-printed object spans lines).
+_TASK_STOP = {
+    "generation": ["\nUser:", "\nUsuário:", "\nUsuario:", "\nUtente:"],
+    "intent": ["\n"],
+}
+
+_profiles_parsed: tuple = (None, {}, {})  # ((raw profiles, raw intents), {task: (timeout, max_tokens)}, {intent: max_tokens})
+
 
+def _profiles() -> tuple:
+    """Parse LLM_TASK_PROFILES ("task:timeout:max_tokens") and LLM_INTENT_MAX_TOKENS
+    ("intent:max_tokens") once per distinct value."""
+    global _profiles_parsed
+    raw = (config.LLM_TASK_PROFILES or "", config.LLM_INTENT_MAX_TOKENS or "")
+    if raw != _profiles_parsed[0]:
+        tasks, intents = {}, {}
+        for item in raw[0].split(","):
+            parts = [p.strip() for p in item.split(":")]
+            try:
+                timeout = float(parts[1]) if len(parts) > 1 and parts[1] else None
+                max_tokens = int(parts[2]) if len(parts) > 2 and parts[2] else None
+            except ValueError:
+                continue  # a malformed entry leaves that task on the transport defaults
+            if parts[0]:
+                tasks[parts[0]] = (timeout, max_tokens)
+        for item in raw[1].split(","):
+            intent, _, cap = (p.strip() for p in item.partition(":"))
+            if intent and cap.isdigit():
+                intents[intent] = int(cap)
+        _profiles_parsed = (raw, tasks, intents)
+    return _profiles_parsed[1], _profiles_parsed[2]
 
-async def chat_completion(messages: list, *, task: str = "generation", **kwargs) -> httpx.Response:
+
+def timeout_for(task: str) -> float:
+    """The task's timeout: its profile ceiling (else the transport default) until
+    LLM_TIMEOUT_MIN_SAMPLES calls are known, then LLM_TIMEOUT_MULTIPLIER x its
+    LLM_TIMEOUT_PERCENTILE latency, clamped to [LLM_TIMEOUT_MIN_SECONDS, ceiling]."""
+    ceiling = _profiles()[0].get(task, (None, None))[0] or deepseek_client.DEFAULT_TIMEOUT
+    if latency.count(task) < config.LLM_TIMEOUT_MIN_SAMPLES:
+        return ceiling
+    adaptive = latency.percentile(task, config.LLM_TIMEOUT_PERCENTILE) * config.LLM_TIMEOUT_MULTIPLIER
+    return min(ceiling, max(config.LLM_TIMEOUT_MIN_SECONDS, adaptive))
+
+
+def apply_profile(task: str, intent: str | None, kwargs: dict) -> dict:
+    """kwargs with the task's timeout / max_tokens / stop filled in where the caller left
+    them out (an explicit value, including None, always wins)."""
+    tasks, intents = _profiles()
+    out = dict(kwargs)
+    out.setdefault("timeout", timeout_for(task))
+    max_tokens = tasks.get(task, (None, None))[1]
+    if task == "generation" and intent in intents:
+        max_tokens = intents[intent]
+    if max_tokens:
+        out.setdefault("max_tokens", max_tokens)
+    stop = _TASK_STOP.get(task)
+    if stop and not (task == "intent" and out.get("response_format")):
+        out.setdefault("stop", stop)
+    return out
+
+
+async def chat_completion(messages: list, *, task: str = "generation", intent: str | None = None,
+                          **kwargs) -> httpx.Response:
     """Route by task to the primary provider; fail over to the secondary on error/5xx.
 
     Returns the raw httpx.Response, so callers keep their existing `.json()` / choices
     handling. When no fallback is configured, a primary failure propagates exactly as before.
+    Tasks opted into the response cache (#32) are answered from memory on a repeat request.
+    `intent` (the detected one, for generation) selects its output cap (#41).
     """
     model = kwargs.pop("model", None) or model_for(task)
+    kwargs = apply_profile(task, intent, kwargs)
+    if not response_cache.enabled_for(task):
+        async with bulkhead.slot(task):
+            resp = await _routed_completion(messages, task, model, **kwargs)
+        _observe(task, messages, kwargs.get("tools"), _usage_of(resp))
+        return resp
+    key = response_cache.cache_key(
+        model, messages,
+        **{k: kwargs.get(k) for k in ("temperature", "tools", "response_format", "max_tokens", "stop")},
+    )
+    cached = response_cache.get(task, key)
+    if cached is not None:
+        return cached
+    async with bulkhead.slot(task):
+        resp = await _routed_completion(messages, task, model, **kwargs)
+    _observe(task, messages, kwargs.get("tools"), _usage_of(resp))
+    response_cache.put(task, key, resp)
+    return resp
+
+
+def _observe(task: str, messages: list, tools: list | None, usage: dict | None) -> None:
+    """Per-call accounting from a call's usage: prompt-cache tally and token calibration."""
+    record_prompt_cache(task, usage)
+    if isinstance(usage, dict) and usage.get("prompt_tokens") and not tokens.exact():
+        raw, overhead = tokens.raw_estimate(messages, tools)
+        tokens.calibrate(raw, usage["prompt_tokens"], overhead)
+
+
+# Output cap assumed for the pre-flight estimate when the generation profile sets none.
+PREFLIGHT_OUTPUT_TOKENS = 1000
+
+
+def estimate_turn_cost(message: str) -> float:
+    """Pre-flight upper bound (USD) for a chat turn carrying `message` (#46): LLM_PREFLIGHT_CALLS
+    generation-sized calls, each at the largest prompt trimming allows (static prefix, the
+    history and context budgets, the message) plus its output cap, all at cache-miss prices."""
+    prompt = (tokens.static_tokens() + config.LLM_HISTORY_TOKEN_BUDGET
+              + config.LLM_CONTEXT_TOKEN_BUDGET + tokens.count(message))
+    output = _profiles()[0].get("generation", (None, None))[1] or PREFLIGHT_OUTPUT_TOKENS
+    return config.LLM_PREFLIGHT_CALLS * tokens.estimate_cost(prompt, output, model_for("generation"))
+
+
+# ---- Prompt-cache accounting (#42) ----
+
+_prompt_cache_stats: dict = {}
+
+
+def _usage_of(resp) -> dict | None:
+    try:
+        body = resp.json()
+    except (AttributeError, ValueError):
+        return None
+    return body.get("usage") if isinstance(body, dict) else None
+
+
+def record_prompt_cache(task: str, usage: dict | None) -> None:
+    """Tally one call's prompt tokens and how many of them hit DeepSeek's prefix cache."""
+    if not isinstance(usage, dict) or "prompt_tokens" not in usage:
+        return
+    stats = _prompt_cache_stats.setdefault(task, {"calls": 0, "prompt_tokens": 0, "prompt_cache_hit_tokens": 0})
+    stats["calls"] += 1
+    stats["prompt_tokens"] += usage.get("prompt_tokens", 0)
+    stats["prompt_cache_hit_tokens"] += usage.get("prompt_cache_hit_tokens", 0)
+    logging.debug("LLM task=%s prompt_tokens=%s prompt_cache_hit_tokens=%s",
+                  task, usage.get("prompt_tokens"), usage.get("prompt_cache_hit_tokens", 0))
+
+
+def get_prompt_cache_stats() -> dict:
+    """Per-task prompt-cache totals and hit ratio, for /usage-report."""
+    return {task: {**stats, "hit_ratio": round(stats["prompt_cache_hit_tokens"] / stats["prompt_tokens"], 3)
+                   if stats["prompt_tokens"] else None}
+            for task, stats in _prompt_cache_stats.items()}
+
+
+async def _routed_completion(messages: list, task: str, model: str, **kwargs) -> httpx.Response:
+    endpoints = pool.for_task(task)
+    if endpoints and model == model_for(task):  # an explicit model= pins the single primary
+        return await _pooled_completion(endpoints, messages, task, **kwargs)
+    breaker = circuit_breaker.get("primary", model)
+    if not breaker.allow() and fallback_configured():
+        logging.info("LLM primary %s circuit open on task=%s; routing to secondary", model, task)
+        return await _fallback_completion(messages, **kwargs)
+    percentile = _hedge_policies().get(task)
+    if percentile is not None and fallback_configured():
+        return await _hedged_completion(messages, task, model, percentile, breaker, **kwargs)
+    primary = deepseek_client.chat_completion(messages, model=model, **kwargs)
+    return await _with_failover(primary, messages, task, time.monotonic(), breaker, **kwargs)
+
+
+async def _with_failover(primary, messages: list, task: str, started: float,
+                         breaker: circuit_breaker.CircuitBreaker, **kwargs) -> httpx.Response:
+    """Await the primary call (a coroutine or an already-running task); fail over on error."""
     try:
-        resp = await deepseek_client.chat_completion(messages, model=model, **kwargs)
+        resp = await primary
     except httpx.HTTPError as exc:
+        breaker.record(False, time.monotonic() - started)
         if fallback_configured():
             logging.warning("LLM primary error on task=%s (%s); failing over to secondary", task, exc)
             return await _fallback_completion(messages, **kwargs)
@@ -75,19 +277,220 @@ async def chat_completion(messages: list, *, task: str = "generation", **kwargs)
     # error — fail over too, if we can. (getattr: a real httpx.Response always has status_code;
     # be defensive for odd/faked responses.)
     status = getattr(resp, "status_code", 200)
+    breaker.record(not _should_failover(status), time.monotonic() - started)
     if _should_failover(status) and fallback_configured():
         logging.warning("LLM primary %s on task=%s; failing over to secondary", status, task)
         return await _fallback_completion(messages, **kwargs)
+    if not _should_failover(status):
+        latency.record(task, time.monotonic() - started)
     return resp
 
 
-async def stream_completion(messages: list, *, task: str = "generation", **kwargs):
+async def _call_endpoint(endpoint: pool.Endpoint, messages: list, **kwargs):
+    """One call on a pool member, holding a concurrency slot; returns (response, error) and
+    feeds the outcome to the endpoint's EWMA and its breaker."""
+    breaker = circuit_breaker.get(endpoint.name, endpoint.model)
+    async with endpoint.slot():
+        started = time.monotonic()  # after the slot: queueing isn't the endpoint's latency
+        try:
+            resp = await deepseek_client.chat_completion(
+                messages, model=endpoint.model, api_url=endpoint.url, api_key=endpoint.api_key, **kwargs)
+        except httpx.HTTPError as exc:
+            elapsed = time.monotonic() - started
+            endpoint.record(False, elapsed)
+            breaker.record(False, elapsed)
+            return None, exc
+    elapsed = time.monotonic() - started
+    ok = not _should_failover(getattr(resp, "status_code", 200))
+    endpoint.record(ok, elapsed)
+    breaker.record(ok, elapsed)
+    return resp, None
+
+
+async def _pooled_completion(endpoints: list, messages: list, task: str, **kwargs) -> httpx.Response:
+    """Try the task's pool best-first, skipping open breakers; FALLBACK_* is the last resort.
+    If every breaker is open and there is no fallback, the best endpoint is tried anyway."""
+    resp = error = None
+    tried = False
+    for endpoint in endpoints:
+        if not circuit_breaker.get(endpoint.name, endpoint.model).allow():
+            continue
+        tried = True
+        started = time.monotonic()
+        resp, error = await _call_endpoint(endpoint, messages, **kwargs)
+        if resp is not None and not _should_failover(getattr(resp, "status_code", 200)):
+            latency.record(task, time.monotonic() - started)
+            return resp
+        logging.warning("LLM pool endpoint %s failed on task=%s (%s); trying the next",
+                        endpoint.name, task, error or getattr(resp, "status_code", "?"))
+    if fallback_configured():
+        return await _fallback_completion(messages, **kwargs)
+    if not tried:
+        resp, error = await _call_endpoint(endpoints[0], messages, **kwargs)
+    if resp is not None:
+        return resp
+    raise error
+
+
+# ---- Hedging (#37) ----
+
+_hedge_stats: dict = {}
+_hedge_parsed: tuple = ("", {})  # (raw config string, {task: percentile})
+
+
+def _hedge_policies() -> dict:
+    """Parse LLM_HEDGE ("task:percentile,...") once per distinct value."""
+    global _hedge_parsed
+    raw = config.LLM_HEDGE or ""
+    if raw != _hedge_parsed[0]:
+        policies = {}
+        for item in raw.split(","):
+            task, _, pct = (p.strip() for p in item.partition(":"))
+            try:
+                value = float(pct) if pct else 95.0
+            except ValueError:
+                continue  # a malformed entry just leaves that task unhedged
+            if task and 0 < value <= 100:
+                policies[task] = value
+        _hedge_parsed = (raw, policies)
+    return _hedge_parsed[1]
+
+
+def hedge_delay(task: str, percentile: float) -> float:
+    """Seconds to wait on the primary before hedging: the task's latency percentile once
+    LLM_HEDGE_MIN_SAMPLES calls are known (never below LLM_HEDGE_MIN_DELAY_SECONDS), else
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS."""
+    if latency.count(task) < config.LLM_HEDGE_MIN_SAMPLES:
+        return config.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+    return max(config.LLM_HEDGE_MIN_DELAY_SECONDS, latency.percentile(task, percentile))
+
+
+def _task_hedge_stats(task: str) -> dict:
+    return _hedge_stats.setdefault(task, {"calls": 0, "hedged": 0, "primary_won": 0, "fallback_won": 0})
+
+
+def _good(call: asyncio.Task) -> bool:
+    return (not call.cancelled() and call.exception() is None
+            and not _should_failover(getattr(call.result(), "status_code", 200)))
+
+
+async def _hedged_completion(messages: list, task: str, model: str, percentile: float,
+                             breaker: circuit_breaker.CircuitBreaker, **kwargs) -> httpx.Response:
+    stats = _task_hedge_stats(task)
+    stats["calls"] += 1
+    started = time.monotonic()
+    primary = asyncio.ensure_future(deepseek_client.chat_completion(messages, model=model, **kwargs))
+    done, _ = await asyncio.wait({primary}, timeout=hedge_delay(task, percentile))
+    if done:
+        return await _with_failover(primary, messages, task, started, breaker, **kwargs)
+
+    stats["hedged"] += 1
+    logging.info("LLM primary slow on task=%s; hedging to secondary", task)
+    secondary = asyncio.ensure_future(_fallback_completion(messages, **kwargs))
+    pending = {primary, secondary}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for call in (primary, secondary):  # primary first if both landed together
+                if call in done and _good(call):
+                    won = "primary_won" if call is primary else "fallback_won"
+                    stats[won] += 1
+                    # When the fallback wins, the primary's elapsed time is a lower bound on
+                    # its latency — still worth recording so the percentile doesn't drift down.
+                    latency.record(task, time.monotonic() - started)
+                    return call.result()
+        # Neither produced a good answer: surface the secondary's outcome, as plain failover would.
+        return secondary.result()
+    finally:
+        # The primary's outcome feeds its breaker. A primary cancelled because the fallback won
+        # never answered, so it is a failure: otherwise a half-open probe that lost the hedge
+        # would close the breaker, and a primary always slower than the hedge could never trip.
+        breaker.record(primary not in pending and _good(primary), time.monotonic() - started)
+        for call in pending:
+            call.cancel()  # the loser: its tokens are never read, so never billed
+
+
+def get_hedge_stats() -> dict:
+    """Per-task hedging counters plus the current delay, for /usage-report."""
+    return {task: {**_task_hedge_stats(task), "percentile": pct,
+                   "delay_seconds": round(hedge_delay(task, pct), 3), "samples": latency.count(task)}
+            for task, pct in _hedge_policies().items()}
+
+
+async def stream_completion(messages: list, *, task: str = "generation", intent: str | None = None, **kwargs):
     """Stream a routed completion, yielding content-delta strings (#14).
 
-    Routes the model by task like chat_completion. No provider failover here: a mid-stream
-    switch would double-emit tokens, so a streaming failure surfaces to the endpoint, which
-    degrades to a graceful message.
+    Routes the model by task like chat_completion. Failover (#40) happens only BEFORE the
+    first delta: if the primary errors (transport error or a failover status) or sends
+    nothing within LLM_STREAM_TTFT_SECONDS, the stream restarts on the fallback. Once a
+    token has been yielded a switch would double-emit text, so a mid-stream failure still
+    surfaces to the endpoint, which degrades to a graceful message.
     """
     model = kwargs.pop("model", None) or model_for(task)
-    async for delta in deepseek_client.stream_chat_completion(messages, model=model, **kwargs):
+    kwargs = apply_profile(task, intent, kwargs)
+    async with bulkhead.slot(task):
+        async for delta in _routed_stream(messages, task, model, **kwargs):
+            yield delta
+    _observe(task, messages, kwargs.get("tools"), kwargs.get("usage_sink"))  # filled by the final usage chunk
+
+
+async def _routed_stream(messages: list, task: str, model: str, **kwargs):
+    if not fallback_configured():
+        async for delta in deepseek_client.stream_chat_completion(messages, model=model, **kwargs):
+            yield delta
+        return
+
+    breaker = circuit_breaker.get("primary", model)
+    if not breaker.allow():
+        logging.info("LLM primary %s circuit open on stream task=%s; streaming from secondary", model, task)
+        async for delta in _fallback_stream(messages, **kwargs):
+            yield delta
+        return
+
+    primary = deepseek_client.stream_chat_completion(messages, model=model, **kwargs)
+    started = time.monotonic()
+    try:
+        async with asyncio.timeout(config.LLM_STREAM_TTFT_SECONDS or None):
+            first = await anext(primary)
+    except StopAsyncIteration:
+        breaker.record(True, time.monotonic() - started)
+        return
+    except (httpx.HTTPError, TimeoutError) as exc:
+        if isinstance(exc, httpx.HTTPStatusError) and not _should_failover(exc.response.status_code):
+            raise  # our fault (400/401/...): replaying it on the secondary won't help
+        breaker.record(False, time.monotonic() - started)
+        await primary.aclose()
+        logging.warning("LLM primary stream failed before the first token on task=%s (%s); "
+                        "failing over to secondary", task, str(exc) or "time to first token exceeded")
+        async for delta in _fallback_stream(messages, **kwargs):
+            yield delta
+        return
+    breaker.record(True, time.monotonic() - started)
+    yield first
+    async for delta in primary:
+        yield delta
+
+
+async def _fallback_stream(messages: list, **kwargs):
+    """The same stream against the secondary provider; its first-token outcome feeds its breaker."""
+    breaker = circuit_breaker.get("fallback", config.FALLBACK_MODEL)
+    breaker.allow()
+    started = time.monotonic()
+    stream = deepseek_client.stream_chat_completion(
+        messages,
+        model=config.FALLBACK_MODEL,
+        api_url=config.FALLBACK_API_URL,
+        api_key=config.FALLBACK_API_KEY,
+        **kwargs,
+    )
+    try:
+        first = await anext(stream)
+    except StopAsyncIteration:
+        return
+    except httpx.HTTPError:
+        breaker.record(False, time.monotonic() - started)
+        raise
+    breaker.record(True, time.monotonic() - started)
+    yield first
+    async for delta in stream:
         yield delta
@@ -0,0 +1,150 @@
+"""Provider pools (#39): several OpenAI-compatible endpoints serving one task, used by llm.
+
+LLM_ENDPOINTS declares the endpoints as a JSON list:
+
+    [{"name": "deepseek", "url": "https://api.deepseek.com/v1/chat/completions",
+      "model": "deepseek-chat", "api_key_env": "DEEPSEEK_API_KEY", "cost": 1.0, "max_concurrency": 8},
+     {"name": "together", "url": "...", "model": "...", "api_key_env": "TOGETHER_API_KEY", "cost": 1.4}]
+
+and LLM_TASK_POOLS assigns them to tasks ("generation:deepseek|together,intent:deepseek"), so
+intent and generation can have different pools. Tasks without a pool keep the single
+primary + FALLBACK_* routing.
+
+Each request goes to the endpoint with the lowest score = EWMA latency x cost. A failed call
+is fed to the EWMA as if it had taken LLM_POOL_ERROR_PENALTY_SECONDS (or longer), so an
+endpoint that keeps erroring sinks to the back instead of looking fast. An endpoint that has
+never been called is explored first (one probe at a time, cheapest first) to learn its
+latency; until a call finishes it doesn't compete on score. Endpoints at max_concurrency are only
+chosen when every endpoint is full, and then the request queues for a slot. State (latency,
+in-flight count) is per process and per endpoint name, so it survives config re-parses.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+from contextlib import asynccontextmanager
+
+import config
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class Endpoint:
+    def __init__(self, name: str, url: str, model: str, api_key: str, cost: float, max_concurrency: int):
+        self.name = name
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        self.cost = cost
+        self.max_concurrency = max_concurrency
+        self.ewma_latency = None
+        self.inflight = 0
+        self.calls = 0
+        self.errors = 0
+        self._sem = None
+        self._sem_loop = None
+
+    def score(self) -> float:
+        """EWMA latency x cost; unmeasured endpoints score inf (see unexplored)."""
+        return self.ewma_latency * self.cost if self.ewma_latency is not None else math.inf
+
+    def unexplored(self) -> bool:
+        """Never called and no probe in flight: worth one request to learn its latency."""
+        return self.calls == 0 and self.inflight == 0
+
+    def full(self) -> bool:
+        return self.inflight >= self.max_concurrency
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem, self._sem_loop = asyncio.Semaphore(self.max_concurrency), loop
+        return self._sem
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the endpoint's concurrency slots (waits when it's full)."""
+        async with self._semaphore():
+            self.inflight += 1
+            try:
+                yield
+            finally:
+                self.inflight -= 1
+
+    def record(self, ok: bool, seconds: float) -> None:
+        self.calls += 1
+        if not ok:
+            self.errors += 1
+            seconds = max(seconds, config.LLM_POOL_ERROR_PENALTY_SECONDS)
+        alpha = config.LLM_POOL_EWMA_ALPHA
+        self.ewma_latency = seconds if self.ewma_latency is None else alpha * seconds + (1 - alpha) * self.ewma_latency
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name, "model": self.model, "cost": self.cost,
+            "ewma_latency_seconds": round(self.ewma_latency, 3) if self.ewma_latency is not None else None,
+            "inflight": self.inflight, "max_concurrency": self.max_concurrency,
+            "calls": self.calls, "errors": self.errors,
+        }
+
+
+_endpoints: dict = {}  # name -> Endpoint (kept across re-parses so latency state survives)
+_parsed: tuple = (None, {})  # ((raw endpoints, raw pools), {task: [names]})
+
+
+def _parse() -> dict:
+    """Parse LLM_ENDPOINTS / LLM_TASK_POOLS once per distinct value; {task: [endpoint names]}."""
+    global _parsed
+    raw = (config.LLM_ENDPOINTS or "", config.LLM_TASK_POOLS or "")
+    if raw == _parsed[0]:
+        return _parsed[1]
+    declared = {}
+    try:
+        specs = json.loads(raw[0]) if raw[0] else []
+    except ValueError as exc:
+        logging.warning("LLM_ENDPOINTS is not valid JSON (%s); provider pools disabled", exc)
+        specs = []
+    for spec in specs:
+        try:
+            name = spec["name"]
+            key = spec.get("api_key") or os.getenv(spec.get("api_key_env", ""), "")
+            endpoint = Endpoint(name, spec["url"], spec["model"], key, float(spec.get("cost", 1.0)),
+                                int(spec.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)))
+        except (KeyError, TypeError, ValueError) as exc:
+            logging.warning("skipping malformed LLM_ENDPOINTS entry %r (%s)", spec, exc)
+            continue
+        old = _endpoints.get(name)
+        if old is not None and (old.url, old.model) == (endpoint.url, endpoint.model):
+            old.api_key, old.cost, old.max_concurrency = endpoint.api_key, endpoint.cost, endpoint.max_concurrency
+            endpoint = old
+        declared[name] = endpoint
+    _endpoints.clear()
+    _endpoints.update(declared)
+    pools = {}
+    for item in raw[1].split(","):
+        task, _, names = (p.strip() for p in item.partition(":"))
+        members = [n.strip() for n in names.split("|") if n.strip() in declared]
+        if task and members:
+            pools[task] = members
+    _parsed = (raw, pools)
+    return pools
+
+
+def for_task(task: str) -> list:
+    """The task's endpoints, best first: free ones (unexplored first, then by score, cost),
+    then full ones."""
+    members = [_endpoints[name] for name in _parse().get(task, ())]
+    return sorted(members, key=lambda e: (e.full(), not e.unexplored(), e.score(), e.cost))
+
+
+def get_stats() -> dict:
+    """{task: [endpoint snapshot, ...]} for /usage-report."""
+    return {task: [_endpoints[name].snapshot() for name in names] for task, names in _parse().items()}
+
+
+def reset() -> None:
+    global _parsed
+    _endpoints.clear()
+    _parsed = (None, {})
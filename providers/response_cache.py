@@ -0,0 +1,123 @@
+"""Content-addressed LLM response cache (#32), used by llm.chat_completion.
+
+Low-temperature calls repeat: intent classification of "quanto custa um site?" yields the
+same label every time, yet each repeat paid a round trip and tokens. This memoizes the
+response body per task, keyed by sha256 over everything that shapes the answer (model,
+messages, tools, temperature, response_format) — not headers/timeouts, which don't.
+
+Opt-in per task via LLM_RESPONSE_CACHE ("task:ttl_seconds:max_entries,..."); tasks not
+listed are never cached. In-process on purpose: a hit costs no money AND no network hop
+(Redis would still be one). Each task's store is a TTL'd LRU bounded by max_entries.
+
+A hit is returned as a synthetic 200 httpx.Response whose body has no `usage`, so callers'
+existing billing sees zero tokens; the tokens it would have cost are counted in stats.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from hashlib import sha256
+
+import httpx
+
+import config
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_ENTRIES = 1000
+HIT_HEADER = "X-LLM-Cache"
+
+_stores: dict = {}  # task -> OrderedDict[key -> (expires_at, body)]
+_stats: dict = {}
+_parsed: tuple = ("", {})  # (raw config string, {task: (ttl, max_entries)})
+
+
+def _policies() -> dict:
+    """Parse LLM_RESPONSE_CACHE once per distinct value (re-read so tests/env changes apply)."""
+    global _parsed
+    raw = config.LLM_RESPONSE_CACHE or ""
+    if raw != _parsed[0]:
+        policies = {}
+        for item in raw.split(","):
+            parts = [p.strip() for p in item.split(":")]
+            if not parts[0]:
+                continue
+            try:
+                ttl = int(parts[1]) if len(parts) > 1 and parts[1] else DEFAULT_TTL_SECONDS
+                size = int(parts[2]) if len(parts) > 2 and parts[2] else DEFAULT_MAX_ENTRIES
+            except ValueError:
+                continue  # a malformed entry just leaves that task uncached
+            if ttl > 0 and size > 0:
+                policies[parts[0]] = (ttl, size)
+        _parsed = (raw, policies)
+    return _parsed[1]
+
+
+def enabled_for(task: str) -> bool:
+    return task in _policies()
+
+
+def cache_key(model: str, messages: list, **params) -> str:
+    """sha256 of the canonical request (only the content-shaping params are passed in)."""
+    material = {"model": model, "messages": messages,
+                **{k: v for k, v in sorted(params.items()) if v is not None}}
+    return sha256(json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _task_stats(task: str) -> dict:
+    return _stats.setdefault(task, {"hits": 0, "misses": 0, "writes": 0, "evictions": 0,
+                                    "saved_prompt_tokens": 0, "saved_completion_tokens": 0})
+
+
+def get(task: str, key: str) -> httpx.Response | None:
+    """The cached response for `key`, or None (also counts the hit/miss)."""
+    store = _stores.get(task)
+    entry = store.get(key) if store is not None else None
+    stats = _task_stats(task)
+    if entry is None or entry[0] <= time.monotonic():
+        if entry is not None:
+            del store[key]
+        stats["misses"] += 1
+        return None
+    store.move_to_end(key)
+    stats["hits"] += 1
+    body, usage = entry[1], entry[2]
+    stats["saved_prompt_tokens"] += usage.get("prompt_tokens", 0)
+    stats["saved_completion_tokens"] += usage.get("completion_tokens", 0)
+    return httpx.Response(200, json=body, headers={HIT_HEADER: "hit"},
+                          request=httpx.Request("POST", config.DEEPSEEK_API_URL))
+
+
+def put(task: str, key: str, resp) -> None:
+    """Store a successful completion (200 with choices). Anything else is not cached."""
+    policy = _policies().get(task)
+    if policy is None or getattr(resp, "status_code", None) != 200:
+        return
+    try:
+        body = resp.json()
+    except ValueError:
+        return
+    if not isinstance(body, dict) or not body.get("choices"):
+        return
+    ttl, max_entries = policy
+    usage = body.get("usage") or {}
+    body = {k: v for k, v in body.items() if k != "usage"}
+    store = _stores.setdefault(task, OrderedDict())
+    store[key] = (time.monotonic() + ttl, body, usage)
+    store.move_to_end(key)
+    stats = _task_stats(task)
+    stats["writes"] += 1
+    while len(store) > max_entries:
+        store.popitem(last=False)
+        stats["evictions"] += 1
+
+
+def get_stats() -> dict:
+    """Per-task counters plus current sizes, for /usage-report."""
+    return {task: {**_task_stats(task), "entries": len(_stores.get(task, ())),
+                   "ttl_seconds": ttl, "max_entries": size}
+            for task, (ttl, size) in _policies().items()}
+
+
+def clear() -> None:
+    _stores.clear()
+    _stats.clear()
@@ -0,0 +1,177 @@
+"""Local token counting (#46): how big a prompt is before it is sent.
+
+Only DeepSeek's `usage` block said how many tokens a call took, and only afterwards. Three
+things need the number up front: the spend cap's pre-flight reserve for a turn
+(llm.estimate_turn_cost), trimming history and retrieval context to a budget, and the
+per-request prompt-composition report (system / history / context / query tokens).
+
+Counting uses DeepSeek's own tokenizer when LLM_TOKENIZER_PATH points at its tokenizer.json
+(needs the optional `tokenizers` package). Otherwise it is an approximation from DeepSeek's
+published ratios — ~0.3 tokens per ASCII character, ~0.6 per CJK character, accented and
+other non-ASCII characters in between — scaled by a ratio calibrated against the real
+`prompt_tokens` of every call (calibrate()), so it converges on this app's traffic.
+"""
+
+import json
+import logging
+import math
+import re
+
+import config
+
+MESSAGE_OVERHEAD = 4  # role + delimiters per chat message
+DEFAULT_STATIC_TOKENS = 1500  # system prompt + tool specs, until a turn has been measured
+_CALIBRATION_ALPHA = 0.1
+_RATIO_BOUNDS = (0.5, 2.0)
+
+_CJK = re.compile(r"[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+_tokenizer_state: tuple = (None, None)  # (path, tokenizers.Tokenizer | None)
+_ratio = 1.0
+_static_tokens = 0
+_composition: dict = {"requests": 0, "system": 0, "history": 0, "context": 0, "query": 0, "trimmed": 0}
+
+
+def _tokenizer():
+    """The exact tokenizer for LLM_TOKENIZER_PATH, loaded once per path; None = approximate."""
+    global _tokenizer_state
+    path = config.LLM_TOKENIZER_PATH or ""
+    if path != _tokenizer_state[0]:
+        tokenizer = None
+        if path:
+            try:
+                from tokenizers import Tokenizer
+                tokenizer = Tokenizer.from_file(path)
+            except Exception as exc:  # noqa: BLE001 — missing package/file: fall back to the estimate
+                logging.warning("LLM_TOKENIZER_PATH %r unusable (%s); approximating token counts", path, exc)
+        _tokenizer_state = (path, tokenizer)
+    return _tokenizer_state[1]
+
+
+def exact() -> bool:
+    return _tokenizer() is not None
+
+
+def count(text: str) -> int:
+    """Tokens in `text`."""
+    if not text:
+        return 0
+    tokenizer = _tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+    return max(1, math.ceil(_raw(text) * _ratio))
+
+
+def _raw(text: str) -> float:
+    """The unscaled per-script approximation of `text`: no calibration ratio, no rounding."""
+    cjk = len(_CJK.findall(text))
+    other = len(_NON_ASCII.findall(text)) - cjk
+    ascii_chars = len(text) - cjk - other
+    return 0.3 * ascii_chars + 0.45 * other + 0.6 * cjk
+
+
+def _texts(messages: list, tools: list | None):
+    """Every piece of text a chat request's prompt tokens come from."""
+    for message in messages:
+        yield message.get("content") or ""
+        for call in message.get("tool_calls") or ():
+            fn = call.get("function", {})
+            yield fn.get("name", "")
+            yield fn.get("arguments") or ""
+    if tools:
+        yield json.dumps(tools, ensure_ascii=False)
+
+
+def count_messages(messages: list, tools: list | None = None) -> int:
+    """Prompt tokens of a chat request: every message's content and tool calls, plus the
+    tool specs it offers."""
+    return MESSAGE_OVERHEAD * len(messages) + sum(count(text) for text in _texts(messages, tools))
+
+
+def raw_estimate(messages: list, tools: list | None = None) -> tuple[float, int]:
+    """(unscaled approximation of the request's text, fixed per-message overhead): what
+    calibrate() compares a call's real prompt_tokens against. count_messages' ratio and
+    per-text rounding are left out so they can't feed back into the ratio."""
+    return sum(_raw(text) for text in _texts(messages, tools)), MESSAGE_OVERHEAD * len(messages)
+
+
+def calibrate(raw: float, actual: int, overhead: int = 0) -> None:
+    """Nudge the approximation toward a call's real prompt_tokens (no-op when exact).
+    `raw` and `overhead` come from raw_estimate(): only the text part is scaled by the ratio."""
+    global _ratio
+    if exact() or raw <= 0 or actual <= overhead:
+        return
+    observed = (actual - overhead) / raw
+    _ratio = min(_RATIO_BOUNDS[1], max(_RATIO_BOUNDS[0],
+                 (1 - _CALIBRATION_ALPHA) * _ratio + _CALIBRATION_ALPHA * observed))
+
+
+def trim_history(history: list, budget: int) -> list:
+    """The most recent user/assistant pairs that fit in `budget` tokens (0 = no limit)."""
+    if budget <= 0:
+        return list(history)
+    kept, used = [], 0
+    for start in range(len(history) - 2, -2, -2):
+        pair = history[max(0, start):start + 2]
+        cost = count_messages(pair)
+        if used + cost > budget:
+            break
+        kept[:0] = pair
+        used += cost
+    return kept
+
+
+def trim_blocks(text: str, budget: int, sep: str) -> str:
+    """The leading `sep`-separated blocks of `text` that fit in `budget` tokens (retrieval
+    ranks best-first, so the tail goes). A first block alone over budget is cut short."""
+    if budget <= 0 or not text or count(text) <= budget:
+        return text
+    kept, used = [], 0
+    for block in text.split(sep):
+        cost = count(block) + count(sep)
+        if used + cost > budget:
+            break
+        kept.append(block)
+        used += cost
+    if kept:
+        return sep.join(kept)
+    return text[:max(0, int(len(text) * budget / count(text)))]
+
+
+def estimate_cost(prompt_tokens: int, output_tokens: int, model: str | None = None) -> float:
+    """Upper-bound USD for a call: every prompt token at the cache-miss price."""
+    from providers.deepseek_optimizer import DeepSeekOptimizer
+    pricing = DeepSeekOptimizer.get_current_pricing(model)
+    return (prompt_tokens * pricing["input_cache_miss"] + output_tokens * pricing["output"]) / 1_000_000
+
+
+def static_tokens() -> int:
+    """Largest system-prompt + tool-spec size seen on a generation call so far."""
+    return _static_tokens or DEFAULT_STATIC_TOKENS
+
+
+def record_composition(parts: dict) -> None:
+    """Tally one request's prompt composition ({system, history, context, query, trimmed})."""
+    global _static_tokens
+    _static_tokens = max(_static_tokens, parts.get("system", 0))
+    _composition["requests"] += 1
+    for key in ("system", "history", "context", "query", "trimmed"):
+        _composition[key] += parts.get(key, 0)
+    logging.info("prompt composition: %s", parts)
+
+
+def get_stats() -> dict:
+    """Average prompt composition per generation request and the counter mode, for /usage-report."""
+    n = _composition["requests"]
+    averages = {key: round(_composition[key] / n, 1) for key in ("system", "history", "context", "query", "trimmed")} if n else {}
+    return {"requests": n, "avg_tokens": averages, "exact_tokenizer": exact(), "calibration_ratio": round(_ratio, 3)}
+
+
+def reset() -> None:
+    global _ratio, _static_tokens, _tokenizer_state
+    _ratio = 1.0
+    _static_tokens = 0
+    _tokenizer_state = (None, None)
+    for key in _composition:
+        _composition[key] = 0
@@ -98,6 +98,13 @@ def _chunk_id(chunk: dict, model_tag: str = "") -> int:
     return int(digest[:15], 16)  # 60-bit unsigned int, safely within Qdrant's uint64 id space
 
 
+def kb_version(path: str = KB_PATH) -> str:
+    """Short content hash of the KB file. Cached answers are tagged with it (see
+    core.cache.set_kb_version) so an edited company_info.md marks them stale."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
 def _ensure_collection(client) -> None:
     # App-path collection init lives in main.py's lifespan; this is the safety net for the
     # standalone CLI (`python ingest.py`). collection_exists() cleanly distinguishes a
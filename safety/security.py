@@ -23,6 +23,7 @@ from fastapi import HTTPException, Request
 
 import config
 from core.cache import get_redis
+from providers import llm
 
 # Spend counters expire after 48h: covers the current UTC day with slack.
 SPEND_TTL_SECONDS = 172800
@@ -94,20 +95,20 @@ async def check_rate_limit(ip: str) -> None:
         raise HTTPException(status_code=429, detail=_HOURLY_EXHAUSTED, headers={"Retry-After": "3600"})
 
 
-async def check_spend_cap(ip: str) -> None:
+async def check_spend_cap(ip: str, reserve_usd: float = 0.0) -> None:
     """
     Cost circuit-breaker. Raises 503 once today's spend (global, or for this IP) is
     over budget, BEFORE any LLM call happens.
 
     The cap is checked on the way in and the cost is only recorded once the response
-    exists, so a request already in flight can overshoot the cap slightly. With
-    `message` capped at MAX_MESSAGE_LENGTH and at most 3 DeepSeek calls per request,
-    that overshoot is on the order of cents.
+    exists, so a request already in flight can overshoot the cap slightly. `reserve_usd`
+    (#46) is the request's pre-flight worst-case cost (llm.estimate_turn_cost): a request
+    that would cross the cap is refused up front instead of being billed past it.
     """
     day = today()
 
     global_spend = await _read_float(f"spend:global:{day}")
-    if global_spend >= config.DAILY_SPEND_LIMIT_USD:
+    if global_spend + reserve_usd >= config.DAILY_SPEND_LIMIT_USD:
         logging.error(
             "GLOBAL SPEND CAP REACHED: $%.4f/$%.2f on %s - refusing LLM calls",
             global_spend, config.DAILY_SPEND_LIMIT_USD, day,
@@ -115,7 +116,7 @@ async def check_spend_cap(ip: str) -> None:
         raise HTTPException(status_code=503, detail=_BUDGET_EXHAUSTED, headers={"Retry-After": "3600"})
 
     ip_spend = await _read_float(f"spend:ip:{ip}:{day}")
-    if ip_spend >= config.DAILY_SPEND_LIMIT_PER_IP_USD:
+    if ip_spend + reserve_usd >= config.DAILY_SPEND_LIMIT_PER_IP_USD:
         logging.warning(
             "Per-IP spend cap reached: ip=%s $%.4f/$%.2f on %s",
             ip, ip_spend, config.DAILY_SPEND_LIMIT_PER_IP_USD, day,
@@ -184,6 +185,16 @@ async def get_spend_snapshot() -> dict:
     }
 
 
+async def _preflight_cost(request: Request) -> float:
+    """The turn's worst-case cost from its message; 0 when the body can't be read here."""
+    try:
+        body = await request.json()  # FastAPI already read and cached the body
+        message = body.get("message") if isinstance(body, dict) else None
+    except Exception:  # noqa: BLE001 — no body (tests, non-JSON): plain backward-looking cap
+        return 0.0
+    return llm.estimate_turn_cost(message) if isinstance(message, str) else 0.0
+
+
 async def enforce_chat_limits(request: Request) -> str:
     """
     Dependency for /chat. Returns the client IP so the handler can bill cost to it.
@@ -197,7 +208,7 @@ async def enforce_chat_limits(request: Request) -> str:
     ip = get_client_ip(request)
     try:
         await check_rate_limit(ip)
-        await check_spend_cap(ip)
+        await check_spend_cap(ip, reserve_usd=await _preflight_cost(request))
     except HTTPException:
         raise
     except Exception as e:
@@ -16,7 +16,9 @@ os.environ.setdefault("DEEPSEEK_API_KEY", "test-key")
 os.environ.setdefault("QDRANT_HOST", "http://localhost:6333")
 os.environ.setdefault("ADMIN_API_TOKEN", "test-admin-token")
 
-from core import cache  # noqa: E402
+from core import cache, intent_knn  # noqa: E402
+from providers import bulkhead, circuit_breaker, latency, pool, tokens  # noqa: E402
+from nodes import speculation  # noqa: E402
 import config  # noqa: E402
 from rag import db  # noqa: E402
 
@@ -41,6 +43,47 @@ def guard_qdrant_singleton():
     db.set_qdrant_client(None)
 
 
+@pytest.fixture(autouse=True)
+def faq_router_off(monkeypatch):
+    # The FAQ fast path answers "quanto custa um site?"-style questions without the graph;
+    # the chat tests use exactly such messages to exercise the graph/cache path, so it is
+    # off unless a test turns it on (tests/test_faq_router.py).
+    monkeypatch.setattr(config, "FAQ_ROUTER_ENABLED", False)
+    # Same for the lexical greeting / handoff fast path: "oi" must reach the graph in the
+    # contract tests (tests/test_lexical_router.py turns it on).
+    monkeypatch.setattr(config, "LEXICAL_FAST_PATH_ENABLED", False)
+
+
+@pytest.fixture(autouse=True)
+def intent_knn_off(monkeypatch):
+    # Likewise the local intent classifier would embed its exemplars (ONNX model download) and
+    # answer detect_intent without the LLM; tests/test_intent_knn.py turns it on.
+    monkeypatch.setattr(config, "INTENT_KNN_ENABLED", False)
+    yield
+    intent_knn._INDEX.clear()
+
+
+@pytest.fixture(autouse=True)
+def llm_health_reset():
+    # Circuit breakers, latency windows and pool endpoints are process-wide; a test that fails
+    # the primary repeatedly must not leave it "open" (or its latencies) for the next test.
+    circuit_breaker.reset()
+    latency.reset()
+    pool.reset()
+    bulkhead.reset()
+    tokens.reset()
+    speculation.reset()
+    intent_knn.reset()
+    yield
+    circuit_breaker.reset()
+    latency.reset()
+    pool.reset()
+    bulkhead.reset()
+    tokens.reset()
+    speculation.reset()
+    intent_knn.reset()
+
+
 @pytest.fixture
 def redis_fake():
     """A clean fakeredis for each test, injected through cache.set_redis()."""
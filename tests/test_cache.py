@@ -0,0 +1,250 @@
+"""Exact-match cache keys: message normalization + the shared anon namespace."""
+
+import pytest
+
+from core import cache
+import main
+
+
+class TestNormalizeMessage:
+    @pytest.mark.parametrize("variant", [
+        "Quanto custa um site?",
+        "quanto custa um site ?",
+        "  QUANTO   custa um site??  ",
+        "Quanto custa um site",
+        "quanto custa um site!",
+    ])
+    def test_equivalent_phrasings_collapse(self, variant):
+        assert cache.normalize_message(variant) == "quanto custa um site"
+
+    def test_accents_and_compatibility_forms_fold(self):
+        assert cache.normalize_message("Serviços") == cache.normalize_message("servicos")
+        assert cache.normalize_message("ｓｉｔｅ") == "site"  # full-width
+        assert cache.normalize_message("¿Cuánto cuesta?") == "cuanto cuesta"
+
+    def test_interior_punctuation_is_kept(self):
+        assert cache.normalize_message("Vocês usam Next.js?") == "voces usam next.js"
+        assert cache.normalize_message("e-commerce") == "e-commerce"
+
+    def test_empty_is_empty(self):
+        assert cache.normalize_message("") == ""
+        assert cache.normalize_message("?!") == ""
+
+
+class TestExactCacheKey:
+    def test_anon_variants_share_a_key(self):
+        a = main._exact_cache_key("Quanto custa um site?", "pt-BR", "/", "anon")
+        b = main._exact_cache_key("quanto custa um site ?", "pt-BR", "/", "anon")
+        assert a == b
+
+    def test_all_shared_ids_share_one_namespace(self):
+        keys = {main._exact_cache_key("oi", "pt-BR", "/", uid) for uid in ("anon", "", "experiment")}
+        assert len(keys) == 1
+
+    def test_language_and_page_still_scope_the_key(self):
+        base = main._exact_cache_key("oi", "pt-BR", "/", "anon")
+        assert main._exact_cache_key("oi", "en", "/", "anon") != base
+        assert main._exact_cache_key("oi", "pt-BR", "/ai", "anon") != base
+
+    def test_identified_user_key_is_unchanged(self):
+        from hashlib import sha256
+
+        legacy = sha256("Quanto custa um site?_pt-BR_/_user-1".encode("utf-8")).hexdigest()
+        assert main._exact_cache_key("Quanto custa um site?", "pt-BR", "/", "user-1") == legacy
+        # ...and is NOT normalized: a logged-in user's answer depends on their conversation.
+        assert main._exact_cache_key("quanto custa um site ?", "pt-BR", "/", "user-1") != legacy
+
+
+@pytest.fixture
+def fresh_stats():
+    cache.reset_cache_stats()
+    yield cache.CACHE_STATS
+    cache.reset_cache_stats()
+
+
+class TestCacheStats:
+    async def test_exact_lookups_count_hits_misses_and_writes(self, redis_fake, fresh_stats):
+        assert await cache.get_cached_response("k") is None
+        await cache.set_cached_response("k", {"a": 1})
+        assert await cache.get_cached_response("k") == {"a": 1}
+
+        stats = cache.get_cache_stats()["exact"]
+        assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    async def test_semantic_trim_counts_evictions(self, redis_fake, fresh_stats):
+        for i in range(5):
+            await cache.semantic_put("b", [float(i), 1.0], {"i": i}, max_entries=3)
+        stats = cache.get_cache_stats()["semantic"]
+        assert stats["writes"] == 5 and stats["evictions"] == 2
+
+    def test_savings_are_priced_at_the_mean_full_turn_cost(self, fresh_stats):
+        cache.record_turn_cost(0.002)
+        cache.record_turn_cost(0.004)
+        cache.record_saving("exact")
+        assert cache.get_cache_stats()["exact"]["estimated_saved_usd"] == pytest.approx(0.003)
+
+    def test_negative_saving_is_floored(self, fresh_stats):
+        cache.record_saving("greeting", -1.0)
+        assert cache.get_cache_stats()["greeting"]["estimated_saved_usd"] == 0.0
+
+
+class TestFlushNamespace:
+    async def test_flush_drops_only_the_requested_namespace(self, redis_fake, fresh_stats):
+        pt_home = main._exact_cache_key("oi", "pt-BR", "/", "anon")
+        pt_ai = main._exact_cache_key("oi", "pt-BR", "/ai", "anon")
+        en_home = main._exact_cache_key("hi", "en", "/", "anon")
+        for key in (pt_home, pt_ai, en_home):
+            await cache.set_cached_response(key, {"a": 1})
+        await cache.semantic_put(main._semantic_cache_bucket("pt-BR", "/"), [1.0], {"a": 1}, 10,
+                                 label="pt-BR|/")
+        await cache.semantic_put(main._semantic_cache_bucket("en", "/"), [1.0], {"a": 1}, 10,
+                                 label="en|/")
+
+        result = await cache.flush_namespace("pt-BR", "/")
+        assert result["exact_keys_deleted"] == 1 and result["semantic_buckets_deleted"] == 1
+        assert await redis_fake.get(pt_home) is None
+        assert await redis_fake.get(pt_ai) is not None
+        assert await redis_fake.get(en_home) is not None
+
+        described = await cache.describe_buckets()
+        assert [b["language"] for b in described["semantic_buckets"]] == ["en"]
+
+    async def test_flush_whole_language(self, redis_fake, fresh_stats):
+        for page in ("/", "/ai"):
+            await cache.set_cached_response(main._exact_cache_key("oi", "pt-BR", page, "anon"), {"a": 1})
+        result = await cache.flush_namespace("pt-BR")
+        assert result["exact_keys_deleted"] == 2
+        assert cache.get_cache_stats()["exact"]["evictions"] == 2
+
+
+class TestPayloadCodec:
+    PAYLOAD = {
+        "raw_response": "Criamos sites, automações e soluções de IA. " * 20,
+        "revised_response": "Criamos sites, automações e IA.",
+        "response_parts": ["Criamos sites, automações e IA."],
+        "detected_intent": "inquire_services",
+        "cached": False,
+    }
+
+    def test_round_trip(self):
+        assert cache.decode_payload(cache.encode_payload(self.PAYLOAD)) == self.PAYLOAD
+
+    def test_encoded_entries_are_versioned_and_smaller(self):
+        import json
+
+        encoded = cache.encode_payload(self.PAYLOAD)
+        assert encoded.startswith(b"\xffWBC\x01")
+        assert len(encoded) < len(json.dumps(self.PAYLOAD).encode("utf-8"))
+
+    def test_legacy_json_entries_stay_readable(self):
+        import json
+
+        assert cache.decode_payload(json.dumps(self.PAYLOAD).encode("utf-8")) == self.PAYLOAD
+
+    def test_unknown_version_is_rejected(self):
+        with pytest.raises(ValueError):
+            cache.decode_payload(b"\xffWBC\x09garbage")
+
+    async def test_legacy_entry_is_served_from_redis(self, redis_fake):
+        import json
+
+        await redis_fake.set("legacy", json.dumps({"revised_response": "old"}))
+        assert await cache.get_cached_response("legacy") == {"revised_response": "old"}
+
+    async def test_corrupt_entry_is_a_miss(self, redis_fake):
+        await redis_fake.set("bad", b"\xffWBC\x01not-zstd")
+        assert await cache.get_cached_response("bad") is None
+
+    async def test_writes_report_bytes_saved(self, redis_fake, fresh_stats):
+        await cache.set_cached_response("k", self.PAYLOAD)
+        stats = cache.get_cache_stats()["exact"]
+        assert stats["avg_bytes_saved_per_write"] > 0
+        assert 0 < stats["compression_ratio"] < 1
+
+
+@pytest.fixture
+def kb_versioned():
+    """Turn KB versioning on (it's off in tests by default) and capture revalidations."""
+    scheduled = []
+    cache.set_kb_version("kb-v1", "minilm")
+    cache.set_revalidator(scheduled.append)
+    yield scheduled
+    cache.set_kb_version(None, None)
+    cache.set_revalidator(main._schedule_revalidation)
+
+
+class TestStaleWhileRevalidate:
+    REQUEST = {"message": "Quanto custa um site?", "language": "pt-BR", "page": "/"}
+
+    async def test_fresh_entry_is_served_without_revalidation(self, redis_fake, kb_versioned):
+        await cache.set_cached_response("k", {"a": 1}, request=self.REQUEST)
+        assert await cache.get_cached_response("k") == {"a": 1}
+        assert kb_versioned == []
+
+    async def test_kb_change_serves_stale_and_revalidates_once(self, redis_fake, kb_versioned):
+        await cache.set_cached_response("k", {"a": "old"}, request=self.REQUEST)
+        cache.set_kb_version("kb-v2", "minilm")
+
+        assert await cache.get_cached_response("k") == {"a": "old"}  # no cold miss
+        assert await cache.get_cached_response("k") == {"a": "old"}
+        assert kb_versioned == [self.REQUEST], "one regeneration, not a stampede"
+
+    async def test_embedding_model_change_is_stale_too(self, redis_fake, kb_versioned):
+        await cache.set_cached_response("k", {"a": 1}, request=self.REQUEST)
+        cache.set_kb_version("kb-v1", "another-model")
+        assert not await cache.is_fresh("k")
+
+    async def test_stale_per_user_entry_is_a_miss(self, redis_fake, kb_versioned):
+        await cache.set_cached_response("k", {"a": 1})  # identified user: no request recorded
+        cache.set_kb_version("kb-v2", "minilm")
+        assert await cache.get_cached_response("k") is None
+        assert kb_versioned == []
+
+    async def test_stale_semantic_hit_is_served_and_replaced(self, redis_fake, kb_versioned):
+        await cache.semantic_put("b", [1.0, 0.0], {"a": "old"}, 10, request=self.REQUEST)
+        cache.set_kb_version("kb-v2", "minilm")
+        assert await cache.semantic_get("b", [1.0, 0.0], 0.9) == {"a": "old"}
+        assert kb_versioned == [self.REQUEST]
+
+        # the regenerated answer replaces the stale entry instead of piling up next to it
+        await cache.semantic_put("b", [1.0, 0.0], {"a": "new"}, 10, request=self.REQUEST)
+        assert [e["payload"] for e in cache.decode_payload(await redis_fake.get("b"))] == [{"a": "new"}]
+
+    async def test_other_embedding_models_vectors_are_ignored(self, redis_fake, kb_versioned):
+        await cache.semantic_put("b", [1.0, 0.0], {"a": 1}, 10, request=self.REQUEST)
+        cache.set_kb_version("kb-v1", "another-model")
+        assert await cache.semantic_get("b", [1.0, 0.0], 0.9) is None
+
+
+class TestRevalidate:
+    async def test_regenerates_and_swaps_in_the_new_answer(self, redis_fake, limits, monkeypatch):
+        async def fresh_answer(message, language, page):
+            return {"revised_response": "nova resposta"}, 0.001
+
+        monkeypatch.setattr(main, "_answer_anon_turn", fresh_answer)
+        monkeypatch.setattr(main.config, "SEMANTIC_CACHE_ENABLED", False)
+        request = {"message": "Quanto custa um site?", "language": "pt-BR", "page": "/"}
+        await main._revalidate(request)
+
+        key = main._exact_cache_key(request["message"], "pt-BR", "/", "anon")
+        assert (await cache.get_cached_response(key))["revised_response"] == "nova resposta"
+
+    async def test_skipped_when_the_spend_cap_is_reached(self, redis_fake, limits, monkeypatch):
+        from safety import security
+
+        answered = []
+
+        async def answer(message, language, page):
+            # _revalidate swallows exceptions, so record the call rather than raising
+            answered.append(message)
+            return {"revised_response": "nova resposta"}, 0.001
+
+        monkeypatch.setattr(main, "_answer_anon_turn", answer)
+        monkeypatch.setattr(main.config, "SEMANTIC_CACHE_ENABLED", False)
+        await security.record_spend("9.9.9.9", limits["DAILY_SPEND_LIMIT_USD"])
+        await main._revalidate({"message": "Quanto custa um site?", "language": "pt-BR", "page": "/"})
+
+        assert answered == []
+        key = main._exact_cache_key("Quanto custa um site?", "pt-BR", "/", "anon")
+        assert await cache.get_cached_response(key) is None
@@ -272,6 +272,21 @@ class TestSpendCap:
         snapshot = await security.get_spend_snapshot()
         assert snapshot["spent_usd"] == pytest.approx(STUB_COST_USD)
 
+    async def test_cache_hit_is_counted_and_priced(self, client, monkeypatch):
+        from core import cache
+        from providers.deepseek_optimizer import DeepSeekOptimizer
+
+        cache.reset_cache_stats()
+        monkeypatch.setitem(DeepSeekOptimizer.token_usage, "cached_responses", 0)
+        await post(client)
+        await post(client)
+
+        stats = cache.get_cache_stats()["exact"]
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["estimated_saved_usd"] == pytest.approx(STUB_COST_USD)
+        assert DeepSeekOptimizer.token_usage["cached_responses"] == 1
+        cache.reset_cache_stats()
+
     async def test_cache_is_isolated_per_user(self, client, graph_calls):
         # Now that responses are conversation-dependent, one visitor's cached answer must
         # never be served to another — the cache key includes user_id.
@@ -282,6 +297,20 @@ class TestSpendCap:
         assert other.json()["cached"] is False
         assert len(graph_calls) == 2, "a different user must not get another user's cached answer"
 
+    async def test_anon_variants_hit_the_exact_cache_without_embedding(self, client, graph_calls, monkeypatch):
+        embedded = []
+        monkeypatch.setattr(main, "compute_embedding", lambda text: embedded.append(text) or [1.0, 0.0])
+
+        await post(client, {"message": "Quanto custa um site?", "user_id": "anon"})
+        assert len(graph_calls) == 1
+        embedded.clear()
+
+        second = await post(client, {"message": "quanto custa um site ?", "user_id": "anon"})
+        body = second.json()
+        assert body["cached"] is True and body["cache_type"] == "redis"
+        assert len(graph_calls) == 1
+        assert embedded == [], "a normalized exact hit must not pay for an embedding"
+
 
 class TestSemanticCache:
     """#12: a paraphrase from an anon user is served from the semantic cache; a logged-in
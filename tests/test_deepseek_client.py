@@ -56,3 +56,82 @@ class TestChatCompletion:
         assert call["json"]["response_format"] == {"type": "json_object"}
         assert call["headers"]["X-Foo"] == "1"  # merged, not replacing auth
         assert call["headers"]["Authorization"].startswith("Bearer ")
+
+    async def test_output_caps_only_when_given(self, rec):
+        await deepseek_client.chat_completion([], max_tokens=60, stop=["\n"])
+        await deepseek_client.chat_completion([])
+        assert rec.calls[0]["json"]["max_tokens"] == 60 and rec.calls[0]["json"]["stop"] == ["\n"]
+        assert "max_tokens" not in rec.calls[1]["json"] and "stop" not in rec.calls[1]["json"]
+
+
+
+def _mock_client(handler):
+    return deepseek_client.httpx.AsyncClient(transport=deepseek_client.httpx.MockTransport(handler))
+
+
+class TestPooledClient:
+    async def test_lifecycle_builds_http2_pool_and_detaches_on_close(self, monkeypatch):
+        monkeypatch.setattr(deepseek_client, "_client", None)
+        await deepseek_client.start_client()
+        client = deepseek_client.get_client()
+        assert client is not None
+        await deepseek_client.start_client()  # idempotent
+        assert deepseek_client.get_client() is client
+        await deepseek_client.aclose_client()
+        assert deepseek_client.get_client() is None
+        assert client.is_closed
+        await deepseek_client.aclose_client()  # closing twice is harmless
+
+    async def test_calls_reuse_the_shared_client_with_per_call_timeout(self, monkeypatch):
+        seen = []
+
+        def handler(request):
+            seen.append(request.extensions["timeout"]["read"])
+            return deepseek_client.httpx.Response(200, json={"choices": []})
+
+        shared = _mock_client(handler)
+        monkeypatch.setattr(deepseek_client, "_client", shared)
+        monkeypatch.setattr(deepseek_client.httpx, "AsyncClient",
+                            lambda *a, **k: pytest.fail("opened a per-call client"))
+        await deepseek_client.chat_completion([], timeout=7.0)
+        await deepseek_client.chat_completion([])
+        assert seen == [7.0, deepseek_client.DEFAULT_TIMEOUT]
+        await shared.aclose()
+
+    async def test_stream_uses_the_shared_client(self, monkeypatch):
+        sse = (
+            'data: {"choices":[{"delta":{"content":"Ol"}}]}\n\n'
+            'data: {"choices":[{"delta":{"content":"á"}}]}\n\n'
+            'data: {"choices":[],"usage":{"prompt_tokens":3,"completion_tokens":2}}\n\n'
+            "data: [DONE]\n\n"
+        )
+        shared = _mock_client(lambda request: deepseek_client.httpx.Response(200, text=sse))
+        monkeypatch.setattr(deepseek_client, "_client", shared)
+        usage = {}
+        out = [d async for d in deepseek_client.stream_chat_completion([], usage_sink=usage)]
+        assert out == ["Ol", "á"]
+        assert usage == {"prompt_tokens": 3, "completion_tokens": 2}
+        assert not shared.is_closed  # the pool outlives the call
+        await shared.aclose()
+
+
+class TestPoolBenchmark:
+    async def test_run_turns_and_summary(self):
+        import importlib.util
+        from pathlib import Path
+
+        path = Path(__file__).resolve().parent.parent / "evals" / "bench_llm_pool.py"
+        spec = importlib.util.spec_from_file_location("bench_llm_pool", path)
+        bench = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(bench)
+
+        requests = []
+
+        def factory():
+            return _mock_client(lambda r: requests.append(r) or deepseek_client.httpx.Response(200, json={}))
+
+        samples = await bench.run_turns("https://x.test/models", {}, turns=2, calls=3, pooled=True,
+                                        client_factory=factory)
+        assert len(samples) == len(requests) == 6
+        row = bench.summarize([1.0, 2.0, 3.0, 10.0])
+        assert row == {"calls": 4, "mean_ms": 4.0, "p50_ms": 3.0, "p95_ms": 10.0}
@@ -0,0 +1,135 @@
+"""FAQ fast path (#34): keyword + kNN routing to canned per-language answers, before the graph."""
+
+import json
+
+import pytest
+
+import config
+import main
+from core import cache, faq_router
+from core.faq_answers import FAQ_ANSWERS
+
+
+@pytest.fixture
+def faq_on(monkeypatch):
+    monkeypatch.setattr(config, "FAQ_ROUTER_ENABLED", True)
+    yield
+    faq_router._INDEX.clear()
+    cache.reset_cache_stats()
+
+
+class TestKeywords:
+    @pytest.mark.parametrize("message, category", [
+        ("Quanto custa um site?", "pricing"),
+        ("how much does an online store cost?", "pricing"),
+        ("¿Cuánto cuesta una web?", "pricing"),
+        ("quanto costa un e-commerce?", "pricing"),
+        ("Qual o prazo de entrega?", "deadlines"),
+        ("how long does it take to build a site?", "deadlines"),
+        ("qual o whatsapp de vocês?", "contact"),
+        ("how can I contact you?", "contact"),
+        ("Quem são vocês?", "company"),
+        ("chi siete?", "company"),
+        ("quais tecnologias vocês usam?", "tech_stack"),
+        ("Vocês seguem a LGPD?", "lgpd"),
+        ("are you GDPR compliant?", "lgpd"),
+        ("tem portfólio?", "portfolio"),
+        ("¿tienen ejemplos de trabajos?", "portfolio"),
+    ])
+    def test_matches_each_category_in_every_language(self, message, category):
+        assert faq_router.match_keywords(message) == category
+
+    @pytest.mark.parametrize("message", [
+        "vocês fazem integração com whatsapp?",  # a service question, not a contact ask
+        "vocês fazem formulário de contato?",
+        "how much traffic can the site handle?",
+        "quero um site",
+        # a topic word outside a question about it
+        "não tenho orçamento agora, só quero entender",
+        "can you quote me on that?",
+        "our team uses a different stack, can you integrate?",
+        "I need a privacy policy page on my site",
+        "vocês fazem site com preços dinâmicos?",
+        "I need a portfolio website",
+        "vocês fazem sites adequados à LGPD?",
+        # "how long" about something other than the project
+        "how long does the site take to load?",
+        "how long will my data be stored?",
+    ])
+    def test_does_not_swallow_service_questions(self, message):
+        assert faq_router.match_keywords(message) is None
+
+    def test_two_categories_is_ambiguous(self):
+        assert faq_router.match_keywords("qual o prazo e o preço?") is None
+
+    def test_long_messages_are_not_eligible(self, monkeypatch):
+        monkeypatch.setattr(config, "FAQ_ROUTER_MAX_WORDS", 5)
+        assert faq_router.eligible("quanto custa um site?")
+        assert not faq_router.eligible("quanto custa um site com loja, blog, área de membros e app?")
+
+
+class TestKnn:
+    def test_nearest_exemplar_with_margin(self, faq_on):
+        faq_router._INDEX[:] = [("pricing", [1.0, 0.0, 0.0]), ("contact", [0.0, 1.0, 0.0])]
+        assert faq_router.match_knn([0.99, 0.05, 0.0]) == "pricing"
+        assert faq_router.match_knn([0.0, 0.0, 1.0]) is None  # below the threshold
+
+    def test_too_close_to_another_category_is_rejected(self, faq_on, monkeypatch):
+        monkeypatch.setattr(config, "FAQ_ROUTER_THRESHOLD", 0.5)
+        faq_router._INDEX[:] = [("pricing", [1.0, 0.0]), ("deadlines", [0.98, 0.2])]
+        assert faq_router.match_knn([1.0, 0.1]) is None
+
+
+class TestAnswers:
+    def test_every_category_has_all_four_languages(self):
+        for category, faq in FAQ_ANSWERS.items():
+            assert set(faq["answers"]) == {"pt-BR", "en", "es", "it"}, category
+
+    def test_answer_is_filled_and_versioned(self):
+        faq = faq_router.answer("contact", "en")
+        assert config.WHATSAPP_CONTACT in faq["text"] and "{" not in faq["text"]
+        assert faq["intent"] == "share_contact" and faq["version"] == "contact.v1"
+
+    def test_unknown_language_falls_back_to_portuguese(self):
+        assert faq_router.answer("pricing", "de")["text"] == faq_router.answer("pricing", "pt-BR")["text"]
+
+
+@pytest.fixture
+def graph_must_not_run(monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AssertionError("the FAQ fast path must not run the graph")
+
+    monkeypatch.setattr(main.graph, "ainvoke", fail)
+
+
+class TestChatFastPath:
+    async def test_anon_pricing_question_is_answered_without_the_graph(self, faq_on, redis_fake, graph_must_not_run):
+        body = await main._handle_chat(main.ChatRequest(message="Quanto custa um site?", language="es"))
+        assert body["cached"] is True and body["cache_type"] == "faq"
+        assert body["detected_intent"] == "request_quote" and body["faq_version"] == "pricing.v1"
+        assert body["response_parts"] and "presupuesto" in body["revised_response"]
+        assert cache.get_cache_stats()["faq"]["hits"] == 1
+
+    async def test_identified_user_goes_through_the_graph(self, faq_on):
+        assert await main._faq_fast_path("Quanto custa um site?", "pt-BR", "/", "user-42") == (None, None)
+
+    async def test_message_with_pii_goes_through_the_graph(self, faq_on):
+        hit, _ = await main._faq_fast_path("qual o preço? meu email é ana@x.com", "pt-BR", "/", "anon")
+        assert hit is None
+
+    async def test_knn_vector_is_reused_by_the_semantic_cache(self, faq_on, monkeypatch):
+        faq_router._INDEX[:] = [("pricing", [1.0, 0.0])]
+        monkeypatch.setattr(main, "compute_embedding", lambda text: [0.0, 1.0])
+        hit, vec = await main._faq_fast_path("quero um site", "pt-BR", "/", "anon")
+        assert hit is None and vec == [0.0, 1.0]
+
+    async def test_stream_serves_the_canned_answer(self, faq_on, redis_fake, monkeypatch):
+        async def must_not_classify(state):
+            raise AssertionError("the FAQ fast path must not call detect_intent")
+
+        monkeypatch.setattr(main.nodes, "detect_intent", must_not_classify)
+        frames = [json.loads(f[len("data: "):]) async for f in
+                  main._stream_chat(main.ChatRequest(message="what technologies do you use?", language="en"))]
+        assert frames[0] == {"type": "start", "intent": "inquire_services"}
+        assert frames[-1]["cache_type"] == "faq" and frames[-1]["faq_version"] == "tech_stack.v1"
+        assert "Next.js" in "".join(f["text"] for f in frames if f["type"] == "token")
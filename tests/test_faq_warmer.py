@@ -0,0 +1,146 @@
+"""FAQ cache warmer: mine first-turn questions, cluster paraphrases, seed both caches."""
+
+import nodes
+from core import cache, faq_warmer
+from rag import ingest
+import main
+
+
+def _log(message, user_id="anon", intent="inquire_services", ts=0, language="pt-BR", page="/"):
+    return {"user_input": message, "user_id": user_id, "intent": intent, "timestamp": ts,
+            "language": language, "current_page": page}
+
+
+def _embed(text):
+    # 'site' questions are paraphrases of each other; 'ia' questions form a second cluster.
+    return [1.0, 0.0] if "site" in text else [0.0, 1.0]
+
+
+class TestFirstTurnQuestions:
+    def test_counts_normalized_anon_questions_per_language_and_page(self):
+        groups = faq_warmer.first_turn_questions([
+            _log("Quanto custa um site?"), _log("quanto custa um site"),
+            _log("How much is a website?", language="en"),
+        ])
+        counter, phrasing = groups[("pt-BR", "/")]
+        assert counter["quanto custa um site"] == 2
+        assert phrasing["quanto custa um site"] in {"Quanto custa um site?", "quanto custa um site"}
+        assert ("en", "/") in groups
+
+    def test_only_an_identified_users_first_turn_counts(self):
+        groups = faq_warmer.first_turn_questions([
+            _log("vocês fazem apps?", user_id="u1", ts=10),
+            _log("e quanto custa isso?", user_id="u1", ts=20),  # depends on the turn before
+        ])
+        counter, _ = groups[("pt-BR", "/")]
+        assert list(counter) == ["voces fazem apps"]
+
+    def test_skips_non_questions_and_redacted_messages(self):
+        groups = faq_warmer.first_turn_questions([
+            _log("oi", intent="greeting"),
+            _log("qual a capital da frança", intent="off_topic"),
+            _log("meu email é [email redacted]"),
+        ])
+        assert groups == {}
+
+
+class TestSelectFaqs:
+    def test_paraphrases_cluster_and_rank_by_frequency(self):
+        logs = ([_log("quanto custa um site")] * 3 + [_log("preço de um site")] * 2
+                + [_log("vocês usam ia")] * 2 + [_log("pergunta rara")])
+        faqs = faq_warmer.select_faqs(logs, _embed, top_n=5, min_count=2, threshold=0.92)
+        assert [(f["question"], f["count"]) for f in faqs] == [
+            ("quanto custa um site", 5), ("vocês usam ia", 3),
+        ]
+
+    def test_embeds_the_representative_phrasing_not_the_normalized_key(self):
+        embedded = []
+        logs = [_log("Quanto custa um site?")] * 2
+
+        faq_warmer.select_faqs(logs, lambda text: embedded.append(text) or _embed(text),
+                               top_n=5, min_count=2, threshold=0.92)
+        assert embedded == ["Quanto custa um site?"]
+
+
+class TestWarm:
+    async def test_seeds_exact_and_semantic_caches(self, redis_fake):
+        answered = []
+
+        async def answer(question, language, page):
+            answered.append(question)
+            return {"revised_response": f"resposta: {question}", "detected_intent": "inquire_services"}, 0.001
+
+        faqs = [{"language": "pt-BR", "page": "/", "question": "Quanto custa um site?", "count": 4,
+                 "vec": [1.0, 0.0]}]
+        summary = await faq_warmer.warm(faqs, answer_fn=answer, rate_per_minute=0)
+
+        assert summary["seeded"] == 1 and answered == ["Quanto custa um site?"]
+        # a later anon visitor's variant hits the exact cache...
+        key = main._exact_cache_key("quanto custa um site", "pt-BR", "/", "anon")
+        assert (await cache.get_cached_response(key))["revised_response"].startswith("resposta")
+        # ...and a paraphrase hits the semantic bucket.
+        bucket = cache.decode_payload(await redis_fake.get(main._semantic_cache_bucket("pt-BR", "/")))
+        assert bucket[0]["vec"] == [1.0, 0.0]
+
+    async def test_already_cached_questions_cost_nothing(self, redis_fake):
+        key = main._exact_cache_key("oi tudo bem", "pt-BR", "/", "anon")
+        await cache.set_cached_response(key, {"revised_response": "x"})
+
+        async def must_not_run(*args):
+            raise AssertionError("cached FAQ must not be regenerated")
+
+        faqs = [{"language": "pt-BR", "page": "/", "question": "oi tudo bem", "count": 2, "vec": [1.0]}]
+        summary = await faq_warmer.warm(faqs, answer_fn=must_not_run, rate_per_minute=0)
+        assert summary["skipped_cached"] == 1
+
+    async def test_stops_at_the_budget(self, redis_fake):
+        async def pricey(question, language, page):
+            return {"revised_response": "x"}, 0.15
+
+        faqs = [{"language": "pt-BR", "page": "/", "question": q, "count": 2, "vec": [1.0]}
+                for q in ("a um", "b dois", "c tres")]
+        summary = await faq_warmer.warm(faqs, answer_fn=pricey, rate_per_minute=0, max_usd=0.2)
+        assert summary["seeded"] == 2 and summary["budget_exhausted"] is True
+
+    async def test_uncacheable_answers_are_not_seeded(self, redis_fake):
+        async def tool_turn(question, language, page):
+            return None, 0.001
+
+        faqs = [{"language": "pt-BR", "page": "/", "question": "quero agendar", "count": 2, "vec": [1.0]}]
+        summary = await faq_warmer.warm(faqs, answer_fn=tool_turn, rate_per_minute=0)
+        assert summary["seeded"] == 0 and summary["skipped_uncacheable"] == 1
+
+
+class TestRun:
+    async def test_cli_run_tags_entries_with_the_apps_kb_version(self, redis_fake, monkeypatch):
+        async def answer(question, language, page):
+            return {"revised_response": f"resposta: {question}"}, 0.001
+
+        monkeypatch.setattr(faq_warmer, "_scan_first_turn_logs",
+                            lambda client, days: [_log("Quanto custa um site?")] * 3)
+        monkeypatch.setattr(faq_warmer, "_answer_through_graph", answer)
+        monkeypatch.setattr(nodes.embeddings, "compute_embedding", _embed)
+        try:
+            summary = await faq_warmer.run(None, top_n=5, min_count=2, window_days=0,
+                                           rate_per_minute=0, max_usd=1.0, refresh=False)
+            assert summary["seeded"] == 1
+
+            # the app, as started by main's lifespan, reads the entry back as fresh
+            cache.set_kb_version(ingest.kb_version(), nodes.EMBEDDING_MODEL_NAME)
+            key = main._exact_cache_key("quanto custa um site", "pt-BR", "/", "anon")
+            assert await cache.is_fresh(key)
+            bucket = main._semantic_cache_bucket("pt-BR", "/")
+            assert await cache.semantic_get(bucket, [1.0, 0.0], 0.9) is not None
+        finally:
+            cache.set_kb_version(None, None)
+
+
+async def test_synthetic_turns_are_not_logged(monkeypatch):
+    from nodes import logging_node
+
+    def must_not_embed(_text):
+        raise AssertionError("synthetic turn must not be persisted")
+
+    monkeypatch.setattr(logging_node.embeddings, "compute_embedding", must_not_embed)
+    state = {"user_input": "x", "metadata": {"synthetic": True}}
+    assert await logging_node.save_log_qdrant(state) == state
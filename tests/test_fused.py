@@ -0,0 +1,102 @@
+"""Fused intent mode (#48): the generation call routes greetings / handoffs itself."""
+
+import pytest
+
+import config
+import nodes
+from agents.graph_config import route_after_generation, route_after_intent
+from nodes import fused, intent
+from observability import langfuse_client
+
+
+def route_call(intent_name):
+    return {"choices": [{"message": {"content": None, "tool_calls": [{
+        "id": "call_1", "function": {"name": "route_intent", "arguments": f'{{"intent": "{intent_name}"}}'},
+    }]}}], "usage": {}}
+
+
+def text_response(text):
+    return {"choices": [{"message": {"content": text}}], "usage": {}}
+
+
+@pytest.fixture(autouse=True)
+def fused_mode(monkeypatch):
+    monkeypatch.setattr(config, "FUSED_INTENT_ENABLED", True)
+    monkeypatch.setattr(langfuse_client, "get_prompt", lambda *a, **k: None)
+    monkeypatch.setattr(langfuse_client, "start_llm_generation", lambda **kw: None)
+    monkeypatch.setattr(langfuse_client, "end_llm_generation", lambda **kw: None)
+
+
+@pytest.fixture
+def chat_calls(monkeypatch):
+    calls = []
+
+    def install(*responses):
+        async def fake(messages, temperature=0.7, use_tools=False, extra_tools=None, **kw):
+            calls.append({"messages": list(messages), "extra_tools": extra_tools})
+            return responses[min(len(calls) - 1, len(responses) - 1)]
+        monkeypatch.setattr(nodes.generation, "_deepseek_chat", fake)
+        return calls
+    return install
+
+
+class TestFusedIntent:
+    async def test_entry_node_skips_the_classifier(self, monkeypatch):
+        async def must_not_run(state):
+            raise AssertionError("classifier called in fused mode")
+        monkeypatch.setattr(intent, "detect_intent", must_not_run)
+        out = await nodes.detect_intent_speculative({"user_input": "oi"})
+        assert out["fused_intent"] is True and out["intent"] == nodes.DEFAULT_INTENT
+        assert route_after_intent(out) == "retrieve_company_context"
+
+    async def test_routed_greeting_gets_the_canned_reply_from_one_call(self, chat_calls):
+        calls = chat_calls(route_call("greeting"))
+        out = await nodes.generate_response({"user_input": "bom dia", "language": "en", "fused_intent": True})
+        assert len(calls) == 1
+        assert calls[0]["extra_tools"] == [fused.ROUTE_INTENT_SPEC]
+        assert fused.FUSED_INSTRUCTION in calls[0]["messages"][0]["content"]
+        assert out["intent"] == "greeting" and out["response"] == nodes.GREETINGS["en"]
+        assert out["tool_results"] == []
+        assert route_after_generation(out) == "log_saving"
+
+    async def test_routed_handoff(self, chat_calls):
+        chat_calls(route_call("chat_with_agent"))
+        out = await nodes.generate_response({"user_input": "quero falar com alguém", "fused_intent": True})
+        assert out["intent"] == "chat_with_agent" and config.BOOKING_URL in out["response"]
+
+    async def test_answered_turn_keeps_the_default_intent_and_is_revised(self, chat_calls):
+        chat_calls(text_response("Fazemos sites, sim!"))
+        state = fused.skip_classifier({"user_input": "vcs fazem site?"})
+        out = await nodes.generate_response(state)
+        assert out["response"] == "Fazemos sites, sim!" and out["intent"] == nodes.DEFAULT_INTENT
+        assert route_after_generation(out) == "response_revision"
+
+    async def test_unusable_route_is_fed_back_and_the_model_answers(self, chat_calls):
+        calls = chat_calls(route_call("request_quote"), text_response("Vamos conversar!"))
+        reply, results = await nodes._run_tool_loop([], None, None, extra_tools=[fused.ROUTE_INTENT_SPEC])
+        assert reply == "Vamos conversar!" and results == []
+        assert calls[1]["messages"][-1]["role"] == "tool"
+
+    async def test_route_next_to_real_tool_calls_is_ignored(self, chat_calls, monkeypatch):
+        dispatched = []
+
+        async def dispatch(name, args):
+            dispatched.append(name)
+            return {"ok": True}
+        monkeypatch.setattr(nodes.generation.tools, "dispatch", dispatch)
+        mixed = route_call("chat_with_agent")
+        mixed["choices"][0]["message"]["tool_calls"].append({
+            "id": "call_2", "function": {"name": "create_lead", "arguments": '{"name": "Ana"}'},
+        })
+        calls = chat_calls(mixed, text_response("Anotado, Ana!"))
+        reply, results = await nodes._run_tool_loop([], None, None, extra_tools=[fused.ROUTE_INTENT_SPEC])
+        assert reply == "Anotado, Ana!" and dispatched == ["create_lead"]
+        assert results == [{"tool": "create_lead", "result": {"ok": True}}]
+        assert [m["role"] for m in calls[1]["messages"][-2:]] == ["tool", "tool"]  # both calls answered
+
+    async def test_classifier_mode_offers_no_route_tool(self, chat_calls, monkeypatch):
+        monkeypatch.setattr(config, "FUSED_INTENT_ENABLED", False)
+        calls = chat_calls(text_response("ok"))
+        await nodes.generate_response({"user_input": "vcs fazem site?"})
+        assert calls[0]["extra_tools"] == []
+        assert fused.FUSED_INSTRUCTION not in calls[0]["messages"][0]["content"]
@@ -55,6 +55,12 @@ class TestUsageReportAuth:
         assert "spend" in body
         assert body["spend"]["daily_limit_usd"] == config.DAILY_SPEND_LIMIT_USD
 
+    async def test_report_includes_cache_layers(self, raw_client):
+        resp = await raw_client.get(
+            "/usage-report", headers={"Authorization": f"Bearer {ADMIN_TOKEN}"}
+        )
+        assert set(resp.json()["cache"]) >= {"exact", "semantic", "greeting"}
+
     async def test_deny_when_no_admin_token_configured(self, raw_client, monkeypatch):
         # A misconfigured deploy (no token) must fail closed, not open the endpoint.
         monkeypatch.setattr(config, "ADMIN_API_TOKEN", None)
@@ -64,6 +70,24 @@ class TestUsageReportAuth:
         assert resp.status_code == 401
 
 
+class TestAdminCacheEndpoints:
+    async def test_cache_endpoints_require_the_admin_token(self, raw_client):
+        assert (await raw_client.get("/admin/cache")).status_code == 401
+        assert (await raw_client.post("/admin/cache/flush?language=pt-BR")).status_code == 401
+
+    async def test_inspect_and_flush(self, raw_client):
+        auth = {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+        await main.cache.set_cached_response(main._exact_cache_key("oi", "pt-BR", "/", "anon"), {"a": 1})
+
+        inspected = (await raw_client.get("/admin/cache", headers=auth)).json()
+        assert inspected["exact_anon_keys"] == 1
+
+        flushed = await raw_client.post("/admin/cache/flush?language=pt&page=/", headers=auth)
+        body = flushed.json()
+        assert flushed.status_code == 200
+        assert body["language"] == "pt-BR" and body["exact_keys_deleted"] == 1
+
+
 class TestDocsKwargs:
     def test_production_disables_all_doc_routes(self):
         kwargs = main.docs_kwargs(is_production=True)
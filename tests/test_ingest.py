@@ -167,3 +167,13 @@ class _PagedQdrant:
         self.pages_served += 1
         next_offset = start + 1 if start + 1 < len(self._ids) else None
         return [type("P", (), {"id": i})() for i in page], next_offset
+
+
+class TestKbVersion:
+    def test_changes_with_content(self, tmp_path):
+        kb = tmp_path / "kb.md"
+        kb.write_text("# A\n\none", encoding="utf-8")
+        first = ingest.kb_version(str(kb))
+        assert first == ingest.kb_version(str(kb))
+        kb.write_text("# A\n\ntwo", encoding="utf-8")
+        assert ingest.kb_version(str(kb)) != first
@@ -0,0 +1,88 @@
+"""Local intent classifier (#49): kNN over exemplars, LLM fallback when unsure."""
+
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+import config
+import nodes
+from core import cache, intent_knn
+from providers import llm
+
+EVALS = Path(__file__).resolve().parent.parent / "evals" / "intents.jsonl"
+VECTORS = {"oi gente": [1.0, 0.0, 0.0], "quanto fica?": [0.7, 0.7, 0.0], "capital do peru?": [0.0, 0.0, 1.0]}
+
+
+@pytest.fixture
+def knn_on(monkeypatch):
+    monkeypatch.setattr(config, "INTENT_KNN_ENABLED", True)
+    monkeypatch.setattr(config, "INTENT_KNN_THRESHOLD", 0.8)
+    monkeypatch.setattr(config, "INTENT_KNN_MARGIN", 0.05)
+    monkeypatch.setattr(nodes.embeddings, "compute_embedding", lambda text: VECTORS[text])
+    intent_knn._INDEX[:] = [("greeting", [1.0, 0.0, 0.0]), ("request_quote", [0.0, 1.0, 0.0]),
+                            ("inquire_services", [0.1, 0.99, 0.0])]
+
+
+@pytest.fixture
+def llm_intent(monkeypatch):
+    calls = []
+
+    class Resp:
+        def json(self):
+            return {"choices": [{"message": {"content": '{"intent": "off_topic"}'}}], "usage": {}}
+
+    async def fake(messages, **kw):
+        calls.append(messages)
+        return Resp()
+    monkeypatch.setattr(llm, "chat_completion", fake)
+    return calls
+
+
+class TestClassify:
+    def test_nearest_exemplar_with_margin(self, knn_on):
+        assert intent_knn.classify([0.98, 0.1, 0.0]) == "greeting"
+        assert intent_knn.classify([0.0, 0.0, 1.0]) is None  # far from everything
+
+    def test_two_close_intents_are_left_to_the_llm(self, knn_on):
+        assert intent_knn.classify([0.05, 1.0, 0.0]) is None  # request_quote vs inquire_services
+
+    def test_exemplars_cover_every_intent_in_every_language(self):
+        assert set(intent_knn.EXEMPLARS) == set(nodes.VALID_INTENTS)
+        for by_language in intent_knn.EXEMPLARS.values():
+            assert set(by_language) == {"pt-BR", "en", "es", "it"}
+
+    def test_exemplars_share_no_text_with_the_eval_set(self):
+        def words(text):
+            return " " + " ".join(re.sub(r"[^\w ]", " ", cache.normalize_message(text)).split()) + " "
+
+        evals = [words(json.loads(line)["message"]) for line in open(EVALS, encoding="utf-8") if line.strip()]
+        for by_language in intent_knn.EXEMPLARS.values():
+            for text in (t for texts in by_language.values() for t in texts):
+                overlap = [e for e in evals if e in words(text) or words(text) in e]
+                assert not overlap, (text, overlap)
+
+
+class TestDetectIntent:
+    async def test_confident_match_skips_the_llm(self, knn_on, llm_intent):
+        out = await nodes.detect_intent({"user_input": "oi gente"})
+        assert out["intent"] == "greeting" and llm_intent == []
+        assert intent_knn.get_stats()["local"] == 1
+
+    async def test_ambiguous_message_falls_back_to_the_llm(self, knn_on, llm_intent):
+        out = await nodes.detect_intent({"user_input": "capital do peru?"})
+        assert out["intent"] == "off_topic" and len(llm_intent) == 1
+        stats = intent_knn.get_stats()
+        assert stats["llm"] == 1 and stats["coverage"] == 0.0
+
+    async def test_embedding_failure_falls_back_to_the_llm(self, knn_on, llm_intent, monkeypatch):
+        def boom(text):
+            raise RuntimeError("onnx unavailable")
+        monkeypatch.setattr(nodes.embeddings, "compute_embedding", boom)
+        out = await nodes.detect_intent({"user_input": "oi gente"})
+        assert out["intent"] == "off_topic" and len(llm_intent) == 1
+
+    async def test_disabled_or_unindexed_always_asks_the_llm(self, llm_intent):
+        await nodes.detect_intent({"user_input": "oi gente"})
+        assert len(llm_intent) == 1 and intent_knn.get_stats()["llm"] == 0
@@ -0,0 +1,103 @@
+"""Lexical fast path (#50): whole-message greetings / handoff asks answered before the graph."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import config
+import main
+from core import cache, lexical_router
+from nodes import GREETINGS
+
+
+@pytest.fixture
+def lexical_on(monkeypatch):
+    monkeypatch.setattr(config, "LEXICAL_FAST_PATH_ENABLED", True)
+    yield
+    cache.reset_cache_stats()
+
+
+@pytest.fixture
+def no_graph(monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AssertionError("the lexical fast path must not run the graph")
+
+    async def must_not_classify(state):
+        raise AssertionError("the lexical fast path must not call detect_intent")
+
+    monkeypatch.setattr(main.graph, "ainvoke", fail)
+    monkeypatch.setattr(main.nodes, "detect_intent", must_not_classify)
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    saved = []
+
+    async def save_log(state):
+        await asyncio.sleep(0.05)  # a slow write must not delay the reply
+        saved.append(state)
+        return state
+
+    monkeypatch.setattr(main.nodes, "save_log_qdrant", save_log)
+    return saved
+
+
+class TestMatch:
+    @pytest.mark.parametrize("message", [
+        "Oi", "oi!! 👋", "Olá, tudo bem?", "boa tarde", "E aí", "hello", "hi there", "Good evening!",
+        "hola", "Buenas tardes", "ciao", "Buongiorno", "buonasera ragazzi",
+    ])
+    def test_greetings_in_every_language(self, message):
+        assert lexical_router.match(message) == "greeting"
+
+    @pytest.mark.parametrize("message", [
+        "quero falar com um atendente", "posso falar com uma pessoa de verdade?",
+        "I want to talk to a human", "can I speak to a real person?",
+        "quiero hablar con una persona", "voglio parlare con un operatore",
+    ])
+    def test_handoff_asks_in_every_language(self, message):
+        assert lexical_router.match(message) == "chat_with_agent"
+
+    @pytest.mark.parametrize("message", [
+        "boa tarde, voce desenvolvem app com agentes ?",  # greeting + a real question
+        "quero falar com alguém sobre um site",
+        "hi, how much is a site?",
+        "human resources software",
+        "",
+    ])
+    def test_anything_more_is_left_to_the_graph(self, message):
+        assert lexical_router.match(message) is None
+
+
+class TestChatFastPath:
+    async def test_greeting_is_answered_without_the_graph(self, lexical_on, redis_fake, no_graph, logged):
+        started = time.perf_counter()
+        body = await main._handle_chat(main.ChatRequest(message="buongiorno", language="it"))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        assert body["detected_intent"] == "greeting" and body["is_greeting"] is True
+        assert body["final_step"] == "lexical_fast_path"
+        assert body["revised_response"].startswith("Ciao 👋") and body["response_parts"]
+        assert elapsed_ms < 10
+        assert logged == []  # queued, not awaited
+        await asyncio.sleep(0.1)
+        assert logged[0]["intent"] == "greeting" and logged[0]["user_input"] == "buongiorno"
+        stats = cache.get_cache_stats()
+        assert stats["lexical"]["hits"] == 1 and stats["greeting"]["hits"] == 1
+
+    async def test_handoff_reply_is_filled(self, lexical_on, redis_fake, no_graph, logged):
+        body = await main._handle_chat(main.ChatRequest(message="I want to talk to a human", language="en"))
+        assert body["detected_intent"] == "chat_with_agent"
+        assert config.BOOKING_URL in body["revised_response"]
+
+    async def test_stream_serves_the_canned_reply(self, lexical_on, redis_fake, no_graph, logged):
+        frames = [json.loads(f[len("data: "):]) async for f in
+                  main._stream_chat(main.ChatRequest(message="hola", language="es"))]
+        assert frames[0] == {"type": "start", "intent": "greeting"}
+        assert "".join(f["text"] for f in frames if f["type"] == "token") == GREETINGS["es"]
+        assert frames[-1]["type"] == "done"
+
+    async def test_disabled_goes_through_the_graph(self, monkeypatch):
+        monkeypatch.setattr(config, "LEXICAL_FAST_PATH_ENABLED", False)
+        assert await main._lexical_fast_path(main.ChatRequest(message="oi")) is None
@@ -1,5 +1,7 @@
 """LLM routing + provider fallback (#13)."""
 
+import asyncio
+
 import httpx
 import pytest
 
@@ -144,3 +146,523 @@ class TestFallback:
         await llm.chat_completion([], task="generation")
         assert len(calls) == 1  # primary only
         assert "api_url" not in calls[0]
+
+
+class JsonResp:
+    def __init__(self, body, status=200):
+        self.status_code = status
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+@pytest.fixture
+def response_cached(monkeypatch):
+    """intent opted into the response cache; the transport counts calls."""
+    calls = []
+
+    async def fake_cc(messages, **kwargs):
+        calls.append(kwargs)
+        return JsonResp({"choices": [{"message": {"content": '{"intent": "request_quote"}'}}],
+                         "usage": {"prompt_tokens": 50, "completion_tokens": 5}})
+
+    monkeypatch.setattr(llm.deepseek_client, "chat_completion", fake_cc)
+    monkeypatch.setattr(config, "LLM_RESPONSE_CACHE", "intent:60:2")
+    monkeypatch.setattr(config, "FALLBACK_API_URL", "")
+    llm.response_cache.clear()
+    yield calls
+    llm.response_cache.clear()
+
+
+class TestResponseCache:
+    MSG = [{"role": "user", "content": "quanto custa um site?"}]
+
+    async def test_repeat_is_served_from_memory_without_usage(self, response_cached):
+        await llm.chat_completion(self.MSG, task="intent", temperature=0.1)
+        resp = await llm.chat_completion(self.MSG, task="intent", temperature=0.1)
+        assert len(response_cached) == 1
+        assert resp.headers[llm.response_cache.HIT_HEADER] == "hit"
+        assert resp.json()["choices"][0]["message"]["content"] == '{"intent": "request_quote"}'
+        assert "usage" not in resp.json()  # callers bill nothing for a hit
+        stats = llm.response_cache.get_stats()["intent"]
+        assert stats["hits"] == 1 and stats["saved_prompt_tokens"] == 50
+
+    async def test_parameters_are_part_of_the_key(self, response_cached):
+        await llm.chat_completion(self.MSG, task="intent", temperature=0.1)
+        await llm.chat_completion(self.MSG, task="intent", temperature=0.7)
+        await llm.chat_completion(self.MSG, task="intent", temperature=0.1, model="other")
+        assert len(response_cached) == 3
+
+    async def test_tasks_not_opted_in_are_never_cached(self, response_cached):
+        await llm.chat_completion(self.MSG, task="generation")
+        await llm.chat_completion(self.MSG, task="generation")
+        assert len(response_cached) == 2
+
+    async def test_size_limit_evicts_least_recently_used(self, response_cached):
+        for text in ("a", "b", "a", "c"):  # "b" is the LRU when "c" arrives
+            await llm.chat_completion([{"role": "user", "content": text}], task="intent")
+        await llm.chat_completion([{"role": "user", "content": "a"}], task="intent")
+        assert len(response_cached) == 3
+        assert llm.response_cache.get_stats()["intent"]["evictions"] == 1
+
+    async def test_expired_entry_is_refetched(self, response_cached, monkeypatch):
+        await llm.chat_completion(self.MSG, task="intent")
+        real = llm.response_cache.time.monotonic
+        monkeypatch.setattr(llm.response_cache.time, "monotonic", lambda: real() + 61)
+        await llm.chat_completion(self.MSG, task="intent")
+        assert len(response_cached) == 2
+
+    async def test_errors_are_not_cached(self, response_cached, monkeypatch):
+        async def failing(messages, **kwargs):
+            response_cached.append(kwargs)
+            return JsonResp({"error": {"message": "busy"}}, status=503)
+
+        monkeypatch.setattr(llm.deepseek_client, "chat_completion", failing)
+        await llm.chat_completion(self.MSG, task="intent")
+        await llm.chat_completion(self.MSG, task="intent")
+        assert len(response_cached) == 2
+
+
+@pytest.fixture
+def hedged(monkeypatch):
+    """generation hedged at p90 with the fallback configured; per-model delays and cancellations recorded."""
+    _enable_fallback(monkeypatch)
+    monkeypatch.setattr(config, "GENERATION_MODEL", "strong-gen")
+    monkeypatch.setattr(config, "LLM_HEDGE", "generation:90")
+    monkeypatch.setattr(config, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(config, "LLM_HEDGE_MIN_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(config, "LLM_HEDGE_MIN_SAMPLES", 5)
+    state = {"delay": {"strong-gen": 0.0, "backup-model": 0.0}, "status": {}, "calls": [], "cancelled": []}
+
+    async def fake_cc(messages, **kwargs):
+        model = kwargs["model"]
+        state["calls"].append(model)
+        try:
+            await asyncio.sleep(state["delay"][model])
+        except asyncio.CancelledError:
+            state["cancelled"].append(model)
+            raise
+        return JsonResp({"choices": [{"message": {"content": model}}], "usage": {"prompt_tokens": 1}},
+                        status=state["status"].get(model, 200))
+
+    monkeypatch.setattr(llm.deepseek_client, "chat_completion", fake_cc)
+    llm.latency.reset()
+    llm._hedge_stats.clear()
+    yield state
+    llm.latency.reset()
+    llm._hedge_stats.clear()
+
+
+def _content(resp):
+    return resp.json()["choices"][0]["message"]["content"]
+
+
+class TestHedging:
+    async def test_fast_primary_is_not_hedged(self, hedged):
+        resp = await llm.chat_completion([], task="generation")
+        assert _content(resp) == "strong-gen"
+        assert hedged["calls"] == ["strong-gen"]
+        assert llm.latency.count("generation") == 1
+
+    async def test_slow_primary_is_hedged_and_cancelled(self, hedged):
+        hedged["delay"]["strong-gen"] = 5.0
+        resp = await llm.chat_completion([], task="generation")
+        assert _content(resp) == "backup-model"
+        await asyncio.sleep(0)
+        assert hedged["cancelled"] == ["strong-gen"]  # the loser is never read, so never billed
+        stats = llm.get_hedge_stats()["generation"]
+        assert stats["hedged"] == 1 and stats["fallback_won"] == 1
+
+    async def test_primary_can_still_win_after_hedging(self, hedged):
+        hedged["delay"].update({"strong-gen": 0.08, "backup-model": 5.0})
+        resp = await llm.chat_completion([], task="generation")
+        assert _content(resp) == "strong-gen"
+        await asyncio.sleep(0)
+        assert hedged["cancelled"] == ["backup-model"]
+        assert llm.get_hedge_stats()["generation"]["primary_won"] == 1
+
+    async def test_bad_first_answer_waits_for_the_other(self, hedged):
+        hedged["delay"].update({"strong-gen": 0.3, "backup-model": 0.0})
+        hedged["status"]["backup-model"] = 503
+        resp = await llm.chat_completion([], task="generation")
+        assert _content(resp) == "strong-gen"
+
+    async def test_half_open_probe_that_loses_the_hedge_does_not_close(self, hedged, monkeypatch):
+        monkeypatch.setattr(config, "LLM_BREAKER_ENABLED", True)
+        monkeypatch.setattr(config, "LLM_BREAKER_COOLDOWN_SECONDS", 0)
+        breaker = llm.circuit_breaker.get("primary", "strong-gen")
+        breaker._trip()  # cooled down at once: the next call is the half-open probe
+        hedged["delay"]["strong-gen"] = 5.0
+        assert _content(await llm.chat_completion([], task="generation")) == "backup-model"
+        assert hedged["calls"] == ["strong-gen", "backup-model"]  # the probe went out and lost
+        assert breaker.state == "open" and breaker.trips == 2
+
+    async def test_tasks_not_listed_are_not_hedged(self, hedged):
+        hedged["delay"]["strong-gen"] = 0.1
+        await llm.chat_completion([], task="revision")
+        assert hedged["calls"] == ["strong-gen"]
+
+    def test_delay_follows_the_latency_percentile(self, hedged):
+        assert llm.hedge_delay("generation", 90) == 0.05  # cold window: the default
+        for seconds in (1, 2, 3, 4, 5, 6, 7, 8, 9, 10):
+            llm.latency.record("generation", seconds)
+        assert llm.hedge_delay("generation", 90) == 9
+        assert llm.hedge_delay("generation", 50) == 5
+
+
+@pytest.fixture
+def breaker_env(monkeypatch):
+    """Fallback configured; breaker opens after 3 calls at >= 50% failures, 30s cooldown."""
+    _enable_fallback(monkeypatch)
+    monkeypatch.setattr(config, "GENERATION_MODEL", "strong-gen")
+    monkeypatch.setattr(config, "LLM_HEDGE", "")
+    monkeypatch.setattr(config, "LLM_BREAKER_ENABLED", True)
+    monkeypatch.setattr(config, "LLM_BREAKER_MIN_CALLS", 3)
+    monkeypatch.setattr(config, "LLM_BREAKER_ERROR_RATE", 0.5)
+    monkeypatch.setattr(config, "LLM_BREAKER_COOLDOWN_SECONDS", 30)
+    monkeypatch.setattr(config, "LLM_BREAKER_SLOW_CALL_SECONDS", 20)
+    state = {"primary_status": 503, "calls": []}
+
+    async def fake_cc(messages, **kwargs):
+        is_primary = "api_url" not in kwargs
+        state["calls"].append("primary" if is_primary else "fallback")
+        return FakeResp(state["primary_status"] if is_primary else 200)
+
+    monkeypatch.setattr(llm.deepseek_client, "chat_completion", fake_cc)
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(llm.circuit_breaker.time, "monotonic", lambda: clock["now"])
+    state["clock"] = clock
+    return state
+
+
+class TestCircuitBreaker:
+    async def test_repeated_failures_open_and_skip_the_primary(self, breaker_env):
+        for _ in range(3):
+            await llm.chat_completion([], task="generation")
+        assert llm.circuit_breaker.get("primary", "strong-gen").state == "open"
+        breaker_env["calls"].clear()
+        resp = await llm.chat_completion([], task="generation")
+        assert resp.status_code == 200
+        assert breaker_env["calls"] == ["fallback"]  # no wait on the degraded primary
+
+    async def test_half_open_probe_success_closes(self, breaker_env):
+        for _ in range(3):
+            await llm.chat_completion([], task="generation")
+        breaker_env["primary_status"] = 200
+        breaker_env["clock"]["now"] += 31
+        breaker_env["calls"].clear()
+        await llm.chat_completion([], task="generation")
+        assert breaker_env["calls"] == ["primary"]
+        breaker = llm.circuit_breaker.get("primary", "strong-gen")
+        assert breaker.state == "closed" and breaker.error_rate() == 0.0
+
+    async def test_half_open_probe_failure_reopens(self, breaker_env):
+        for _ in range(3):
+            await llm.chat_completion([], task="generation")
+        breaker_env["clock"]["now"] += 31
+        await llm.chat_completion([], task="generation")  # probe fails
+        breaker = llm.circuit_breaker.get("primary", "strong-gen")
+        assert breaker.state == "open" and breaker.trips == 2
+
+    def test_half_open_admits_one_probe_at_a_time(self, breaker_env):
+        breaker = llm.circuit_breaker.get("primary", "m")
+        for _ in range(3):
+            breaker.record(False)
+        breaker_env["clock"]["now"] += 31
+        assert breaker.allow() is True
+        assert breaker.allow() is False  # probe in flight
+
+    def test_slow_calls_count_as_failures(self, breaker_env):
+        breaker = llm.circuit_breaker.get("primary", "m")
+        for _ in range(3):
+            breaker.record(True, 25.0)
+        assert breaker.state == "open"
+        assert breaker.snapshot()["ewma_latency_seconds"] == 25.0
+
+    async def test_without_fallback_the_primary_is_still_tried(self, breaker_env, monkeypatch):
+        monkeypatch.setattr(config, "FALLBACK_API_URL", "")
+        for _ in range(4):
+            await llm.chat_completion([], task="generation")
+        assert breaker_env["calls"] == ["primary"] * 4
+
+    async def test_stats_are_keyed_by_provider_and_model(self, breaker_env):
+        await llm.chat_completion([], task="generation")
+        stats = llm.circuit_breaker.get_stats()
+        assert stats["primary:strong-gen"]["calls"] == 1
+        assert stats["fallback:backup-model"]["state"] == "closed"
+
+
+ENDPOINTS = [
+    {"name": "fast", "url": "https://fast.test/v1/chat", "model": "m-fast", "api_key": "k1", "cost": 2.0,
+     "max_concurrency": 1},
+    {"name": "cheap", "url": "https://cheap.test/v1/chat", "model": "m-cheap", "api_key": "k2", "cost": 1.0},
+]
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    """generation pooled over fast|cheap; per-endpoint delays/statuses, calls recorded by name."""
+    import json
+
+    monkeypatch.setattr(config, "LLM_ENDPOINTS", json.dumps(ENDPOINTS))
+    monkeypatch.setattr(config, "LLM_TASK_POOLS", "generation:fast|cheap,intent:cheap|unknown")
+    monkeypatch.setattr(config, "FALLBACK_API_URL", "")
+    monkeypatch.setattr(config, "LLM_HEDGE", "")
+    state = {"delay": {}, "status": {}, "calls": []}
+
+    async def fake_cc(messages, **kwargs):
+        name = kwargs["api_url"].split("//")[1].split(".")[0]
+        state["calls"].append((name, kwargs["model"], kwargs["api_key"]))
+        await asyncio.sleep(state["delay"].get(name, 0))
+        return FakeResp(state["status"].get(name, 200))
+
+    monkeypatch.setattr(llm.deepseek_client, "chat_completion", fake_cc)
+    return state
+
+
+def _endpoint(name):
+    return llm.pool._endpoints[name]
+
+
+class TestProviderPool:
+    async def test_unmeasured_endpoints_go_cheapest_first(self, pooled):
+        await llm.chat_completion([], task="generation")
+        assert pooled["calls"] == [("cheap", "m-cheap", "k2")]
+
+    async def test_routes_by_latency_times_cost(self, pooled):
+        await llm.chat_completion([], task="generation")
+        _endpoint("fast").ewma_latency = 0.5   # score 1.0
+        _endpoint("cheap").ewma_latency = 2.0  # score 2.0
+        await llm.chat_completion([], task="generation")
+        assert pooled["calls"][-1][0] == "fast"
+        _endpoint("fast").ewma_latency = 1.5   # score 3.0: now cheap wins despite being slower
+        await llm.chat_completion([], task="generation")
+        assert pooled["calls"][-1][0] == "cheap"
+
+    async def test_failure_moves_to_the_next_endpoint(self, pooled):
+        pooled["status"]["cheap"] = 503
+        resp = await llm.chat_completion([], task="generation")
+        assert resp.status_code == 200
+        assert [c[0] for c in pooled["calls"]] == ["cheap", "fast"]
+        assert _endpoint("cheap").errors == 1
+
+    async def test_full_endpoints_are_skipped_while_others_have_room(self, pooled):
+        await llm.chat_completion([], task="generation")
+        _endpoint("fast").ewma_latency = 0.1
+        _endpoint("cheap").ewma_latency = 5.0
+        pooled["delay"]["fast"] = 0.05
+        await asyncio.gather(*(llm.chat_completion([], task="generation") for _ in range(2)))
+        names = [c[0] for c in pooled["calls"][1:]]
+        assert sorted(names) == ["cheap", "fast"]  # fast holds 1 slot, the overflow goes to cheap
+
+    async def test_tasks_get_their_own_pool(self, pooled):
+        await llm.chat_completion([], task="intent")
+        assert pooled["calls"][0][0] == "cheap"
+        assert [e["name"] for e in llm.pool.get_stats()["intent"]] == ["cheap"]  # unknown names dropped
+
+    async def test_explicit_model_and_unpooled_tasks_keep_single_primary(self, pooled, monkeypatch):
+        seen = []
+
+        async def primary(messages, **kwargs):
+            seen.append(kwargs)
+            return FakeResp(200)
+
+        monkeypatch.setattr(llm.deepseek_client, "chat_completion", primary)
+        await llm.chat_completion([], task="revision")
+        await llm.chat_completion([], task="generation", model="pinned")
+        assert all("api_url" not in kw for kw in seen) and seen[1]["model"] == "pinned"
+
+    def test_failures_enter_the_ewma_as_a_penalty(self, pooled, monkeypatch):
+        monkeypatch.setattr(config, "LLM_POOL_EWMA_ALPHA", 0.5)
+        monkeypatch.setattr(config, "LLM_POOL_ERROR_PENALTY_SECONDS", 10.0)
+        llm.pool.for_task("generation")
+        e = _endpoint("cheap")
+        e.record(True, 2.0)
+        e.record(True, 4.0)
+        e.record(False, 0.01)  # a fast error is no evidence of a fast endpoint
+        assert e.ewma_latency == 6.5 and e.calls == 3 and e.errors == 1
+
+    async def test_an_endpoint_that_always_errors_is_not_preferred(self, pooled):
+        pooled["status"]["cheap"] = 503
+        for _ in range(3):
+            assert (await llm.chat_completion([], task="generation")).status_code == 200
+        # cheap was explored once; its failure scores worse than fast's real latency since
+        assert [c[0] for c in pooled["calls"]] == ["cheap", "fast", "fast", "fast"]
+        assert [e.name for e in llm.pool.for_task("generation")] == ["fast", "cheap"]
+
+
+class TestTaskProfiles:
+    @pytest.fixture(autouse=True)
+    def profiles(self, monkeypatch):
+        monkeypatch.setattr(config, "LLM_TASK_PROFILES", "intent:10:60,generation:30:450,revision:20:300")
+        monkeypatch.setattr(config, "LLM_INTENT_MAX_TOKENS", "greeting:150")
+        monkeypatch.setattr(config, "LLM_TIMEOUT_MIN_SAMPLES", 5)
+        monkeypatch.setattr(config, "LLM_TIMEOUT_PERCENTILE", 90)
+        monkeypatch.setattr(config, "LLM_TIMEOUT_MULTIPLIER", 2.0)
+        monkeypatch.setattr(config, "LLM_TIMEOUT_MIN_SECONDS", 3.0)
+
+    async def test_each_task_gets_its_timeout_cap_and_stops(self, routed):
+        await llm.chat_completion([], task="intent")
+        await llm.chat_completion([], task="generation")
+        intent, generation = routed
+        assert (intent["timeout"], intent["max_tokens"], intent["stop"]) == (10.0, 60, ["\n"])
+        assert (generation["timeout"], generation["max_tokens"]) == (30.0, 450)
+        assert "\nUser:" in generation["stop"]
+
+    async def test_intent_json_mode_has_no_newline_stop(self, routed):
+        await llm.chat_completion([], task="intent", response_format={"type": "json_object"})
+        assert "stop" not in routed[0]
+
+    async def test_generation_cap_follows_the_detected_intent(self, routed):
+        await llm.chat_completion([], task="generation", intent="greeting")
+        await llm.chat_completion([], task="generation", intent="request_quote")
+        assert [c["max_tokens"] for c in routed] == [150, 450]
+
+    async def test_explicit_caller_values_win(self, routed):
+        await llm.chat_completion([], task="generation", timeout=15.0, max_tokens=None, stop=None)
+        assert (routed[0]["timeout"], routed[0]["max_tokens"], routed[0]["stop"]) == (15.0, None, None)
+
+    def test_timeout_adapts_to_observed_latency_within_bounds(self):
+        assert llm.timeout_for("intent") == 10.0  # cold: the ceiling
+        for seconds in (0.4, 0.5, 0.6, 0.7, 0.8):
+            llm.latency.record("intent", seconds)
+        assert llm.timeout_for("intent") == 3.0  # 2 x 0.8 = 1.6, floored
+        for _ in range(5):
+            llm.latency.record("intent", 4.0)
+        assert llm.timeout_for("intent") == 8.0  # 2 x p90 (4.0)
+        for _ in range(10):
+            llm.latency.record("intent", 9.0)
+        assert llm.timeout_for("intent") == 10.0  # never above the ceiling
+
+    def test_unknown_task_uses_the_transport_default(self):
+        assert llm.timeout_for("judge") == llm.deepseek_client.DEFAULT_TIMEOUT
+        assert "max_tokens" not in llm.apply_profile("judge", None, {})
+
+
+class TestPromptCacheAccounting:
+    @pytest.fixture(autouse=True)
+    def clean(self):
+        llm._prompt_cache_stats.clear()
+        yield
+        llm._prompt_cache_stats.clear()
+
+    async def test_hit_tokens_are_tallied_per_task(self, monkeypatch):
+        usages = iter([{"prompt_tokens": 1000, "prompt_cache_hit_tokens": 0},
+                       {"prompt_tokens": 1000, "prompt_cache_hit_tokens": 896}])
+
+        async def fake_cc(messages, **kwargs):
+            return JsonResp({"choices": [{"message": {"content": "ok"}}], "usage": next(usages)})
+
+        monkeypatch.setattr(llm.deepseek_client, "chat_completion", fake_cc)
+        await llm.chat_completion([], task="generation")
+        await llm.chat_completion([], task="generation")
+        stats = llm.get_prompt_cache_stats()["generation"]
+        assert stats == {"calls": 2, "prompt_tokens": 2000, "prompt_cache_hit_tokens": 896, "hit_ratio": 0.448}
+
+    async def test_responses_without_usage_are_ignored(self, routed):
+        await llm.chat_completion([], task="generation")  # FakeResp has no body
+        assert llm.get_prompt_cache_stats() == {}
+
+    async def test_stream_usage_is_tallied_when_it_completes(self, monkeypatch):
+        async def fake_stream(messages, *, usage_sink=None, **kw):
+            yield "oi"
+            usage_sink.update({"prompt_tokens": 500, "prompt_cache_hit_tokens": 384})
+
+        monkeypatch.setattr(config, "FALLBACK_API_URL", "")
+        monkeypatch.setattr(llm.deepseek_client, "stream_chat_completion", fake_stream)
+        out = [d async for d in llm.stream_completion([], task="generation", usage_sink={})]
+        assert out == ["oi"]
+        assert llm.get_prompt_cache_stats()["generation"]["hit_ratio"] == 0.768
+
+
+# ---- Priority bulkhead (#45) ----
+
+from providers import bulkhead  # noqa: E402
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    monkeypatch.setattr(config, "LLM_BULKHEAD_ENABLED", True)
+    monkeypatch.setattr(config, "LLM_BULKHEAD_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(config, "LLM_BULKHEAD_LIMITS", "")
+    monkeypatch.setattr(config, "LLM_BULKHEAD_MAX_QUEUE", 10)
+
+
+async def _hold(task, order, release):
+    async with bulkhead.slot(task):
+        order.append(task)
+        await release.wait()
+
+
+class TestBulkhead:
+    async def test_queued_calls_run_in_priority_order(self, gated):
+        order, release = [], asyncio.Event()
+        running = asyncio.create_task(_hold("generation", order, release))
+        await asyncio.sleep(0)
+        waiting = [asyncio.create_task(_hold(t, order, release))
+                   for t in ("judge", "revision", "judge", "intent", "generation")]
+        await asyncio.sleep(0)
+        assert bulkhead.get_stats()["classes"]["judge"]["waiting"] == 2
+        release.set()
+        await asyncio.gather(running, *waiting)
+        assert order == ["generation", "intent", "generation", "revision", "judge", "judge"]
+        stats = bulkhead.get_stats()["classes"]
+        assert stats["judge"]["granted"] == 2 and stats["judge"]["queued"] == 2
+        assert stats["intent"]["wait_p95_ms"] is not None
+
+    async def test_class_cap_does_not_block_other_classes(self, gated, monkeypatch):
+        monkeypatch.setattr(config, "LLM_BULKHEAD_MAX_CONCURRENCY", 4)
+        monkeypatch.setattr(config, "LLM_BULKHEAD_LIMITS", "judge:1")
+        order, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(_hold(t, order, release)) for t in ("judge", "judge", "revision")]
+        await asyncio.sleep(0)
+        assert order == ["judge", "revision"]  # the second judge waits; revision has room
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["judge", "revision", "judge"]
+
+    async def test_overflow_sheds_the_lowest_priority_waiter(self, gated, monkeypatch):
+        monkeypatch.setattr(config, "LLM_BULKHEAD_MAX_QUEUE", 2)
+        order, release = [], asyncio.Event()
+        running = asyncio.create_task(_hold("generation", order, release))
+        await asyncio.sleep(0)
+        judge = asyncio.create_task(_hold("judge", order, release))
+        intent = asyncio.create_task(_hold("intent", order, release))
+        await asyncio.sleep(0)
+        revision = asyncio.create_task(_hold("revision", order, release))
+        await asyncio.sleep(0)
+        with pytest.raises(bulkhead.Shed):
+            await judge
+        assert issubclass(bulkhead.Shed, httpx.HTTPError)  # callers' transport handling applies
+        release.set()
+        await asyncio.gather(running, intent, revision)
+        assert order == ["generation", "intent", "revision"]
+        assert bulkhead.get_stats()["classes"]["judge"]["shed"] == 1
+
+    async def test_cancelled_waiter_leaves_the_queue(self, gated):
+        order, release = [], asyncio.Event()
+        running = asyncio.create_task(_hold("generation", order, release))
+        await asyncio.sleep(0)
+        doomed = asyncio.create_task(_hold("intent", order, release))
+        await asyncio.sleep(0)
+        doomed.cancel()
+        await asyncio.sleep(0)
+        assert bulkhead.get_stats()["classes"]["intent"]["waiting"] == 0
+        release.set()
+        await running
+        async with bulkhead.slot("revision"):  # the slot came back
+            pass
+
+    async def test_chat_and_stream_calls_hold_a_slot(self, routed, gated, monkeypatch):
+        seen = []
+
+        async def fake_stream(messages, **kw):
+            seen.append(bulkhead.get_stats()["classes"]["generation"]["active"])
+            yield "oi"
+
+        monkeypatch.setattr(llm.deepseek_client, "stream_chat_completion", fake_stream)
+        await llm.chat_completion([], task="off_topic")
+        assert [d async for d in llm.stream_completion([], task="generation")] == ["oi"]
+        stats = bulkhead.get_stats()["classes"]["generation"]
+        assert seen == [1] and stats["granted"] == 2 and stats["active"] == 0
@@ -0,0 +1,104 @@
+"""demo/llm_stub.py speaks the OpenAI-compatible protocol the real transport expects."""
+
+import importlib.util
+import json
+import threading
+from pathlib import Path
+
+import httpx
+import pytest
+
+from providers import deepseek_client
+
+_PATH = Path(__file__).resolve().parent.parent / "demo" / "llm_stub.py"
+_spec = importlib.util.spec_from_file_location("llm_stub", _PATH)
+llm_stub = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(llm_stub)
+
+
+@pytest.fixture
+def stub_url():
+    stub = llm_stub.Stub(llm_stub.parse_latency("fixed:0"))
+    server = llm_stub.serve(stub, host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+SYSTEM = {"role": "system", "content": "You are the WB assistant. " * 60}
+HANDOFF_TOOL = {"type": "function", "function": {"name": "handoff_to_human", "parameters": {}}}
+
+
+class TestLlmStub:
+    async def test_json_intent_and_prefix_cache_usage(self, stub_url):
+        messages = [SYSTEM, {"role": "user", "content": 'Classify. Reply in json.\nUser message: "oi"'}]
+        first = (await deepseek_client.chat_completion(
+            messages, response_format={"type": "json_object"}, api_url=stub_url)).json()
+        assert json.loads(first["choices"][0]["message"]["content"]) == {"intent": "greeting"}
+        assert first["usage"]["prompt_cache_hit_tokens"] == 0
+        assert first["usage"]["prompt_cache_miss_tokens"] == first["usage"]["prompt_tokens"]
+
+        second = (await deepseek_client.chat_completion(
+            messages, model="other-model", api_url=stub_url)).json()
+        assert second["model"] == "other-model"
+        assert second["usage"]["prompt_cache_hit_tokens"] > 0
+
+    @pytest.mark.parametrize("message, expected", [
+        ("oi", "greeting"), ("quanto custa um site?", "request_quote"), ("vocês fazem apps?", "inquire_services"),
+    ])
+    async def test_intent_from_the_local_fallback_prompt(self, message, expected, monkeypatch):
+        from nodes import intent
+
+        captured = []
+
+        async def capture(messages, **kwargs):
+            captured.append(messages)
+            raise RuntimeError("only the prompt is needed")
+
+        monkeypatch.setattr(intent.langfuse_client, "get_prompt", lambda name: None)
+        monkeypatch.setattr(intent.llm, "chat_completion", capture)
+        await intent.detect_intent({"user_input": message})
+        body = {"messages": captured[0], "response_format": {"type": "json_object"}}
+        assert json.loads(llm_stub.plan_reply(body)["content"]) == {"intent": expected}
+
+    async def test_tool_call_then_text(self, stub_url):
+        asked = [SYSTEM, {"role": "user", "content": "quero falar com um humano"}]
+        data = (await deepseek_client.chat_completion(asked, tools=[HANDOFF_TOOL], api_url=stub_url)).json()
+        choice = data["choices"][0]
+        assert choice["finish_reason"] == "tool_calls"
+        assert choice["message"]["tool_calls"][0]["function"]["name"] == "handoff_to_human"
+
+        answered = asked + [choice["message"], {"role": "tool", "tool_call_id": "x", "content": "{}"}]
+        data = (await deepseek_client.chat_completion(answered, tools=[HANDOFF_TOOL], api_url=stub_url)).json()
+        assert data["choices"][0]["message"]["content"]
+
+    async def test_max_tokens_truncates(self, stub_url):
+        data = (await deepseek_client.chat_completion(
+            [{"role": "user", "content": "tell me more"}], max_tokens=5, api_url=stub_url)).json()
+        assert data["choices"][0]["finish_reason"] == "length"
+        assert len(data["choices"][0]["message"]["content"]) <= 20
+
+    async def test_stream_with_usage(self, stub_url):
+        usage = {}
+        deltas = [d async for d in deepseek_client.stream_chat_completion(
+            [{"role": "user", "content": "tell me more"}], usage_sink=usage, model="m", api_url=stub_url)]
+        assert "".join(deltas) == llm_stub.REPLY
+        assert usage["completion_tokens"] > 0 and usage["model"] == "m"
+
+    async def test_error_injection_header(self, stub_url):
+        resp = await deepseek_client.chat_completion(
+            [{"role": "user", "content": "hi"}], extra_headers={"X-Stub-Status": "503"}, api_url=stub_url)
+        assert resp.status_code == 503
+        with pytest.raises(httpx.HTTPStatusError):
+            resp.raise_for_status()
+
+    def test_latency_samplers(self):
+        assert llm_stub.parse_latency("fixed:250")() == 0.25
+        assert 0.1 <= llm_stub.parse_latency("uniform:100:200")() <= 0.2
+        assert llm_stub.parse_latency("lognormal:500:0.3")() > 0
+        with pytest.raises(ValueError):
+            llm_stub.parse_latency("gamma:1")
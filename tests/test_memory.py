@@ -28,7 +28,7 @@ class TestConversationMemory:
     async def test_second_turn_sees_the_first_turn(self, monkeypatch):
         seen = []
 
-        async def fake_chat(messages, temperature=0.7, use_tools=False):
+        async def fake_chat(messages, temperature=0.7, use_tools=False, **kw):
             seen.append(messages)
             return {"choices": [{"message": {"content": "resposta do bot"}}], "usage": {}}
 
@@ -50,7 +50,7 @@ class TestConversationMemory:
     async def test_separate_threads_do_not_share_memory(self, monkeypatch):
         seen = []
 
-        async def fake_chat(messages, temperature=0.7, use_tools=False):
+        async def fake_chat(messages, temperature=0.7, use_tools=False, **kw):
             seen.append(messages)
             return {"choices": [{"message": {"content": "ok"}}], "usage": {}}
 
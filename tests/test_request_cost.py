@@ -9,6 +9,7 @@ import asyncio
 
 import pytest
 
+import config
 from providers.deepseek_optimizer import (
     DeepSeekOptimizer,
     add_request_cost,
@@ -103,3 +104,43 @@ class TestUpdateUsageFeedsTheAccumulator:
         begin_request_cost()
         DeepSeekOptimizer.update_usage(is_cached_response=True)
         assert get_request_cost() == 0.0
+
+
+class TestPromptCacheBilling:
+    """#43: DeepSeek's usage splits the prompt into cache-hit and cache-miss tokens, billed apart."""
+
+    FLASH = "deepseek-v4-flash"
+
+    def test_hit_and_miss_portions_are_billed_separately(self):
+        begin_request_cost()
+        DeepSeekOptimizer.update_usage(input_tokens=1_000_000, output_tokens=0,
+                                       cache_hit_tokens=750_000, model=self.FLASH)
+        assert get_request_cost() == pytest.approx(0.75 * 0.0028 + 0.25 * 0.14)
+
+    def test_split_beats_the_all_miss_estimate(self):
+        full_miss, _ = DeepSeekOptimizer.estimate_cost(10_000, 500, model=self.FLASH)
+        split, _ = DeepSeekOptimizer.estimate_cost(10_000, 500, cache_hit_tokens=9_000, model=self.FLASH)
+        assert split < full_miss
+
+    def test_models_are_priced_by_their_own_row(self, monkeypatch):
+        monkeypatch.setattr(config, "LLM_PRICING", "backup-model:0.1:1.0:2.0")
+        cost, _ = DeepSeekOptimizer.estimate_cost(1_000_000, 1_000_000, cache_hit_tokens=0, model="backup-model")
+        assert cost == pytest.approx(1.0 + 2.0)
+        flash, _ = DeepSeekOptimizer.estimate_cost(1_000_000, 1_000_000, cache_hit_tokens=0, model=self.FLASH)
+        assert flash == pytest.approx(0.14 + 0.28)
+
+    def test_malformed_pricing_entries_are_ignored(self, monkeypatch):
+        monkeypatch.setattr(config, "LLM_PRICING", "broken,other:x:1:2")
+        assert set(DeepSeekOptimizer.model_pricing()) == {self.FLASH}
+
+    def test_report_reflects_billed_tokens_and_cost(self):
+        DeepSeekOptimizer.update_usage(input_tokens=1_000, output_tokens=100,
+                                       cache_hit_tokens=800, model=self.FLASH)
+        DeepSeekOptimizer.update_usage(input_tokens=1_000, output_tokens=100,
+                                       cache_hit_tokens=0, model=self.FLASH)
+        report = DeepSeekOptimizer.get_usage_report()
+        assert report["prompt_cache_hit_tokens"] == 800 and report["prompt_cache_miss_tokens"] == 1_200
+        assert report["cache_hit_rate"] == "40.0%"
+        expected = (800 * 0.0028 + 1_200 * 0.14 + 200 * 0.28) / 1_000_000
+        assert report["estimated_cost"] == f"${expected:.4f}"
+        assert report["by_model"][self.FLASH]["api_calls"] == 2
@@ -39,9 +39,119 @@ class TestSemanticGetPut:
         assert hit == {"a": 2}
 
     async def test_bucket_is_bounded(self, redis_fake):
-        import json
         for i in range(10):
             await cache.semantic_put("b1", [float(i), 1.0], {"i": i}, max_entries=3)
-        entries = json.loads(await redis_fake.get("b1"))
+        entries = cache.decode_payload(await redis_fake.get("b1"))
         assert len(entries) == 3
         assert [e["payload"]["i"] for e in entries] == [7, 8, 9]  # most recent kept
+
+
+def _entries(*hits):
+    return [{"id": i, "hits": h} for i, h in enumerate(hits)]
+
+
+class TestEviction:
+    def test_recency_keeps_the_newest(self):
+        kept, evicted = cache.evict_entries(_entries(9, 0, 0), 2, policy="recency")
+        assert [e["id"] for e in kept] == [1, 2] and evicted == 1
+
+    def test_tinylfu_evicts_the_coldest_outside_the_window(self):
+        # entry 0 is popular, 1 a one-off; 2 is brand new and protected by the window
+        kept, evicted = cache.evict_entries(_entries(9, 0, 0), 2, policy="tinylfu", window_ratio=0.5)
+        assert [e["id"] for e in kept] == [0, 2] and evicted == 1
+
+    def test_tinylfu_ties_go_oldest_first(self):
+        kept, _ = cache.evict_entries(_entries(0, 0, 0, 0), 3, policy="tinylfu", window_ratio=0.3)
+        assert [e["id"] for e in kept] == [1, 2, 3]
+
+    def test_burst_of_one_offs_does_not_evict_the_evergreen(self):
+        entries = _entries(5)
+        for i in range(1, 20):
+            entries.append({"id": i, "hits": 0})
+            entries, _ = cache.evict_entries(entries, 4, policy="tinylfu", window_ratio=0.25)
+        assert entries[0]["id"] == 0 and len(entries) == 4
+
+    def test_counters_age(self):
+        entries = _entries(0, 0)
+        for _ in range(cache.AGING_SAMPLE * 2):
+            cache.touch_entry(entries, entries[0])
+        assert entries[0]["hits"] < cache.AGING_SAMPLE * 2
+
+
+class TestHitCounts:
+    async def test_hit_is_counted_outside_the_bucket(self, redis_fake):
+        await cache.semantic_put("b1", [1.0, 0.0], {"a": 1}, max_entries=10)
+        stored = await redis_fake.get("b1")
+        await cache.semantic_get("b1", [1.0, 0.0], threshold=0.9)
+        await cache.semantic_get("b1", [1.0, 0.0], threshold=0.9)
+        [entry] = cache.decode_payload(stored)
+        assert await redis_fake.hget(cache.semantic_hits_key("b1"), entry["id"]) == b"2"
+        assert await redis_fake.get("b1") == stored  # a hit never rewrites the bucket
+
+    async def test_hit_does_not_undo_a_concurrent_revalidation(self, redis_fake, monkeypatch):
+        request = {"message": "Quanto custa?", "language": "pt-BR", "page": "/"}
+        await cache.semantic_put("b1", [1.0, 0.0], {"a": "old"}, 10, request=request)
+        real_get, revalidated = redis_fake.get, []
+
+        async def get_then_revalidate(key):
+            raw = await real_get(key)
+            if not revalidated:  # the revalidation's put lands while the hit is being served
+                revalidated.append(key)
+                await cache.semantic_put("b1", [1.0, 0.0], {"a": "fresh"}, 10, request=request)
+            return raw
+
+        monkeypatch.setattr(redis_fake, "get", get_then_revalidate)
+        assert await cache.semantic_get("b1", [1.0, 0.0], threshold=0.9) == {"a": "old"}
+        assert await cache.semantic_get("b1", [1.0, 0.0], threshold=0.9) == {"a": "fresh"}
+
+    @pytest.mark.parametrize("policy, survives", [("tinylfu", True), ("recency", False)])
+    async def test_popular_entry_survives_a_burst_under_tinylfu(self, redis_fake, monkeypatch, policy, survives):
+        monkeypatch.setattr(cache, "SEMANTIC_CACHE_EVICTION", policy)
+        await cache.semantic_put("b1", [1.0, 0.0], {"a": "evergreen"}, max_entries=3)
+        for _ in range(3):
+            await cache.semantic_get("b1", [1.0, 0.0], threshold=0.99)
+        for i in range(1, 6):
+            await cache.semantic_put("b1", [0.0, 1.0], {"a": i}, max_entries=3)
+        hit = await cache.semantic_get("b1", [1.0, 0.0], threshold=0.99)
+        assert (hit == {"a": "evergreen"}) is survives
+
+    async def test_reanswer_keeps_the_hit_count(self, redis_fake):
+        request = {"message": "Quanto custa?", "language": "pt-BR", "page": "/"}
+        await cache.semantic_put("b1", [1.0, 0.0], {"a": "old"}, 10, request=request)
+        await cache.semantic_get("b1", [1.0, 0.0], threshold=0.9)
+        await cache.semantic_put("b1", [1.0, 0.0], {"a": "new"}, 10, request=request)
+        [entry] = cache.decode_payload(await redis_fake.get("b1"))
+        assert entry["payload"] == {"a": "new"}
+        assert await redis_fake.hget(cache.semantic_hits_key("b1"), entry["id"]) == b"1"
+
+
+class TestReplay:
+    def test_tinylfu_beats_recency_on_a_bursty_stream(self):
+        import importlib.util
+        from pathlib import Path
+
+        path = Path(__file__).resolve().parent.parent / "evals" / "replay_semantic_cache.py"
+        spec = importlib.util.spec_from_file_location("replay_semantic_cache", path)
+        replay = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(replay)
+
+        def one_hot(i):
+            return [1.0 if k == i else 0.0 for k in range(32)]
+
+        vectors = {"servicos": one_hot(0)}
+        # the evergreen question is asked twice, then keeps coming back between bursts of one-offs
+        stream = [("pt-BR", "/", "servicos")]
+        for burst in range(5):
+            stream.append(("pt-BR", "/", "servicos"))
+            for j in range(4):
+                name = f"one-off-{burst}-{j}"
+                vectors[name] = one_hot(burst * 4 + j + 1)
+                stream.append(("pt-BR", "/", name))
+
+        def embed(message):
+            return vectors[message]
+
+        rows = {p: replay.replay(stream, embed, max_entries=3, threshold=0.9999, policy=p, window_ratio=0.34)
+                for p in cache.SEMANTIC_EVICTION_POLICIES}
+        assert rows["recency"]["hits"] == 1
+        assert rows["tinylfu"]["hits"] == 5
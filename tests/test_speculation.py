@@ -0,0 +1,82 @@
+"""Speculative retrieval (#47): retrieval runs alongside intent detection, committed only on RAG turns."""
+
+import asyncio
+
+import pytest
+
+import config
+import nodes
+from agents.graph_config import route_after_intent
+from nodes import intent, speculation
+
+
+@pytest.fixture
+def retrieval_spy(monkeypatch):
+    calls = []
+
+    async def company(state):
+        calls.append("company")
+        return {**state, "company_context": "ctx", "rag_sources": [{"section": "S"}]}
+
+    async def user(state):
+        calls.append("user")
+        return {**state, "user_context": "hist"}
+
+    monkeypatch.setattr(nodes.retrieval, "retrieve_company_context", company)
+    monkeypatch.setattr(nodes.retrieval, "retrieve_user_context", user)
+    return calls
+
+
+def _intent(monkeypatch, name, delay=0.0):
+    async def detect(state):
+        await asyncio.sleep(delay)
+        return {**state, "intent": name}
+    monkeypatch.setattr(intent, "detect_intent", detect)
+
+
+class TestSpeculativeRetrieval:
+    async def test_rag_intent_commits_retrieval_and_skips_the_retrieve_nodes(self, monkeypatch, retrieval_spy):
+        _intent(monkeypatch, "inquire_services", delay=0.01)
+        out = await nodes.detect_intent_speculative({"user_input": "quero um site"})
+        assert out["speculative_retrieval"] is True
+        assert out["company_context"] == "ctx" and out["user_context"] == "hist"
+        assert retrieval_spy == ["company", "user"]
+        assert route_after_intent(out) == "augment_query"
+        assert speculation.get_stats()["committed"] == 1
+
+    async def test_canned_intent_discards_the_speculative_run(self, monkeypatch, retrieval_spy):
+        _intent(monkeypatch, "greeting")
+        out = await nodes.detect_intent_speculative({"user_input": "oi", "speculative_retrieval": True})
+        assert out["speculative_retrieval"] is False
+        assert "company_context" not in out
+        assert route_after_intent(out) == "generate_greeting_response"
+        assert speculation.get_stats()["discarded"] == 1
+
+    async def test_failed_speculation_falls_back_to_sequential_retrieval(self, monkeypatch):
+        async def broken(state):
+            raise RuntimeError("qdrant down")
+        monkeypatch.setattr(nodes.retrieval, "retrieve_company_context", broken)
+        _intent(monkeypatch, "inquire_services")
+        out = await nodes.detect_intent_speculative({"user_input": "quero um site"})
+        assert out["speculative_retrieval"] is False
+        assert route_after_intent(out) == "retrieve_company_context"
+        assert speculation.get_stats()["failed"] == 1
+
+    async def test_disabled_runs_retrieval_after_intent(self, monkeypatch, retrieval_spy):
+        monkeypatch.setattr(config, "SPECULATIVE_RETRIEVAL_ENABLED", False)
+        _intent(monkeypatch, "inquire_services")
+        out = await nodes.detect_intent_speculative({"user_input": "quero um site"})
+        assert out["speculative_retrieval"] is False and retrieval_spy == []
+        assert speculation.start({}) is None
+
+    async def test_discard_cancels_a_pending_run(self):
+        gate = asyncio.Event()
+
+        async def slow(state):
+            await gate.wait()
+            return state
+        task = speculation.start({}, (slow,))
+        await asyncio.sleep(0)
+        speculation.discard(task)
+        await asyncio.sleep(0)
+        assert task.cancelled()
@@ -1,7 +1,9 @@
 """SSE streaming endpoint (#14): real token streaming on the RAG path, chunked otherwise."""
 
+import asyncio
 import json
 
+import httpx
 import pytest
 
 import config
@@ -39,6 +41,81 @@ class TestLlmStream:
         assert seen["model"] == "strong"
 
 
+@pytest.fixture
+def stream_failover(monkeypatch):
+    """Fallback configured; the fake transport streams per-model scripts: a list of deltas,
+    an exception to raise before them, or a delay before the first one."""
+    monkeypatch.setattr(config, "GENERATION_MODEL", "strong")
+    monkeypatch.setattr(config, "FALLBACK_API_URL", "https://fallback.test/v1/chat")
+    monkeypatch.setattr(config, "FALLBACK_API_KEY", "fk")
+    monkeypatch.setattr(config, "FALLBACK_MODEL", "backup")
+    monkeypatch.setattr(config, "LLM_STREAM_TTFT_SECONDS", 0.05)
+    scripts = {"strong": {"deltas": ["Olá", " mundo"]}, "backup": {"deltas": ["Oi", " de novo"]}}
+    opened = []
+
+    async def fake_stream(messages, *, model=None, **kw):
+        opened.append(model)
+        script = scripts[model]
+        await asyncio.sleep(script.get("delay", 0))
+        if "raise" in script:
+            raise script["raise"]
+        for i, d in enumerate(script["deltas"]):
+            if i == script.get("fail_after"):
+                raise httpx.ReadError("connection reset mid-stream")
+            yield d
+
+    monkeypatch.setattr(deepseek_client, "stream_chat_completion", fake_stream)
+    return scripts, opened
+
+
+def _status_error(status):
+    request = httpx.Request("POST", "https://primary.test")
+    return httpx.HTTPStatusError("err", request=request, response=httpx.Response(status, request=request))
+
+
+class TestStreamFailover:
+    async def test_healthy_primary_streams_without_fallback(self, stream_failover):
+        scripts, opened = stream_failover
+        assert await _collect(llm.stream_completion([], task="generation")) == ["Olá", " mundo"]
+        assert opened == ["strong"]
+
+    async def test_5xx_before_first_token_restarts_on_fallback(self, stream_failover):
+        scripts, opened = stream_failover
+        scripts["strong"]["raise"] = _status_error(503)
+        assert await _collect(llm.stream_completion([], task="generation")) == ["Oi", " de novo"]
+        assert opened == ["strong", "backup"]
+
+    async def test_ttft_deadline_restarts_on_fallback(self, stream_failover):
+        scripts, opened = stream_failover
+        scripts["strong"]["delay"] = 5
+        assert await _collect(llm.stream_completion([], task="generation")) == ["Oi", " de novo"]
+        assert llm.circuit_breaker.get("primary", "strong").error_rate() == 1.0
+
+    async def test_client_error_is_not_replayed(self, stream_failover):
+        scripts, opened = stream_failover
+        scripts["strong"]["raise"] = _status_error(400)
+        with pytest.raises(httpx.HTTPStatusError):
+            await _collect(llm.stream_completion([], task="generation"))
+        assert opened == ["strong"]
+
+    async def test_mid_stream_failure_never_duplicates_tokens(self, stream_failover):
+        scripts, opened = stream_failover
+        scripts["strong"]["fail_after"] = 1
+        out = []
+        with pytest.raises(httpx.ReadError):
+            async for delta in llm.stream_completion([], task="generation"):
+                out.append(delta)
+        assert out == ["Olá"]  # no fallback after a token went out
+        assert opened == ["strong"]
+
+    async def test_open_breaker_streams_from_fallback(self, stream_failover, monkeypatch):
+        scripts, opened = stream_failover
+        monkeypatch.setattr(config, "LLM_BREAKER_MIN_CALLS", 1)
+        llm.circuit_breaker.get("primary", "strong").record(False)
+        assert await _collect(llm.stream_completion([], task="generation")) == ["Oi", " de novo"]
+        assert opened == ["backup"]
+
+
 class TestStreamHelpers:
     def test_chunk_text_keeps_all_content(self):
         assert "".join(main._chunk_text("Olá mundo bonito")) == "Olá mundo bonito"
@@ -173,7 +250,8 @@ class TestStreamSecurityAndBilling:
 
         async def fake_stream(messages, *, task="generation", usage_sink=None, **kw):
             if usage_sink is not None:
-                usage_sink.update({"prompt_tokens": 100, "completion_tokens": 50})
+                usage_sink.update({"prompt_tokens": 100, "completion_tokens": 50,
+                                   "prompt_cache_hit_tokens": 64, "model": "deepseek-v4-flash"})
             for d in ["oi ", "tudo bem"]:
                 yield d
 
@@ -183,6 +261,7 @@ class TestStreamSecurityAndBilling:
                             staticmethod(lambda **kw: seen.update(kw)))
         await _collect(main._stream_chat(_payload()))
         assert seen.get("input_tokens") == 100 and seen.get("output_tokens") == 50
+        assert seen.get("cache_hit_tokens") == 64 and seen.get("model") == "deepseek-v4-flash"
 
 
 class TestStreamHandoff:
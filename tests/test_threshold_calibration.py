@@ -0,0 +1,53 @@
+"""Semantic-cache threshold calibration (#33): pair seeding, sweep and recommendation."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+_PATH = Path(__file__).resolve().parent.parent / "evals" / "calibrate_semantic_threshold.py"
+_spec = importlib.util.spec_from_file_location("calibrate_semantic_threshold", _PATH)
+calibrate = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(calibrate)
+
+
+class TestPairs:
+    def test_seeded_negatives_pair_different_intents_in_one_language(self):
+        intents = [
+            {"message": "oi", "language": "pt-BR", "expected": "greeting"},
+            {"message": "quanto custa?", "language": "pt-BR", "expected": "request_quote"},
+            {"message": "vcs fazem site?", "language": "pt-BR", "expected": "inquire_services"},
+            {"message": "hello", "language": "en", "expected": "greeting"},
+        ]
+        pairs = calibrate.seeded_negatives(intents, [])
+        assert len(pairs) == 3  # the three pt-BR cross-intent pairs; never across languages
+        assert all(not p["paraphrase"] and p["language"] == "pt-BR" for p in pairs)
+
+    def test_shipped_pairs_load_and_cover_every_language(self):
+        pairs = calibrate.load_pairs()
+        for language in ("pt-BR", "en", "es", "it"):
+            labelled = {p["paraphrase"] for p in pairs if p["language"] == language}
+            assert labelled == {True, False}, language
+
+
+class TestSweep:
+    def test_rates_and_recommendation(self):
+        curve = calibrate.sweep(pos=[0.95, 0.90, 0.80], neg=[0.85, 0.60], steps=[0.8, 0.85, 0.86, 0.9])
+        assert [r["hit_rate"] for r in curve] == [1.0, pytest.approx(0.667), pytest.approx(0.667), pytest.approx(0.667)]
+        assert [r["false_hit_rate"] for r in curve] == [0.5, 0.5, 0.0, 0.0]
+        assert calibrate.recommend(curve, max_false_hit=0.0) == 0.86
+        assert calibrate.recommend(curve, max_false_hit=0.5) == 0.8
+
+    def test_no_safe_threshold_is_none(self):
+        curve = calibrate.sweep(pos=[1.0], neg=[1.0], steps=[0.9, 0.99])
+        assert calibrate.recommend(curve, max_false_hit=0.0) is None
+
+    def test_score_pairs_groups_by_language_and_label(self):
+        vectors = {"a": [1.0, 0.0], "b": [1.0, 0.0], "c": [0.0, 1.0]}
+        pairs = [
+            {"a": "a", "b": "b", "language": "en", "paraphrase": True},
+            {"a": "a", "b": "c", "language": "en", "paraphrase": False},
+        ]
+        scores = calibrate.score_pairs(pairs, vectors.__getitem__)
+        assert scores["en"]["pos"] == [pytest.approx(1.0)]
+        assert scores["en"]["neg"] == [pytest.approx(0.0)]
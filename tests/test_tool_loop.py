@@ -24,7 +24,7 @@ def text_response(text):
 def sequence_chat(responses):
     state = {"n": 0}
 
-    async def fake(messages, temperature=0.7, use_tools=False):
+    async def fake(messages, temperature=0.7, use_tools=False, **kw):
         r = responses[min(state["n"], len(responses) - 1)]
         state["n"] += 1
         return r
@@ -83,7 +83,7 @@ class TestToolLoop:
         assert reply == "ok"
 
     async def test_loop_is_bounded_and_forces_final_text(self, monkeypatch):
-        async def fake(messages, temperature=0.7, use_tools=False):
+        async def fake(messages, temperature=0.7, use_tools=False, **kw):
             # Keep requesting a tool while tools are offered; answer in text once they're off.
             return tool_call_response("create_lead", "{}") if use_tools else text_response("resposta final")
 
@@ -130,7 +130,7 @@ class TestGenerateResponseWiring:
         # this fails before the #2 fix (generate_response caught ReadTimeout only).
         import httpx as _httpx
 
-        async def boom(messages, temperature=0.7, use_tools=False):
+        async def boom(messages, temperature=0.7, use_tools=False, **kw):
             raise _httpx.ConnectError("connection refused")
 
         monkeypatch.setattr(nodes.generation, "_deepseek_chat", boom)
@@ -232,14 +232,14 @@ class TestBehaviorPersonalization:
     async def _capture_system_message(self, monkeypatch, state):
         captured = {}
 
-        async def fake(messages, temperature=0.7, use_tools=False):
+        async def fake(messages, temperature=0.7, use_tools=False, **kw):
             captured["messages"] = messages
             return text_response("ok")
 
         monkeypatch.setattr(nodes.generation, "_deepseek_chat", fake)
         monkeypatch.setattr(langfuse_client, "get_prompt", lambda *a, **k: None)
         await nodes.generate_response(state)
-        return captured["messages"][0]["content"]
+        return "\n".join(m["content"] for m in captured["messages"] if m["role"] == "system")
 
     async def test_hint_injected_when_behavior_present(self, monkeypatch):
         system_msg = await self._capture_system_message(monkeypatch, {
@@ -256,6 +256,34 @@ class TestBehaviorPersonalization:
         assert "track browsing" not in system_msg.lower()
 
 
+class TestPromptPrefixLayout:
+    """#42: the first message is byte-identical across visitors so DeepSeek's prefix cache hits."""
+
+    @pytest.fixture(autouse=True)
+    def local_prompts(self, monkeypatch):
+        monkeypatch.setattr(langfuse_client, "get_prompt", lambda *a, **k: None)
+
+    def test_static_prefix_ignores_visitor_and_history(self):
+        a, _ = nodes.build_llm_messages({"user_input": "oi", "augmented_input": "AUG-1"})
+        b, _ = nodes.build_llm_messages({
+            "user_input": "quero um site", "augmented_input": "AUG-2",
+            "behavior": {"pages_visited": ["/pricing"], "geo_country": "BR"},
+            "messages": [{"role": "user", "content": "antes"}, {"role": "assistant", "content": "ok"}],
+        })
+        assert a[0] == b[0]
+        assert "Before answering" in a[0]["content"]  # the answer checklist is part of the prefix
+
+    def test_volatile_content_follows_the_history(self):
+        history = [{"role": "user", "content": "antes"}, {"role": "assistant", "content": "ok"}]
+        messages, _ = nodes.build_llm_messages({
+            "user_input": "quero um site", "augmented_input": "AUG",
+            "behavior": {"pages_visited": ["/pricing"], "geo_country": "BR"}, "messages": history,
+        })
+        assert messages[1:3] == history
+        assert messages[3]["role"] == "system" and "/pricing" in messages[3]["content"]
+        assert messages[4] == {"role": "user", "content": "AUG"}
+
+
 class TestInputGuardrailShortCircuit:
     """#15: an unambiguous injection attempt is refused before any LLM call."""
 
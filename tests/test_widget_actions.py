@@ -0,0 +1,77 @@
+"""Widget button messages (#35): precomputed per-language/per-page replies, no LLM/embedding/Qdrant."""
+
+import json
+
+import pytest
+
+import main
+from core import cache, widget_actions
+
+
+@pytest.fixture
+def nothing_external(monkeypatch):
+    """Any LLM, embedding or graph call fails the test (Qdrant is already guarded in conftest)."""
+    def fail(*args, **kwargs):
+        raise AssertionError("a widget button must not reach the LLM/embedding/graph")
+
+    async def afail(*args, **kwargs):
+        fail()
+
+    monkeypatch.setattr(main, "compute_embedding", fail)
+    monkeypatch.setattr(main.graph, "ainvoke", afail)
+    monkeypatch.setattr(main.nodes, "detect_intent", afail)
+    yield
+    cache.reset_cache_stats()
+
+
+class TestRegistry:
+    def test_loads_and_matches_normalized_labels(self):
+        assert widget_actions.load() > 0
+        assert widget_actions.match("Ver serviços") == "view_services"
+        assert widget_actions.match("ver servicos.") == "view_services"
+        assert widget_actions.match("See services") == "view_services"
+        assert widget_actions.match("ver serviços de automação para minha loja") is None
+
+    def test_page_specific_reply_with_locale_prefix_and_fallbacks(self):
+        widget_actions.load()
+        web = widget_actions.response("view_services", "en", "/en/websites")
+        assert web["parts"] == widget_actions.response("view_services", "en", "/websites")["parts"]
+        assert web["parts"] != widget_actions.response("view_services", "en", "/")["parts"]
+        assert widget_actions.response("view_services", "de", "/")["parts"] == \
+            widget_actions.response("view_services", "pt-BR", "/")["parts"]
+        assert web["intent"] == "inquire_services" and web["version"] == "view_services.v1"
+
+    def test_every_language_is_covered(self):
+        data = json.loads(widget_actions.REGISTRY_PATH.read_text(encoding="utf-8"))
+        for action_id, action in data["actions"].items():
+            assert set(action["responses"]) == {"pt-BR", "en", "es", "it"}, action_id
+
+    def test_missing_default_reply_is_rejected(self, tmp_path):
+        bad = tmp_path / "actions.json"
+        bad.write_text(json.dumps({"version": 1, "actions": {"x": {
+            "labels": ["X"], "intent": "inquire_services", "responses": {"pt-BR": {"/": ["oi"]}}}}}))
+        with pytest.raises(ValueError):
+            widget_actions.load(bad)
+        widget_actions.load()
+
+
+class TestServedWithoutTheGraph:
+    async def test_chat_returns_the_precomputed_parts(self, redis_fake, nothing_external):
+        body = await main._handle_chat(main.ChatRequest(message="Ver serviços", language=None, current_page="/ai"))
+        assert body["cached"] is True and body["cache_type"] == "widget"
+        assert body["language_used"] == "pt-BR" and body["detected_intent"] == "inquire_services"
+        assert body["response_parts"] == widget_actions.response("view_services", "pt-BR", "/ai")["parts"]
+        assert body["revised_response"] == "\n\n".join(body["response_parts"])
+        assert cache.get_cache_stats()["widget"]["hits"] == 1
+
+    async def test_identified_users_get_it_too(self, redis_fake, nothing_external):
+        body = await main._handle_chat(main.ChatRequest(message="Request a quote", user_id="user-9", language="en"))
+        assert body["detected_intent"] == "request_quote" and body["widget_action"] == "request_quote"
+
+    async def test_stream_emits_one_token_per_part(self, redis_fake, nothing_external):
+        frames = [json.loads(f[len("data: "):]) async for f in
+                  main._stream_chat(main.ChatRequest(message="Vedi servizi", language="it"))]
+        tokens = [f["text"] for f in frames if f["type"] == "token"]
+        parts = widget_actions.response("view_services", "it", "/")["parts"]
+        assert len(tokens) == len(parts) and "".join(tokens) == "\n\n".join(parts)
+        assert frames[-1]["cache_type"] == "widget"